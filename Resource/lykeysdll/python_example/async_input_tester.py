@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from array import array
+
+import trajectory
+from virtuakeys_mapping import VirtualKeys
+
+
+class LoopTimer:
+    """事件循环上的高精度定时器
+
+    所有等待中的截止时间保存在一个最小堆中，事件循环只为最早的截止时间设置一个定时回调，
+    在截止时间前spin_threshold醒来，自旋到截止时间后唤醒到期的协程。
+    同一时刻到期的协程一起唤醒，唤醒后先让它们执行，再等待下一个截止时间，
+    因此一个线程可以同时驱动数百个定时序列。
+
+    截止时间使用time.perf_counter()，与PreciseTimer一致。
+    """
+
+    def __init__(self, spin_threshold: float = 0.002, max_samples: int = 100000):
+        """初始化定时器
+
+        Args:
+            spin_threshold: 截止时间前开始自旋的时间(秒)，应大于事件循环的定时精度
+            max_samples: 最多保留的延迟样本数
+        """
+        self.spin_threshold = spin_threshold
+        self.max_samples = max_samples
+        self.start_time = time.perf_counter()
+        self._cpu_start = time.thread_time()
+        self._lateness = array('d')
+        self._heap = []  # (截止时间, 序号, Future)
+        self._counter = itertools.count()
+        self._loop = None
+        self._handle = None
+        self._armed_for = float('inf')  # 当前定时回调对应的截止时间
+
+    def start(self) -> float:
+        """重置计时基准并清空统计(在事件循环线程中调用)
+
+        Returns:
+            float: 基准时间
+        """
+        self.start_time = time.perf_counter()
+        self._cpu_start = time.thread_time()
+        self._lateness = array('d')
+        return self.start_time
+
+    def sleep_until(self, deadline: float) -> asyncio.Future:
+        """等待到指定的绝对时间
+
+        Args:
+            deadline: 截止时间(perf_counter)
+
+        Returns:
+            asyncio.Future: 可等待对象，结果为实际唤醒时间相对截止时间的延迟(秒)
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._heap:
+                raise RuntimeError("LoopTimer不能同时用于多个事件循环")
+            self._loop = loop
+        future = loop.create_future()
+        heapq.heappush(self._heap, (deadline, next(self._counter), future))
+        if deadline < self._armed_for:
+            self._arm()
+        return future
+
+    def sleep(self, seconds: float) -> asyncio.Future:
+        """等待指定的时间(秒)"""
+        return self.sleep_until(time.perf_counter() + seconds)
+
+    def _arm(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+        deadline = self._heap[0][0]
+        self._armed_for = deadline
+        delay = deadline - self.spin_threshold - time.perf_counter()
+        if delay > 0:
+            self._handle = self._loop.call_later(delay, self._fire)
+        else:
+            self._handle = self._loop.call_soon(self._fire)
+
+    def _fire(self) -> None:
+        self._handle = None
+        self._armed_for = float('inf')
+        heap = self._heap
+        perf_counter = time.perf_counter
+        if not heap:
+            return
+
+        deadline = heap[0][0]
+        now = perf_counter()
+        if deadline - now > self.spin_threshold:
+            self._arm()  # 提前醒来
+            return
+        while now < deadline:
+            now = perf_counter()
+
+        # 唤醒所有已到期的协程
+        lateness_samples = self._lateness
+        while heap and heap[0][0] <= now:
+            deadline, _, future = heapq.heappop(heap)
+            if future.done():
+                continue  # 等待方已取消
+            lateness = now - deadline
+            if len(lateness_samples) < self.max_samples:
+                lateness_samples.append(lateness)
+            future.set_result(lateness)
+        if heap:
+            self._arm()
+
+    def pending(self) -> int:
+        """等待中的协程数"""
+        return len(self._heap)
+
+    def stats(self) -> dict:
+        """获取定时统计(在事件循环线程中调用)
+
+        Returns:
+            dict: 等待次数、延迟百分位(微秒)及事件循环线程的CPU占用率(%)
+        """
+        samples = sorted(self._lateness)
+        count = len(samples)
+
+        def percentile(p):
+            if not count:
+                return 0.0
+            return samples[min(count - 1, int(p / 100.0 * count))] * 1e6
+
+        wall = time.perf_counter() - self.start_time
+        cpu = time.thread_time() - self._cpu_start
+        return {
+            'waits': count,
+            'jitter_p50_us': percentile(50),
+            'jitter_p90_us': percentile(90),
+            'jitter_p99_us': percentile(99),
+            'jitter_max_us': samples[-1] * 1e6 if count else 0.0,
+            'cpu_percent': cpu / wall * 100.0 if wall > 0 else 0.0,
+        }
+
+
+class AsyncInputTester:
+    """异步输入测试器
+
+    包装InputTester，把其中用time.sleep等待的操作(按键、点击、平滑移动)改为协程，
+    由LoopTimer按绝对截止时间唤醒，一个事件循环线程即可交错运行大量定时序列。
+    不需要等待的操作(key_down、mouse_move_rel等)直接转发给InputTester。
+    """
+
+    def __init__(self, tester, timer: LoopTimer = None):
+        """初始化异步输入测试器
+
+        Args:
+            tester: 输入测试器
+            timer: 定时器，默认新建(同一事件循环中的测试器可共享一个定时器)
+        """
+        self.tester = tester
+        self.timer = timer or LoopTimer()
+
+    def __getattr__(self, name):
+        return getattr(self.tester, name)
+
+    async def sleep(self, seconds: float) -> float:
+        """等待指定的时间(秒)
+
+        Returns:
+            float: 唤醒延迟(秒)
+        """
+        return await self.timer.sleep(seconds)
+
+    async def press_key(self, key: str, duration: float = 0.1) -> bool:
+        """按下并释放按键(需要Shift的字符先按下Shift)
+
+        Args:
+            key: 按键名称
+            duration: 按下持续时间(秒)
+
+        Returns:
+            bool: 操作是否成功
+        """
+        tester = self.tester
+        sleep_until = self.timer.sleep_until
+        shift = False
+        pressed = False
+        try:
+            start = time.perf_counter()
+            if VirtualKeys.needs_shift(key):
+                tester.key_down('shift')
+                shift = True
+                start += 0.01
+                await sleep_until(start)  # 短暂延时确保Shift按下
+            pressed = tester.key_down(key)
+            if not pressed:
+                return False
+            await sleep_until(start + duration)
+            pressed = False
+            success = tester.key_up(key)
+            if shift:
+                await sleep_until(start + 0.01 + duration)  # 短暂延时确保按键动作完成
+            return success
+        except Exception as e:
+            logging.error(f"按键操作失败: {str(e)}")
+            return False
+        finally:
+            # 协程被取消或出错时释放仍处于按下状态的按键，避免卡住
+            if pressed:
+                tester.key_up(key)
+            if shift:
+                tester.key_up('shift')
+
+    async def _click(self, down, up, duration: float) -> bool:
+        if not down():
+            return False
+        try:
+            await self.timer.sleep(duration)
+        finally:
+            released = up()  # 被取消时同样释放按钮
+        return released
+
+    async def mouse_click(self, duration: float = 0.1) -> bool:
+        """鼠标左键点击"""
+        return await self._click(self.tester.mouse_left_down, self.tester.mouse_left_up, duration)
+
+    async def mouse_right_click(self, duration: float = 0.1) -> bool:
+        """鼠标右键点击"""
+        return await self._click(self.tester.mouse_right_down, self.tester.mouse_right_up, duration)
+
+    async def mouse_middle_click(self, duration: float = 0.1) -> bool:
+        """鼠标中键点击"""
+        return await self._click(self.tester.mouse_middle_down, self.tester.mouse_middle_up, duration)
+
+    async def mouse_x1_click(self, duration: float = 0.1) -> bool:
+        """鼠标X1键点击"""
+        return await self._click(self.tester.mouse_x1_down, self.tester.mouse_x1_up, duration)
+
+    async def mouse_x2_click(self, duration: float = 0.1) -> bool:
+        """鼠标X2键点击"""
+        return await self._click(self.tester.mouse_x2_down, self.tester.mouse_x2_up, duration)
+
+    async def move(self, dx: int, dy: int, duration: float = 0.2, rate: float = 100.0,
+                   easing: str = 'linear') -> int:
+        """在duration秒内相对平滑移动(dx, dy)
+
+        Args:
+            dx: X轴相对移动距离
+            dy: Y轴相对移动距离
+            duration: 移动时长(秒)
+            rate: 发送频率(Hz)
+            easing: 缓动函数名称(见trajectory.EASINGS)
+
+        Returns:
+            int: 实际发送的移动次数
+        """
+        return await self.play(trajectory.linear(dx, dy, duration, rate=rate, easing=easing))
+
+    async def play(self, path) -> int:
+        """按帧间隔发送轨迹的相对位移(与trajectory.stream_relative相同，第i帧在i*interval之后发送)
+
+        Args:
+            path: trajectory.Trajectory
+
+        Returns:
+            int: 实际发送的移动次数(位移为0的帧只等待不发送)
+        """
+        moves = 0
+        interval = path.interval
+        sleep_until = self.timer.sleep_until
+        move = self.tester.mouse_move_rel
+        start = time.perf_counter()
+        for i, (dx, dy) in enumerate(path.deltas()):
+            if i:
+                await sleep_until(start + i * interval)
+            if dx or dy:
+                move(dx, dy)
+                moves += 1
+        return moves
+
+    async def move_to(self, x: int, y: int, start_x: int, start_y: int, duration: float = 0.2,
+                      rate: float = 100.0, easing: str = 'ease_out') -> int:
+        """在duration秒内从(start_x, start_y)绝对平滑移动到(x, y)
+
+        Returns:
+            int: 发送的帧数
+        """
+        path = trajectory.linear(x - start_x, y - start_y, duration, rate=rate, easing=easing)
+        interval = path.interval
+        sleep_until = self.timer.sleep_until
+        move = self.tester.mouse_move_abs
+        start = time.perf_counter()
+        frames = 0
+        for i, (px, py) in enumerate(path.positions(start_x, start_y)):
+            if i:
+                await sleep_until(start + i * interval)
+            move(px, py)
+            frames += 1
+        return frames
+
+
+class EventLoopThread:
+    """在后台线程中运行的事件循环，供界面等同步代码提交协程"""
+
+    def __init__(self, name: str = 'AsyncInput'):
+        self.name = name
+        self.loop = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    def start(self) -> None:
+        """启动事件循环线程"""
+        if self._thread:
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def submit(self, coro):
+        """提交协程
+
+        Returns:
+            concurrent.futures.Future: 协程的结果
+        """
+        if not self._thread:
+            raise RuntimeError("事件循环线程未运行")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """取消未完成的协程并停止事件循环线程"""
+        if not self._thread:
+            return
+
+        def shutdown():
+            for task in asyncio.all_tasks(self.loop):
+                task.cancel()
+            self.loop.call_soon(self.loop.stop)
+
+        self.loop.call_soon_threadsafe(shutdown)
+        self._thread.join(timeout)
+        self._thread = None
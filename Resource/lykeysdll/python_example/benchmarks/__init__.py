@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""输入栈性能基准
+
+在python_example目录下运行。热路径微基准套件(可保存基准文件并检查性能回退):
+    python -m benchmarks.suite --save suite_baseline.json
+    python -m benchmarks.suite --baseline suite_baseline.json --threshold 0.2
+针对单项优化的对比基准，例如:
+    python -m benchmarks.bench_batch
+    python -m benchmarks.bench_startup --baseline startup_baseline.json
+共用的测量函数、运行环境信息和基准比较见benchmarks.common。
+"""
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""多生产者输入仲裁基准: 组合键生产者、1kHz鼠标生产者和限速文本生产者同时运行，
+对比各线程直接调用驱动与经InputArbiter分发时的驱动并发调用、组合键交错情况，
+以及仲裁时每个生产者的吞吐量和排队等待"""
+
+import argparse
+import json
+import threading
+import time
+
+from driver_backends import NullBackend
+from input_arbiter import InputArbiter, PRIORITY_HIGH, PRIORITY_LOW
+from input_tester import InputTester
+from precise_timer import PreciseTimer
+
+VK_SHIFT = 0x10
+VK_A = 0x41
+
+
+class ProbeDriver(NullBackend):
+    """记录驱动被同时调用的线程数以及调用顺序的替身驱动"""
+
+    def __init__(self, call_cost: float):
+        self.call_cost = call_cost
+        self.active = 0
+        self.max_active = 0
+        self.events = []
+
+    def _enter(self, op, arg):
+        self.active += 1
+        if self.active > self.max_active:
+            self.max_active = self.active
+        self.events.append((op, arg))
+        if self.call_cost:
+            deadline = time.perf_counter() + self.call_cost
+            while time.perf_counter() < deadline:
+                pass
+        self.active -= 1
+
+    def KeyDown(self, vk_code):
+        self._enter('down', vk_code)
+
+    def KeyUp(self, vk_code):
+        self._enter('up', vk_code)
+
+    def MouseMoveRELATIVE(self, dx, dy):
+        self._enter('move', 0)
+
+
+def broken_combos(events) -> int:
+    """统计Shift按下到释放之间混入了其他生产者事件(鼠标移动或其他按键)的组合键次数"""
+    broken = 0
+    inside = False
+    for op, arg in events:
+        if op == 'down' and arg == VK_SHIFT:
+            inside = True
+        elif op == 'up' and arg == VK_SHIFT:
+            inside = False
+        elif inside and (op == 'move' or arg not in (VK_SHIFT, VK_A)):
+            broken += 1
+            inside = False
+    return broken
+
+
+def press_combo(tester):
+    tester.key_down('shift')
+    tester.key_down('a')
+    time.sleep(0.0002)  # 按住A
+    tester.key_up('a')
+    tester.key_up('shift')
+
+
+def combo_producer(tester, combos: int, use_group: bool):
+    producer = tester.driver
+    for _ in range(combos):
+        if use_group:
+            with producer.group():
+                press_combo(tester)
+        else:
+            press_combo(tester)
+        time.sleep(0.001)
+
+
+def mouse_producer(tester, duration: float, rate: float):
+    timer = PreciseTimer(spin_threshold=0.0)
+    timer.start()
+    for i in range(int(duration * rate)):
+        timer.wait_offset(i / rate)
+        tester.mouse_move_rel(1, 0)
+
+
+def text_producer(tester, keys: int):
+    for _ in range(keys):
+        tester.key_down('b')
+        tester.key_up('b')
+
+
+def run(duration: float, combos: int, text_keys: int, text_rate: float, call_cost: float) -> dict:
+    results = {}
+    for mode in ('direct', 'arbiter'):
+        driver = ProbeDriver(call_cost)
+        if mode == 'arbiter':
+            arbiter = InputArbiter(driver)
+            arbiter.start()
+            combo = InputTester(arbiter.producer('combo', priority=PRIORITY_HIGH))
+            mouse = InputTester(arbiter.producer('mouse'))
+            text = InputTester(arbiter.producer('text', priority=PRIORITY_LOW, rate_limit=text_rate))
+        else:
+            arbiter = None
+            combo = mouse = text = InputTester(driver)
+
+        threads = [
+            threading.Thread(target=combo_producer, args=(combo, combos, arbiter is not None)),
+            threading.Thread(target=mouse_producer, args=(mouse, duration, 1000.0)),
+            threading.Thread(target=text_producer, args=(text, text_keys)),
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if arbiter is not None:
+            arbiter.stop(timeout=30.0)
+        elapsed = time.perf_counter() - start
+
+        result = {
+            'elapsed_seconds': elapsed,
+            'driver_calls': len(driver.events),
+            'max_concurrent_driver_calls': driver.max_active,
+            'broken_combos': broken_combos(driver.events),
+        }
+        if arbiter is not None:
+            result['producers'] = arbiter.stats()['producers']
+        results[mode] = result
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='多生产者输入仲裁基准')
+    parser.add_argument('--duration', type=float, default=2.0, help='鼠标生产者运行时长(秒)')
+    parser.add_argument('--combos', type=int, default=1000, help='Shift+A组合键次数')
+    parser.add_argument('--text-keys', type=int, default=500, help='文本生产者按键次数')
+    parser.add_argument('--text-rate', type=float, default=400.0, help='文本生产者速率上限(事件/秒)')
+    parser.add_argument('--call-cost', type=float, default=0.00002, help='每次驱动调用的模拟耗时(秒)')
+    args = parser.parse_args()
+    print(json.dumps(run(args.duration, args.combos, args.text_keys, args.text_rate, args.call_cost), indent=4))
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""异步输入基准: N个定时序列(反复按键: 按下press_time后释放，再等待interval_time)同时运行，
+对比每个序列一个线程(InputTester.press_key + time.sleep，界面原有做法)与
+单个事件循环线程运行N个协程(AsyncInputTester)时的按下时长误差、周期漂移、线程数和CPU占用。
+
+替身驱动通过contextvars区分事件来自哪个序列(线程和协程各自拥有独立的上下文)。
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import threading
+import time
+
+from async_input_tester import AsyncInputTester, LoopTimer
+from driver_backends import NullBackend
+from input_tester import InputTester
+
+SEQUENCE = contextvars.ContextVar('sequence', default=0)
+
+
+class HoldProbeDriver(NullBackend):
+    """记录每个序列实际按下时长和每次按下时间的替身驱动"""
+
+    def __init__(self):
+        self.down_at = {}
+        self.holds = []
+        self.presses = {}
+
+    def KeyDown(self, vk_code):
+        now = time.perf_counter()
+        sequence = SEQUENCE.get()
+        self.down_at[sequence] = now
+        self.presses.setdefault(sequence, []).append(now)
+
+    def KeyUp(self, vk_code):
+        now = time.perf_counter()
+        down_at = self.down_at.pop(SEQUENCE.get(), None)
+        if down_at is not None:
+            self.holds.append(now - down_at)
+
+
+def percentile(samples, p) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(p / 100.0 * len(samples)))]
+
+
+def summarize(driver, sequences, cycles, press_time, interval_time, wall, cpu, threads) -> dict:
+    errors = [abs(hold - press_time) * 1e6 for hold in driver.holds]
+    period = press_time + interval_time
+    # 每个序列最后一次按下相对理想时刻(第一次按下 + (cycles-1)*周期)的漂移
+    drift = [(times[-1] - times[0] - (cycles - 1) * period) * 1e3
+             for times in driver.presses.values() if len(times) == cycles]
+    return {
+        'sequences': sequences,
+        'presses': len(driver.holds),
+        'expected_presses': sequences * cycles,
+        'hold_error_p50_us': percentile(errors, 50) if errors else 0.0,
+        'hold_error_p99_us': percentile(errors, 99) if errors else 0.0,
+        'hold_error_max_us': max(errors) if errors else 0.0,
+        'drift_p50_ms': percentile(drift, 50) if drift else 0.0,
+        'drift_max_ms': max(drift) if drift else 0.0,
+        'wall_seconds': wall,
+        'cpu_percent': cpu / wall * 100.0 if wall > 0 else 0.0,
+        'threads': threads,
+    }
+
+
+def run_threads(sequences: int, cycles: int, press_time: float, interval_time: float) -> dict:
+    driver = HoldProbeDriver()
+    tester = InputTester(driver)
+
+    def sequence(index):
+        SEQUENCE.set(index)
+        for _ in range(cycles):
+            tester.press_key('a', press_time)
+            time.sleep(interval_time)
+
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    workers = [threading.Thread(target=sequence, args=(i + 1,), daemon=True) for i in range(sequences)]
+    for worker in workers:
+        worker.start()
+    peak_threads = threading.active_count()
+    for worker in workers:
+        worker.join()
+    return summarize(driver, sequences, cycles, press_time, interval_time,
+                     time.perf_counter() - start, time.process_time() - cpu_start, peak_threads)
+
+
+def run_async(sequences: int, cycles: int, press_time: float, interval_time: float,
+              spin_threshold: float) -> dict:
+    driver = HoldProbeDriver()
+    timer = LoopTimer(spin_threshold=spin_threshold)
+    tester = AsyncInputTester(InputTester(driver), timer)
+    period = press_time + interval_time
+
+    async def sequence(index, start):
+        SEQUENCE.set(index)
+        for cycle in range(cycles):
+            await timer.sleep_until(start + cycle * period)
+            await tester.press_key('a', press_time)
+
+    async def main():
+        start = time.perf_counter() + 0.01  # 留出创建协程的时间，使第一次按下也按计划进行
+        await asyncio.gather(*(sequence(i + 1, start) for i in range(sequences)))
+        return timer.stats()
+
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    timing = asyncio.run(main())
+    result = summarize(driver, sequences, cycles, press_time, interval_time,
+                       time.perf_counter() - start, time.process_time() - cpu_start,
+                       threading.active_count())
+    result['wake_p99_us'] = timing['jitter_p99_us']
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='异步输入基准(线程/序列 vs 单事件循环)')
+    parser.add_argument('--sequences', type=int, nargs='+', default=[10, 100, 500],
+                        help='同时运行的序列数')
+    parser.add_argument('--cycles', type=int, default=20, help='每个序列的按键次数')
+    parser.add_argument('--press-time', type=float, default=20.0, help='按下时长(毫秒)')
+    parser.add_argument('--interval-time', type=float, default=10.0, help='释放后的等待时间(毫秒)')
+    parser.add_argument('--spin-threshold', type=float, default=0.002, help='LoopTimer自旋阈值(秒)')
+    args = parser.parse_args()
+
+    press_time = args.press_time / 1000.0
+    interval_time = args.interval_time / 1000.0
+    results = []
+    for count in args.sequences:
+        results.append({
+            'sequences': count,
+            'thread_per_task': run_threads(count, args.cycles, press_time, interval_time),
+            'async': run_async(count, args.cycles, press_time, interval_time, args.spin_threshold),
+        })
+    print(json.dumps({
+        'cycles': args.cycles,
+        'press_time_ms': args.press_time,
+        'interval_time_ms': args.interval_time,
+        'results': results,
+    }, indent=4))
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""逐个事件发送与批量发送的吞吐量对比"""
+
+import argparse
+import json
+
+from input_tester import InputTester, KeyBatch, ACTION_KEY_DOWN, ACTION_KEY_UP
+from driver_backends import NullBackend
+from benchmarks.common import CtypesStubDriver, measure
+
+KEYS = ['w', 'a', 's', 'd', 'space', 'shift', 'F5', 'enter']
+
+
+def run(events: int) -> dict:
+    results = {}
+    for name, driver in (('null_backend', NullBackend()), ('ctypes_stub', CtypesStubDriver())):
+        tester = InputTester(driver)
+        pairs = events // 2
+
+        def per_event(n):
+            for i in range(pairs):
+                key = KEYS[i % len(KEYS)]
+                tester.key_down(key)
+                tester.key_up(key)
+
+        batch = KeyBatch.from_events(
+            (action, KEYS[i % len(KEYS)], 0.0)
+            for i in range(pairs)
+            for action in (ACTION_KEY_DOWN, ACTION_KEY_UP)
+        )
+
+        results[name] = {
+            'per_event': measure(per_event, pairs * 2),
+            'send_batch': measure(lambda n: tester.send_batch(batch), len(batch)),
+        }
+        results[name]['speedup'] = (results[name]['per_event']['seconds']
+                                    / results[name]['send_batch']['seconds'])
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='批量按键发送基准')
+    parser.add_argument('--events', type=int, default=10000, help='事件总数')
+    args = parser.parse_args()
+    print(json.dumps(run(args.events), indent=4))
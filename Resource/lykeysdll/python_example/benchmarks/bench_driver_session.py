@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""驱动会话复用基准: 使用模拟加载耗时的替身驱动，比较每次都卸载重载(原流程)、
+无其他客户端时打开会话(冷启动)、另一进程已持有会话时打开会话(复用)三种情况下
+从开始初始化到第一个输入事件发出的耗时，并确认最后一个客户端退出时才卸载驱动"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from driver_backends import NullBackend
+from driver_session import DriverSession
+
+
+class SlowLoadBackend(NullBackend):
+    """加载/卸载/打开句柄带有固定耗时的替身驱动，加载状态保存在文件中以便跨进程共享"""
+
+    def __init__(self, marker: str, load_cost: float, unload_cost: float, handle_cost: float):
+        self.marker = marker
+        self.load_cost = load_cost
+        self.unload_cost = unload_cost
+        self.handle_cost = handle_cost
+        self.loads = 0
+        self.unloads = 0
+
+    def LoadNTDriver(self, driver_name, driver_path):
+        time.sleep(self.load_cost)
+        with open(self.marker, 'w'):
+            pass
+        self.loads += 1
+        return True
+
+    def UnloadNTDriver(self, driver_name):
+        if os.path.exists(self.marker):
+            time.sleep(self.unload_cost)
+            os.remove(self.marker)
+            self.unloads += 1
+        return True
+
+    def SetHandle(self):
+        time.sleep(self.handle_cost)
+        return True
+
+    def GetDriverStatus(self):
+        return self.DEVICE_STATUS_READY if os.path.exists(self.marker) else 0
+
+
+def make_driver(state_dir: str, args) -> SlowLoadBackend:
+    return SlowLoadBackend(os.path.join(state_dir, 'loaded.marker'),
+                           args.load_cost, args.unload_cost, args.handle_cost)
+
+
+def legacy_first_event(driver) -> float:
+    start = time.perf_counter()
+    driver.UnloadNTDriver(b'lykeys')
+    driver.LoadNTDriver(b'lykeys', b'lykeys.sys')
+    driver.SetHandle()
+    driver.KeyDown(0x41)
+    elapsed = time.perf_counter() - start
+    driver.UnloadNTDriver(b'lykeys')
+    return elapsed
+
+
+def session_first_event(driver, state_dir: str):
+    start = time.perf_counter()
+    session = DriverSession(driver, 'lykeys.sys', state_dir=state_dir)
+    session.open()
+    driver.KeyDown(0x41)
+    elapsed = time.perf_counter() - start
+    return elapsed, session
+
+
+def hold(state_dir: str, args) -> None:
+    """作为另一个客户端进程持有会话，直到标准输入关闭"""
+    session = DriverSession(make_driver(state_dir, args), 'lykeys.sys', state_dir=state_dir)
+    session.open()
+    print('ready', flush=True)
+    sys.stdin.read()
+    session.close()
+
+
+def summarize(samples) -> dict:
+    return {
+        'median_ms': statistics.median(samples) * 1e3,
+        'min_ms': min(samples) * 1e3,
+        'max_ms': max(samples) * 1e3,
+    }
+
+
+def run(args) -> dict:
+    with tempfile.TemporaryDirectory() as state_dir:
+        driver = make_driver(state_dir, args)
+
+        legacy = [legacy_first_event(driver) for _ in range(args.runs)]
+
+        cold = []
+        for _ in range(args.runs):
+            elapsed, session = session_first_event(driver, state_dir)
+            cold.append(elapsed)
+            session.close()
+
+        # 另一个进程持有会话时复用
+        holder = subprocess.Popen(
+            [sys.executable, '-m', 'benchmarks.bench_driver_session', '--hold', state_dir,
+             '--load-cost', str(args.load_cost), '--unload-cost', str(args.unload_cost),
+             '--handle-cost', str(args.handle_cost)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        holder.stdout.readline()
+        warm = []
+        reused = True
+        unloads_before = driver.unloads
+        for _ in range(args.runs):
+            elapsed, session = session_first_event(driver, state_dir)
+            warm.append(elapsed)
+            reused = reused and session.reused
+            session.close()
+        kept_loaded = driver.unloads == unloads_before and driver.GetDriverStatus() == driver.DEVICE_STATUS_READY
+        holder.stdin.close()
+        holder.wait()
+        unloaded_by_last = not os.path.exists(driver.marker)
+
+        return {
+            'runs': args.runs,
+            'load_cost_ms': args.load_cost * 1e3,
+            'unload_cost_ms': args.unload_cost * 1e3,
+            'handle_cost_ms': args.handle_cost * 1e3,
+            'legacy_reload': summarize(legacy),
+            'session_cold': summarize(cold),
+            'session_reuse': summarize(warm),
+            'all_reused': reused,
+            'kept_loaded_while_other_client_alive': kept_loaded,
+            'unloaded_when_last_client_exited': unloaded_by_last,
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='驱动会话复用基准')
+    parser.add_argument('--runs', type=int, default=10, help='每种情况的重复次数')
+    parser.add_argument('--load-cost', type=float, default=0.15, help='模拟的驱动加载耗时(秒)')
+    parser.add_argument('--unload-cost', type=float, default=0.05, help='模拟的驱动卸载耗时(秒)')
+    parser.add_argument('--handle-cost', type=float, default=0.002, help='模拟的打开句柄耗时(秒)')
+    parser.add_argument('--hold', metavar='STATE_DIR', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.hold:
+        hold(args.hold, args)
+    else:
+        print(json.dumps(run(args), indent=4))
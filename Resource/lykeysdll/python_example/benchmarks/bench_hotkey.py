@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""键盘钩子热键匹配基准: 原先逐个遍历热键 vs 按触发键索引
+
+用合成的KBDLLHOOKSTRUCT序列模拟钩子回调(包括从lParam取出结构体)，
+在注册不同数量的热键时统计每个键盘事件的处理耗时，并核对两种方式触发的回调序列一致。
+"""
+
+import argparse
+import ctypes
+import json
+import random
+import time
+
+from hook_types import KBDLLHOOKSTRUCT, WM_KEYDOWN, WM_KEYUP
+from hotkey_matcher import HotkeyMatcher
+
+MODIFIERS = (0xA2, 0xA0, 0xA4)  # 左Ctrl、左Shift、左Alt
+KEYS = list(range(0x41, 0x5B)) + list(range(0x30, 0x3A)) + list(range(0x70, 0x88))  # A-Z、0-9、F1-F24
+
+
+def make_hotkeys(count: int, rng: random.Random) -> list:
+    """生成热键: 单键与修饰键组合混合"""
+    count = min(count, len(KEYS) * 7)  # 每个键最多有7种修饰键组合
+    hotkeys = []
+    seen = set()
+    while len(hotkeys) < count:
+        key = rng.choice(KEYS)
+        modifiers = tuple(sorted(rng.sample(MODIFIERS, rng.randint(0, 2))))
+        hotkey = key if not modifiers else modifiers + (key,)
+        if hotkey not in seen:
+            seen.add(hotkey)
+            hotkeys.append(hotkey)
+    return hotkeys
+
+
+def make_stream(events: int, rng: random.Random):
+    """生成(wParam, KBDLLHOOKSTRUCT)序列: 随机按住修饰键后敲击普通键"""
+    stream = []
+    while len(stream) < events:
+        modifiers = rng.sample(MODIFIERS, rng.randint(0, 2))
+        key = rng.choice(KEYS)
+        for vk_code in modifiers + [key]:
+            stream.append((WM_KEYDOWN, KBDLLHOOKSTRUCT(vkCode=vk_code)))
+        for vk_code in [key] + modifiers[::-1]:
+            stream.append((WM_KEYUP, KBDLLHOOKSTRUCT(vkCode=vk_code)))
+    return [(w, s, ctypes.addressof(s)) for w, s in stream[:events]]
+
+
+class LegacyHook:
+    """原先的KeyboardHook._hook_callback逻辑"""
+
+    def __init__(self):
+        self.hotkey_callbacks = {}
+        self.pressed_keys = set()
+
+    def callback(self, wParam, lParam):
+        kb_struct = ctypes.cast(lParam, ctypes.POINTER(KBDLLHOOKSTRUCT)).contents
+        vk_code = kb_struct.vkCode
+        if wParam == WM_KEYDOWN:
+            self.pressed_keys.add(vk_code)
+            for hotkey_combo, callback in self.hotkey_callbacks.items():
+                if isinstance(hotkey_combo, tuple):
+                    if all(key in self.pressed_keys for key in hotkey_combo):
+                        callback()
+                else:
+                    if vk_code == hotkey_combo:
+                        callback()
+        elif wParam == WM_KEYUP:
+            if vk_code in self.pressed_keys:
+                self.pressed_keys.remove(vk_code)
+
+
+class IndexedHook:
+    """使用HotkeyMatcher的KeyboardHook._hook_callback逻辑"""
+
+    def __init__(self):
+        self.matcher = HotkeyMatcher()
+
+    def callback(self, wParam, lParam):
+        kb_struct = KBDLLHOOKSTRUCT.from_address(lParam)
+        vk_code = kb_struct.vkCode
+        if wParam == WM_KEYDOWN:
+            for _, callback in self.matcher.key_down(vk_code):
+                callback()
+        elif wParam == WM_KEYUP:
+            self.matcher.key_up(vk_code)
+
+
+def _run(hook, register, hotkeys, stream) -> tuple:
+    fired = []
+    for hotkey in hotkeys:
+        register(hotkey, lambda hotkey=hotkey: fired.append(hotkey))
+    callback = hook.callback
+    start = time.perf_counter()
+    for wParam, _, lParam in stream:
+        callback(wParam, lParam)
+    elapsed = time.perf_counter() - start
+    return elapsed, fired
+
+
+def run(events: int, counts, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    stream = make_stream(events, rng)
+    results = {}
+    for count in counts:
+        hotkeys = make_hotkeys(count, random.Random(seed + count))
+        legacy = LegacyHook()
+        legacy_seconds, legacy_fired = _run(
+            legacy, legacy.hotkey_callbacks.__setitem__, hotkeys, stream)
+        indexed = IndexedHook()
+        indexed_seconds, indexed_fired = _run(
+            indexed, indexed.matcher.register, hotkeys, stream)
+        results[str(count)] = {
+            'legacy_ns_per_event': legacy_seconds * 1e9 / len(stream),
+            'indexed_ns_per_event': indexed_seconds * 1e9 / len(stream),
+            'speedup': legacy_seconds / indexed_seconds if indexed_seconds > 0 else 0.0,
+            'fired': len(indexed_fired),
+            'fired_matches': legacy_fired == indexed_fired,
+        }
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='热键匹配基准')
+    parser.add_argument('--events', type=int, default=50000, help='键盘事件数')
+    parser.add_argument('--hotkeys', type=int, nargs='+', default=[1, 10, 50, 200], help='注册的热键数量')
+    args = parser.parse_args()
+    print(json.dumps(run(args.events, args.hotkeys), indent=4))
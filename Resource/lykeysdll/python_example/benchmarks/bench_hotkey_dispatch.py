@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""钩子过程耗时: 在钩子中同步执行回调 vs 入队后由分发器执行
+
+用合成的KBDLLHOOKSTRUCT序列模拟钩子回调，热键回调模拟一次耗时的界面操作。
+统计钩子过程本身的耗时分布(决定系统输入链被阻塞多久)以及分发器的队列深度和分发延迟。
+"""
+
+import argparse
+import ctypes
+import json
+import time
+
+from hook_types import KBDLLHOOKSTRUCT, LLKHF_UP, WM_KEYDOWN, WM_KEYUP
+from hotkey_dispatcher import HotkeyDispatcher
+from hotkey_matcher import HotkeyMatcher
+from instrumentation import LatencyHistogram
+from precise_timer import PreciseTimer
+
+HOTKEY = 0x75  # F6
+KEYS = [0x41, 0x53, 0x44, 0x57, HOTKEY]
+
+
+def make_stream(events: int):
+    """生成按键按下/释放交替的事件序列，每5次按键中有1次是热键"""
+    stream = []
+    for i in range(events // 2):
+        vk_code = KEYS[i % len(KEYS)]
+        stream.append((WM_KEYDOWN, KBDLLHOOKSTRUCT(vkCode=vk_code)))
+        stream.append((WM_KEYUP, KBDLLHOOKSTRUCT(vkCode=vk_code, flags=LLKHF_UP)))
+    return [(w, s, ctypes.addressof(s)) for w, s in stream]
+
+
+def _replay(stream, callback, rate: float) -> dict:
+    histogram = LatencyHistogram()
+    perf_counter_ns = time.perf_counter_ns
+    # 只睡眠不自旋: 真实的钩子线程在两次事件之间阻塞于GetMessageW，不占用GIL
+    timer = PreciseTimer(spin_threshold=0.0)
+    timer.start()
+    for i, (wParam, _, lParam) in enumerate(stream):
+        timer.wait_offset(i / rate)
+        start = perf_counter_ns()
+        callback(wParam, lParam)
+        histogram.record(perf_counter_ns() - start)
+    return histogram.snapshot()
+
+
+def run(events: int, rate: float, callback_cost: float, capacity: int) -> dict:
+    stream = make_stream(events)
+    handled = []
+
+    def slow_callback():
+        time.sleep(callback_cost)
+        handled.append(1)
+
+    # 同步: 原先的做法，回调在钩子过程中执行
+    matcher = HotkeyMatcher()
+    matcher.register(HOTKEY, slow_callback)
+
+    def sync_hook(wParam, lParam):
+        kb_struct = KBDLLHOOKSTRUCT.from_address(lParam)
+        if wParam == WM_KEYDOWN:
+            for _, callback in matcher.key_down(kb_struct.vkCode):
+                callback()
+        elif wParam == WM_KEYUP:
+            matcher.key_up(kb_struct.vkCode)
+
+    sync = _replay(stream, sync_hook, rate)
+    sync['callbacks'] = len(handled)
+
+    # 异步: 钩子只入队
+    handled.clear()
+    dispatcher = HotkeyDispatcher(capacity=capacity)
+    dispatcher.matcher.register(HOTKEY, slow_callback)
+    dispatcher.start()
+    push = dispatcher.push
+
+    def queued_hook(wParam, lParam):
+        if wParam == WM_KEYDOWN or wParam == WM_KEYUP:
+            kb_struct = KBDLLHOOKSTRUCT.from_address(lParam)
+            push(kb_struct.vkCode, kb_struct.flags, time.perf_counter_ns())
+
+    queued = _replay(stream, queued_hook, rate)
+    dispatcher.stop()
+    queued['callbacks'] = len(handled)
+    queued['dispatcher'] = dispatcher.stats()
+    return {'sync_hook': sync, 'queued_hook': queued}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='热键回调分发基准')
+    parser.add_argument('--events', type=int, default=4000, help='键盘事件数')
+    parser.add_argument('--rate', type=float, default=2000.0, help='事件速率(个/秒)')
+    parser.add_argument('--cost', type=float, default=2.0, help='单次热键回调耗时(毫秒)')
+    parser.add_argument('--capacity', type=int, default=1024, help='分发队列容量')
+    args = parser.parse_args()
+    print(json.dumps(run(args.events, args.rate, args.cost / 1000.0, args.capacity), indent=4))
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""延迟统计开销: 未开启、开启后与开启再关闭三种状态下的逐个按键吞吐量"""
+
+import argparse
+import json
+
+from input_tester import InputTester
+from benchmarks.common import CtypesStubDriver, measure
+
+
+def run(events: int) -> dict:
+    tester = InputTester(CtypesStubDriver())
+    pairs = events // 2
+
+    def press(n):
+        key_down = tester.key_down
+        key_up = tester.key_up
+        for _ in range(pairs):
+            key_down('a')
+            key_up('a')
+
+    results = {'disabled': measure(press, pairs * 2)}
+    tester.enable_instrumentation()
+    results['enabled'] = measure(press, pairs * 2)
+    results['latency'] = tester.latency_stats()
+    tester.disable_instrumentation()
+    results['re_disabled'] = measure(press, pairs * 2)
+    results['enabled_overhead_ns'] = results['enabled']['ns_per_op'] - results['disabled']['ns_per_op']
+    results['disabled_overhead_ns'] = results['re_disabled']['ns_per_op'] - results['disabled']['ns_per_op']
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='延迟统计开销基准')
+    parser.add_argument('--events', type=int, default=200000, help='事件总数')
+    args = parser.parse_args()
+    print(json.dumps(run(args.events), indent=4))
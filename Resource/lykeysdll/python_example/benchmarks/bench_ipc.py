@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""本地输入服务基准: 在本进程中以空驱动运行InputServer，在独立子进程中运行InputClient，
+分别测量逐个事件发送、批量发送以及多个客户端同时发送时的事件吞吐量、
+每个客户端的请求往返延迟，并确认服务端分发的事件数与客户端发送的一致"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from driver_backends import NullBackend
+from input_arbiter import InputArbiter
+from input_client import InputClient
+from input_server import InputServer
+
+VK_A = 0x41
+
+
+def client_main(args) -> None:
+    """作为客户端子进程发送事件，结果以JSON输出到标准输出"""
+    client = InputClient(args.client)
+    events = args.events
+    start = time.perf_counter()
+    if args.batch <= 1:
+        for _ in range(events // 2):
+            client.KeyDown(VK_A)
+            client.KeyUp(VK_A)
+    else:
+        for i in range(0, events, args.batch):
+            with client.batch():
+                for _ in range(min(args.batch, events - i) // 2):
+                    client.KeyDown(VK_A)
+                    client.KeyUp(VK_A)
+    client.wait_acknowledged()
+    elapsed = time.perf_counter() - start
+    stats = client.stats()
+    client.close()
+    stats['elapsed_seconds'] = elapsed
+    stats['events_per_second'] = stats['events'] / elapsed if elapsed > 0 else 0.0
+    print(json.dumps(stats))
+
+
+def run_clients(address: str, clients: int, events: int, batch: int) -> dict:
+    procs = [subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.bench_ipc', '--client', address,
+         '--events', str(events), '--batch', str(batch)],
+        stdout=subprocess.PIPE, text=True) for _ in range(clients)]
+    start = time.perf_counter()
+    results = [json.loads(proc.communicate()[0]) for proc in procs]
+    elapsed = time.perf_counter() - start
+    total = sum(r['events'] for r in results)
+    return {
+        'clients': clients,
+        'batch': batch,
+        'events': total,
+        'events_per_second': total / elapsed,
+        'per_client': [{
+            'events_per_second': r['events_per_second'],
+            'requests': r['requests'],
+            'errors': r['errors'],
+            'round_trip': r['round_trip'],
+        } for r in results],
+    }
+
+
+def run(args) -> dict:
+    with tempfile.TemporaryDirectory() as state_dir:
+        address = os.path.join(state_dir, 'input.sock') if os.name != 'nt' else \
+            rf'\\.\pipe\lykeys-bench-{os.getpid()}'
+        arbiter = InputArbiter(NullBackend())
+        arbiter.start()
+        server = InputServer(arbiter, address, max_pending=args.max_pending)
+        server.start()
+        try:
+            scenarios = {
+                'single': run_clients(address, 1, args.events, 1),
+                'batched': run_clients(address, 1, args.events, args.batch),
+                'multi_client': run_clients(address, args.clients, args.events, args.batch),
+            }
+            arbiter.stop()
+            sent = sum(s['events'] for s in scenarios.values())
+            server_stats = server.stats()
+        finally:
+            server.stop()
+            arbiter.stop()
+        return {
+            'events_per_client': args.events,
+            'scenarios': scenarios,
+            'events_sent': sent,
+            'events_dispatched': server_stats['dispatched'],
+            'server_disconnected': server_stats['disconnected'],
+            'arbiter_producers': len(arbiter.producers),  # 断开的客户端不残留生产者
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='本地输入服务基准')
+    parser.add_argument('--events', type=int, default=100000, help='每个客户端发送的事件数')
+    parser.add_argument('--batch', type=int, default=64, help='批量发送时每个请求的事件数')
+    parser.add_argument('--clients', type=int, default=4, help='多客户端场景的客户端数')
+    parser.add_argument('--max-pending', type=int, default=4096, help='每个客户端排队事件数上限')
+    parser.add_argument('--client', metavar='ADDRESS', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.client:
+        client_main(args)
+    else:
+        print(json.dumps(run(args), indent=4))
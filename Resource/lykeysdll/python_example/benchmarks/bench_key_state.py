@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""按键状态机回放: 原先的钩子逻辑 vs KeyStateEngine + HotkeyMatcher
+
+生成包含按住自动重复、Alt组合键(WM_SYSKEYDOWN)和注入事件的事件流，
+统计两种逻辑的热键触发次数(与预期的真实按下次数对比)及每个事件的处理耗时。
+"""
+
+import argparse
+import json
+import random
+import time
+
+from hook_types import (WM_KEYDOWN, WM_KEYUP, WM_SYSKEYDOWN, WM_SYSKEYUP,
+                        LLKHF_UP, LLKHF_ALTDOWN, LLKHF_INJECTED)
+from hotkey_matcher import HotkeyMatcher
+from key_state import KeyStateEngine, EDGE_DOWN
+
+VK_LMENU = 0xA4
+VK_F6 = 0x75
+VK_F = 0x46
+TOGGLE = VK_F6              # 单键热键
+ALT_COMBO = (0x12, VK_F)    # Alt+F(通用Alt键)
+KEYS = [0x41, 0x53, 0x44, 0x57]
+
+
+def make_stream(taps: int, rng: random.Random):
+    """生成(message, vk, flags)事件流及每个热键的预期触发次数"""
+    stream = []
+    expected = {TOGGLE: 0, ALT_COMBO: 0}
+    for _ in range(taps):
+        kind = rng.random()
+        if kind < 0.3:
+            # 按住热键一段时间，期间产生自动重复
+            repeats = rng.randint(0, 20)
+            stream.extend([(WM_KEYDOWN, TOGGLE, 0)] * (1 + repeats))
+            stream.append((WM_KEYUP, TOGGLE, LLKHF_UP))
+            expected[TOGGLE] += 1
+        elif kind < 0.5:
+            # Alt+F: 按住Alt后的按键以WM_SYSKEYDOWN/WM_SYSKEYUP送达
+            stream.append((WM_SYSKEYDOWN, VK_LMENU, LLKHF_ALTDOWN))
+            stream.append((WM_SYSKEYDOWN, VK_F, LLKHF_ALTDOWN))
+            stream.append((WM_SYSKEYUP, VK_F, LLKHF_ALTDOWN | LLKHF_UP))
+            stream.append((WM_KEYUP, VK_LMENU, LLKHF_UP))
+            expected[ALT_COMBO] += 1
+        elif kind < 0.6:
+            # 注入的热键(例如其他程序通过SendInput发送)
+            stream.append((WM_KEYDOWN, TOGGLE, LLKHF_INJECTED))
+            stream.append((WM_KEYUP, TOGGLE, LLKHF_INJECTED | LLKHF_UP))
+        else:
+            vk_code = rng.choice(KEYS)
+            stream.append((WM_KEYDOWN, vk_code, 0))
+            stream.append((WM_KEYUP, vk_code, LLKHF_UP))
+    return stream, expected
+
+
+def run_legacy(stream):
+    """原先的KeyboardHook._hook_callback逻辑(只处理WM_KEYDOWN/WM_KEYUP)"""
+    fired = {TOGGLE: 0, ALT_COMBO: 0}
+    hotkeys = {TOGGLE: None, (VK_LMENU, VK_F): None}
+    pressed_keys = set()
+    for message, vk_code, _ in stream:
+        if message == WM_KEYDOWN:
+            pressed_keys.add(vk_code)
+            for hotkey_combo in hotkeys:
+                if isinstance(hotkey_combo, tuple):
+                    if all(key in pressed_keys for key in hotkey_combo):
+                        fired[ALT_COMBO] += 1
+                elif vk_code == hotkey_combo:
+                    fired[TOGGLE] += 1
+        elif message == WM_KEYUP:
+            pressed_keys.discard(vk_code)
+    return fired
+
+
+def run_engine(stream):
+    fired = {TOGGLE: 0, ALT_COMBO: 0}
+    state = KeyStateEngine()
+    matcher = HotkeyMatcher(state)
+    matcher.register(TOGGLE, None)
+    matcher.register(ALT_COMBO, None)
+    feed_message = state.feed_message
+    match = matcher.match
+    for message, vk_code, flags in stream:
+        if feed_message(message, vk_code, flags) == EDGE_DOWN:
+            for hotkey, _ in match(vk_code):
+                fired[hotkey] += 1
+    return fired, state
+
+
+def run(taps: int, seed: int = 0) -> dict:
+    stream, expected = make_stream(taps, random.Random(seed))
+
+    start = time.perf_counter()
+    legacy = run_legacy(stream)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine, state = run_engine(stream)
+    engine_seconds = time.perf_counter() - start
+
+    def named(counts):
+        return {'toggle': counts[TOGGLE], 'alt_combo': counts[ALT_COMBO]}
+
+    return {
+        'events': len(stream),
+        'expected': named(expected),
+        'legacy': dict(named(legacy), ns_per_event=legacy_seconds * 1e9 / len(stream)),
+        'engine': dict(named(engine), ns_per_event=engine_seconds * 1e9 / len(stream),
+                       repeats_suppressed=state.repeats, injected_ignored=state.injected),
+        'engine_matches_expected': engine == expected,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='按键状态机回放基准')
+    parser.add_argument('--taps', type=int, default=20000, help='按键动作数')
+    args = parser.parse_args()
+    print(json.dumps(run(args.taps), indent=4))
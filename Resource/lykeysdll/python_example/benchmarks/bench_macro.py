@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""宏文件写入与回放基准: 百万级事件的写入速度、回放吞吐量、回放时的内存占用及定时精度"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from driver_backends import NullBackend, RecordingBackend
+from headless_runner import run_macro
+from input_tester import InputTester, ACTION_KEY_DOWN, ACTION_KEY_UP
+from macro import MacroWriter
+
+KEYS = [0x57, 0x41, 0x53, 0x44, 0x20]
+
+
+def write_macro(path: str, events: int, interval_ns: int) -> float:
+    start = time.perf_counter()
+    with MacroWriter(path) as writer:
+        for i in range(events // 2):
+            vk_code = KEYS[i % len(KEYS)]
+            writer.write(2 * i * interval_ns, vk_code, ACTION_KEY_DOWN)
+            writer.write((2 * i + 1) * interval_ns, vk_code, ACTION_KEY_UP)
+    return time.perf_counter() - start
+
+
+def run(events: int, timed_events: int, rate: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        # 吞吐量: 时间戳压缩到接近0，测量读取与发送本身的开销
+        path = os.path.join(tmp, 'bulk.lykm')
+        write_seconds = write_macro(path, events, 1)
+        size = os.path.getsize(path)
+
+        tracemalloc.start()
+        result = run_macro(InputTester(NullBackend()), path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # 定时精度: 按真实速率回放
+        timed_path = os.path.join(tmp, 'timed.lykm')
+        write_macro(timed_path, timed_events, int(1e9 / rate))
+        driver = RecordingBackend(capacity=timed_events)
+        timed = run_macro(InputTester(driver), timed_path)
+        expected = (timed_events - 1) / rate
+        return {
+            'events': events,
+            'file_bytes': size,
+            'write_events_per_second': events / write_seconds,
+            'replay_events_per_second': result['events_per_second'],
+            'replay_peak_memory_bytes': peak,
+            'timed': {
+                'events': timed['events'],
+                'rate': rate,
+                'expected_seconds': expected,
+                'elapsed_seconds': timed['elapsed_seconds'],
+                'timing': timed['timing'],
+                'sent_matches': len(driver) == timed_events,
+            },
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='宏文件写入与回放基准')
+    parser.add_argument('--events', type=int, default=1000000, help='吞吐量测试的事件数')
+    parser.add_argument('--timed-events', type=int, default=2000, help='定时精度测试的事件数')
+    parser.add_argument('--rate', type=float, default=1000.0, help='定时精度测试的事件速率(个/秒)')
+    args = parser.parse_args()
+    print(json.dumps(run(args.events, args.timed_events, args.rate), indent=4))
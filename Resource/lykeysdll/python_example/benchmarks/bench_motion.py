@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""鼠标移动发送频率基准: 对比旧的time.sleep逐帧循环与MotionStreamer在125-1000Hz下的
+实际频率、错过的截止时间、定时抖动和CPU占用"""
+
+import argparse
+import json
+import time
+
+import trajectory
+from driver_backends import RecordingBackend
+from input_tester import InputTester
+from motion_streamer import MotionStreamer
+
+
+def legacy_loop(tester, rate: float, duration: float) -> dict:
+    """旧实现: 每帧发送后time.sleep(帧间隔)，实际频率取决于系统sleep精度"""
+    period = 1.0 / rate
+    frames = 0
+    cpu_start = time.thread_time()
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        tester.mouse_move_rel(1, 0)
+        frames += 1
+        time.sleep(period)
+    elapsed = time.perf_counter() - start
+    return {
+        'frames': frames,
+        'achieved_rate': frames / elapsed,
+        'cpu_percent': (time.thread_time() - cpu_start) / elapsed * 100.0,
+    }
+
+
+def streamer_run(tester, rate: float, duration: float, spin_threshold: float) -> dict:
+    streamer = MotionStreamer(tester, rate=rate, spin_threshold=spin_threshold)
+    path = trajectory.linear(int(duration * rate), 0, duration, rate=rate)
+    streamer.play(path)
+    streamer.start()
+    time.sleep(duration)
+    streamer.stop()
+    stats = streamer.stats()
+    return {
+        'frames': stats['ticks'],
+        'achieved_rate': stats['achieved_rate'],
+        'missed_deadlines': stats['missed_deadlines'],
+        'sent': stats['sent'],
+        'expected': path.total(),
+        'jitter_p99_us': stats['timing']['jitter_p99_us'],
+        'jitter_max_us': stats['timing']['jitter_max_us'],
+        'cpu_percent': stats['timing']['cpu_percent'],
+    }
+
+
+def run(rates, duration: float, spin_threshold: float) -> list:
+    results = []
+    for rate in rates:
+        results.append({
+            'rate': rate,
+            'legacy_sleep': legacy_loop(InputTester(RecordingBackend()), rate, duration),
+            'streamer': streamer_run(InputTester(RecordingBackend()), rate, duration, spin_threshold),
+        })
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='鼠标移动发送频率基准')
+    parser.add_argument('--rates', type=float, nargs='+', default=[125, 250, 500, 1000], help='发送频率(Hz)')
+    parser.add_argument('--duration', type=float, default=2.0, help='每项运行时长(秒)')
+    parser.add_argument('--spin-threshold', type=float, default=0.0005, help='截止时间前开始自旋的时间(秒)')
+    args = parser.parse_args()
+    print(json.dumps(run(args.rates, args.duration, args.spin_threshold), indent=4))
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""宏脚本基准: 解释器每条指令的开销(对比逐个调用InputTester方法)、
+编译与载入缓存的耗时(模拟较大的脚本库)以及带等待的脚本的定时精度"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.common import measure
+from driver_backends import NullBackend
+from input_tester import InputTester
+from macro_script import compile_script, execute, load_script
+
+KEYS = ['w', 'a', 's', 'd', 'space']
+
+LIBRARY_SCRIPT = """
+log "开始"
+repeat 10
+    combo ctrl+shift+s 5ms
+    text "The quick brown fox jumps over the lazy dog" 200
+    move 120 -80 100ms 200
+    click left 10ms
+    wheel down 240
+    wait 20ms
+end
+"""
+
+
+def interpreter_overhead(events: int, repeat: int) -> dict:
+    """无等待的按下/释放序列: 解释器 vs 按名称调用InputTester"""
+    tester = InputTester(NullBackend())
+    keys = [KEYS[i % len(KEYS)] for i in range(events // 2)]
+    # down/up语句不产生等待指令
+    program = compile_script('\n'.join(f'down {key}\nup {key}' for key in keys))
+    program.code()  # 指令元组只在首次执行时生成一次
+
+    def methods(n):
+        key_down, key_up = tester.key_down, tester.key_up
+        for key in keys:
+            key_down(key)
+            key_up(key)
+
+    def interpreted(n):
+        execute(program, tester)
+
+    # 取多次运行中最快的一次，减少调度噪声
+    return {
+        'input_tester_methods': min((measure(methods, len(keys) * 2) for _ in range(repeat)),
+                                    key=lambda r: r['seconds']),
+        'interpreter': min((measure(interpreted, len(program)) for _ in range(repeat)),
+                           key=lambda r: r['seconds']),
+    }
+
+
+def library_load(scripts: int) -> dict:
+    """编译scripts个脚本与从__lykcache__载入的耗时"""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(scripts):
+            path = os.path.join(tmp, f'script_{i}.lyks')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(LIBRARY_SCRIPT)
+            paths.append(path)
+
+        start = time.perf_counter()
+        for path in paths:
+            load_script(path, use_cache=False)
+        compile_time = time.perf_counter() - start
+
+        for path in paths:
+            load_script(path)  # 写入缓存
+        start = time.perf_counter()
+        instructions = sum(len(load_script(path)) for path in paths)
+        cached_time = time.perf_counter() - start
+    return {
+        'scripts': scripts,
+        'instructions': instructions,
+        'compile_ms': compile_time * 1e3,
+        'cached_load_ms': cached_time * 1e3,
+        'speedup': compile_time / cached_time if cached_time > 0 else 0.0,
+    }
+
+
+def timed_run(events: int, interval_ms: float) -> dict:
+    tester = InputTester(NullBackend())
+    program = compile_script(f'repeat {events // 2}\n  key a {interval_ms}ms\n  wait {interval_ms}ms\nend')
+    result = execute(program, tester)
+    return {
+        'instructions': result['instructions'],
+        'elapsed_seconds': result['elapsed_seconds'],
+        'scheduled_seconds': result['scheduled_seconds'],
+        'timing': result['timing'],
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='宏脚本编译、缓存与解释执行基准')
+    parser.add_argument('--events', type=int, default=200000, help='开销测试的按键事件数')
+    parser.add_argument('--repeat', type=int, default=5, help='开销测试的重复次数(取最快一次)')
+    parser.add_argument('--scripts', type=int, default=200, help='脚本库中的脚本数')
+    parser.add_argument('--timed-events', type=int, default=1000, help='定时精度测试的事件数')
+    parser.add_argument('--interval', type=float, default=1.0, help='定时精度测试的事件间隔(毫秒)')
+    args = parser.parse_args()
+    print(json.dumps({
+        'overhead': interpreter_overhead(args.events, args.repeat),
+        'library': library_load(args.scripts),
+        'timed': timed_run(args.timed_events, args.interval),
+    }, indent=4, ensure_ascii=False))
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""启动耗时基准: 在独立子进程中以 python -X importtime 导入各入口模块，统计导入耗时
+(多次取中位数)和自身耗时最多的依赖模块，并检查导入时不解析命令行参数。
+LAZY_MODULES中列出的依赖应在使用时才导入，入口模块导入时已加载的列在eager_imports中。
+
+指定--baseline时与保存的结果比较，任一模块超出基准的比例大于--threshold时以状态码1退出，
+可用于防止启动耗时回退:
+    python -m benchmarks.bench_startup --save startup_baseline.json
+    python -m benchmarks.bench_startup --baseline startup_baseline.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import find_regressions, machine_info
+
+MODULES = ['gui', 'lykeys', 'headless_runner', 'input_tester', 'driver_manager']
+
+# 入口模块导入时不应加载的依赖(界面启动只需要窗口和驱动相关模块)
+LAZY_MODULES = {
+    'gui': ['headless_runner', 'macro_script', 'macro', 'motion_streamer', 'rapid_stats',
+            'trajectory', 'async_input_tester', 'asyncio', 'numpy'],
+}
+
+# 模拟被其他工具导入时带有无关的命令行参数
+SIDE_EFFECT_ARGV = ['tool', '--unrelated-option']
+
+
+def import_time(module: str):
+    """在子进程中导入模块一次
+
+    Returns:
+        tuple: (模块累计导入耗时(微秒), {依赖模块: 自身耗时(微秒)})，导入失败时返回(None, 错误信息)
+    """
+    code = f"import sys; sys.argv = {SIDE_EFFECT_ARGV!r}; import {module}"
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, cwd=os.getcwd())
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return None, lines[-1] if lines else f"exit code {proc.returncode}"
+
+    total = None
+    self_times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        self_times[name] = int(self_us)
+        if name == module:
+            total = int(cumulative_us)
+    return total, self_times
+
+
+def measure(module: str, runs: int, top: int) -> dict:
+    totals = []
+    self_times = {}
+    for _ in range(runs):
+        total, detail = import_time(module)
+        if total is None:
+            return {'error': detail}
+        totals.append(total)
+        for name, us in detail.items():
+            self_times.setdefault(name, []).append(us)
+    heaviest = sorted(((statistics.median(v), k) for k, v in self_times.items()), reverse=True)[:top]
+    eager = [name for name in LAZY_MODULES.get(module, ()) if name in self_times]
+    return {
+        'import_ms': statistics.median(totals) / 1000.0,
+        'import_ms_min': min(totals) / 1000.0,
+        'modules_imported': len(self_times),
+        'heaviest': [{'module': name, 'self_ms': us / 1000.0} for us, name in heaviest],
+        'eager_imports': [{'module': name, 'self_ms': statistics.median(self_times[name]) / 1000.0}
+                          for name in eager],
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='启动耗时基准(-X importtime)')
+    parser.add_argument('--modules', nargs='+', default=MODULES, help='要测量的模块')
+    parser.add_argument('--runs', type=int, default=5, help='每个模块的导入次数(取中位数)')
+    parser.add_argument('--top', type=int, default=5, help='列出自身耗时最多的依赖模块数')
+    parser.add_argument('--save', help='把结果保存为基准文件')
+    parser.add_argument('--baseline', help='与指定的基准文件比较')
+    parser.add_argument('--threshold', type=float, default=0.2, help='允许超出基准的比例')
+    args = parser.parse_args()
+
+    results = {module: measure(module, args.runs, args.top) for module in args.modules}
+    output = {'machine': machine_info(), 'modules': results}
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+    eager = {module: result['eager_imports'] for module, result in results.items() if result.get('eager_imports')}
+    exit_code = 1 if eager else 0
+    if eager:
+        output['eager_imports'] = eager
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = find_regressions(results, json.load(f), 'import_ms', args.threshold)
+        output['regressions'] = regressions
+        if regressions:
+            exit_code = 1
+    print(json.dumps(output, indent=4, ensure_ascii=False))
+    sys.exit(exit_code)
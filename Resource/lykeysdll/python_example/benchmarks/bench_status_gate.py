@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""热路径状态检查开销: 同步节流查询 vs 后台监视器缓存状态
+
+驱动状态查询被模拟为一次耗时的系统调用，统计每次检查的耗时分布以及达到一次查询耗时的延迟尖峰次数。
+"""
+
+import argparse
+import json
+import time
+
+from input_tester import InputTester
+from driver_backends import NullBackend
+from instrumentation import LatencyHistogram
+
+
+class SlowStatusDriver(NullBackend):
+    """状态查询耗时固定的替身驱动"""
+
+    def __init__(self, query_cost: float):
+        self.query_cost = query_cost
+
+    def CheckDeviceStatus(self):
+        time.sleep(self.query_cost)
+        return 0
+
+
+def _measure(tester: InputTester, duration: float, query_cost: float) -> dict:
+    check = tester._check_device_status
+    perf_counter_ns = time.perf_counter_ns
+    histogram = LatencyHistogram()
+    spike_ns = int(query_cost * 1e9)
+    spikes = 0
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        start = perf_counter_ns()
+        check()
+        cost = perf_counter_ns() - start
+        histogram.record(cost)
+        if cost >= spike_ns:
+            spikes += 1
+    result = histogram.snapshot()
+    result['spikes'] = spikes  # 耗时不低于一次状态查询的检查次数
+    return result
+
+
+def run(duration: float, query_cost: float, interval: float) -> dict:
+    inline = InputTester(SlowStatusDriver(query_cost))
+    inline.check_interval = interval
+    monitored = InputTester(SlowStatusDriver(query_cost))
+    monitored.start_health_monitor(interval)
+    try:
+        return {
+            'inline': _measure(inline, duration, query_cost),
+            'monitor': _measure(monitored, duration, query_cost),
+        }
+    finally:
+        monitored.stop_health_monitor()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='驱动状态检查开销基准')
+    parser.add_argument('--duration', type=float, default=3.0, help='每种方式的运行时长(秒)')
+    parser.add_argument('--query-cost', type=float, default=0.5, help='单次状态查询耗时(毫秒)')
+    parser.add_argument('--interval', type=float, default=0.5, help='状态查询间隔(秒)')
+    args = parser.parse_args()
+    print(json.dumps(run(args.duration, args.query_cost / 1000.0, args.interval), indent=4))
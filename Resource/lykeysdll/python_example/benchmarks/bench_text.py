@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""文本编译与回放基准: 编译耗时、缓存命中耗时、实际输入速度及回放正确性"""
+
+import argparse
+import json
+import random
+import string
+import time
+
+from input_tester import InputTester
+from text_compiler import compile_text
+from virtuakeys_mapping import VirtualKeys
+from driver_backends import RecordingBackend
+
+SHIFT_VK = VirtualKeys.get_vk_code('shift')
+
+
+def decode(calls) -> str:
+    """根据RecordingBackend的记录还原出输入的文本"""
+    unshifted = {}
+    shifted = {}
+    for char in string.ascii_lowercase + string.digits + " `-=[]\\;',./":
+        vk_code = VirtualKeys.get_vk_code(char)
+        if vk_code is not None:
+            unshifted.setdefault(vk_code, char)
+    for char in string.ascii_uppercase:
+        shifted[VirtualKeys.get_vk_code(char)] = char
+    for char in VirtualKeys.SHIFT_CHARS:
+        shifted[VirtualKeys.get_vk_code(char)] = char
+    unshifted[VirtualKeys.get_vk_code('+')] = '='
+
+    text = []
+    shift = False
+    for name, vk_code, _, _ in calls:
+        if vk_code == SHIFT_VK:
+            shift = name == 'KeyDown'
+        elif name == 'KeyDown':
+            text.append((shifted if shift else unshifted).get(vk_code, '?'))
+    return ''.join(text)
+
+
+def run(chars: int, chars_per_second: float, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + " ,.!?-_@#()"
+    text = ''.join(rng.choice(alphabet) for _ in range(chars))
+    # '+'与'='共用键位，避免还原时产生歧义
+    text = text.replace('+', '')
+
+    compile_text.cache_clear()
+    start = time.perf_counter()
+    plan = compile_text(text, chars_per_second)
+    compile_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compile_text(text, chars_per_second)
+    cached_seconds = time.perf_counter() - start
+
+    driver = RecordingBackend(capacity=len(plan))
+    tester = InputTester(driver)
+    start = time.perf_counter()
+    tester.send_batch(plan.batch)
+    replay_seconds = time.perf_counter() - start
+
+    calls = driver.records()
+    shift_toggles = sum(1 for _, vk_code, _, _ in calls if vk_code == SHIFT_VK)
+    return {
+        'chars': len(text),
+        'events': len(plan),
+        'shift_toggles': shift_toggles,
+        'compile_ms': compile_seconds * 1000,
+        'cached_compile_us': cached_seconds * 1e6,
+        'target_cps': chars_per_second,
+        'achieved_cps': len(text) / replay_seconds if replay_seconds > 0 else 0.0,
+        'replay_seconds': replay_seconds,
+        'decoded_matches': decode(calls) == text,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='文本编译与回放基准')
+    parser.add_argument('--chars', type=int, default=1000, help='文本长度')
+    parser.add_argument('--cps', type=float, default=200.0, help='目标输入速度(字符/秒)')
+    args = parser.parse_args()
+    print(json.dumps(run(args.chars, args.cps), indent=4))
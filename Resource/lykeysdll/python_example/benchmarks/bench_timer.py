@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""高频测试定时对比: 忙等待(相对上一周期) vs PreciseTimer(绝对截止时间)"""
+
+import argparse
+import json
+import time
+
+from precise_timer import PreciseTimer
+
+
+def _summary(lateness, wall, cpu, cycles, period) -> dict:
+    samples = sorted(lateness)
+    count = len(samples)
+
+    def percentile(p):
+        return samples[min(count - 1, int(p / 100.0 * count))] * 1e6
+
+    return {
+        'jitter_p50_us': percentile(50),
+        'jitter_p99_us': percentile(99),
+        'jitter_max_us': samples[-1] * 1e6,
+        'drift_ms': (wall - cycles * period) * 1000,
+        'cpu_percent': cpu / wall * 100.0,
+    }
+
+
+def run_busy_loop(cycles: int, press_time: float, interval_time: float) -> dict:
+    """复现优化前_run_rapid_test的等待方式"""
+    period = press_time + interval_time
+    lateness = []
+    start = time.perf_counter()
+    cpu_start = time.thread_time()
+    for cycle in range(cycles):
+        current_time = time.perf_counter()
+        lateness.append(current_time - (start + cycle * period))
+        while time.perf_counter() - current_time < press_time:
+            pass
+        while time.perf_counter() - current_time < period:
+            pass
+    wall = time.perf_counter() - start
+    return _summary(lateness, wall, time.thread_time() - cpu_start, cycles, period)
+
+
+def run_precise(cycles: int, press_time: float, interval_time: float, spin_threshold: float) -> dict:
+    period = press_time + interval_time
+    timer = PreciseTimer(spin_threshold=spin_threshold)
+    timer.start()
+    lateness = []
+    for cycle in range(cycles):
+        offset = cycle * period
+        lateness.append(timer.wait_offset(offset))
+        timer.wait_offset(offset + press_time)
+    timer.wait_offset(cycles * period)
+    stats = timer.stats()
+    result = _summary(lateness, timer.elapsed(), 0.0, cycles, period)
+    result['cpu_percent'] = stats['cpu_percent']
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='定时器抖动与CPU占用基准')
+    parser.add_argument('--cycles', type=int, default=500, help='按键周期数')
+    parser.add_argument('--press', type=float, default=5.0, help='按下时间(毫秒)')
+    parser.add_argument('--interval', type=float, default=5.0, help='间隔时间(毫秒)')
+    parser.add_argument('--spin', type=float, default=2.0, help='自旋阈值(毫秒)')
+    args = parser.parse_args()
+    press, interval = args.press / 1000.0, args.interval / 1000.0
+    print(json.dumps({
+        'busy_loop': run_busy_loop(args.cycles, press, interval),
+        'precise_timer': run_precise(args.cycles, press, interval, args.spin / 1000.0),
+    }, indent=4))
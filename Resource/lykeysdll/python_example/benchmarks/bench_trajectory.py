@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""鼠标轨迹生成基准: 1kHz采样下各类轨迹的生成耗时(NumPy与纯Python)、位移总和是否精确，
+以及与旧的逐步截断实现相比的累计误差"""
+
+import argparse
+import json
+import math
+import time
+
+import trajectory
+
+
+def legacy_linear(dx: int, dy: int, steps: int) -> list:
+    """旧实现: 每步位移int()截断"""
+    step_x = dx / steps
+    step_y = dy / steps
+    return [(int(step_x), int(step_y))] * steps
+
+
+def legacy_orbit(radius: float, angle_step: float, steps: int) -> list:
+    """旧实现: 逐帧计算三角函数并把单帧位移钳制在±5"""
+    angle = 0.0
+    last_x = last_y = 0
+    deltas = []
+    for _ in range(steps):
+        dx = int(radius * math.cos(angle)) - last_x
+        dy = int(radius * math.sin(angle)) - last_y
+        if abs(dx) > 5 or abs(dy) > 5:
+            dx = max(min(dx, 5), -5)
+            dy = max(min(dy, 5), -5)
+        last_x += dx
+        last_y += dy
+        deltas.append((dx, dy))
+        angle += angle_step
+    return deltas
+
+
+def time_best(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_generators(durations, rate: float, repeat: int) -> list:
+    modes = [False, True] if trajectory.HAS_NUMPY else [False]
+    cases = {
+        'linear': lambda d, np_: trajectory.linear(1234, -567, d, rate, use_numpy=np_),
+        'ease_in_out': lambda d, np_: trajectory.linear(1234, -567, d, rate, 'ease_in_out', use_numpy=np_),
+        'bezier': lambda d, np_: trajectory.bezier(1234, -567, [(300, -900), (900, 400)], d, rate, use_numpy=np_),
+        'orbit': lambda d, np_: trajectory.orbit(200, d, rate, use_numpy=np_),
+    }
+    results = []
+    for name, make in cases.items():
+        for duration in durations:
+            for use_numpy in modes:
+                path = make(duration, use_numpy)
+                seconds = time_best(lambda: make(duration, use_numpy), repeat)
+                results.append({
+                    'path': name,
+                    'duration': duration,
+                    'frames': len(path),
+                    'numpy': use_numpy,
+                    'generate_ms': seconds * 1e3,
+                    'ns_per_frame': seconds * 1e9 / len(path),
+                    'total': path.total(),
+                })
+    return results
+
+
+def bench_accuracy() -> dict:
+    # 旧的相对平滑移动: 10步截断
+    dx, dy = 257, 133
+    legacy = legacy_linear(dx, dy, 10)
+    current = trajectory.linear(dx, dy, 0.2, rate=50)
+
+    # 旧的自动移动: 半径50，每帧0.05弧度，转一圈
+    steps = int(round(2 * math.pi / 0.05))
+    old_orbit = legacy_orbit(50, 0.05, steps)
+    new_orbit = trajectory.orbit(50, steps * 0.016, rate=1 / 0.016)
+    return {
+        'linear_target': (dx, dy),
+        'linear_legacy_total': tuple(map(sum, zip(*legacy))),
+        'linear_total': current.total(),
+        'orbit_legacy_drift_per_revolution': tuple(map(sum, zip(*old_orbit))),
+        'orbit_drift_per_revolution': new_orbit.total(),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='鼠标轨迹生成基准')
+    parser.add_argument('--durations', type=float, nargs='+', default=[0.1, 1.0, 10.0], help='轨迹时长(秒)')
+    parser.add_argument('--rate', type=float, default=1000.0, help='采样率(帧/秒)')
+    parser.add_argument('--repeat', type=int, default=5, help='每项重复次数(取最快)')
+    args = parser.parse_args()
+    print(json.dumps({
+        'numpy': trajectory.HAS_NUMPY,
+        'generators': bench_generators(args.durations, args.rate, args.repeat),
+        'accuracy': bench_accuracy(),
+    }, indent=4))
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""持续负载下的界面事件队列深度: 每次按键after(0) vs UIPump定时合并刷新"""
+
+import argparse
+import heapq
+import itertools
+import json
+import threading
+import time
+
+from precise_timer import PreciseTimer
+from ui_pump import UIPump
+
+
+class FakeRoot:
+    """模拟Tk主循环: after()把回调放入定时队列，run()在主线程中逐个执行"""
+
+    def __init__(self, callback_cost: float):
+        self.callback_cost = callback_cost
+        self._lock = threading.Lock()
+        self._queue = []
+        self._ids = itertools.count()
+        self._cancelled = set()
+        self.scheduled = 0
+        self.executed = 0
+        self.max_depth = 0
+
+    def after(self, ms, func, *args):
+        after_id = next(self._ids)
+        with self._lock:
+            heapq.heappush(self._queue, (time.perf_counter() + ms / 1000.0, after_id, func, args))
+            self.scheduled += 1
+            self.max_depth = max(self.max_depth, len(self._queue))
+        return after_id
+
+    def after_cancel(self, after_id):
+        self._cancelled.add(after_id)
+
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def run(self, until: float):
+        while time.perf_counter() < until:
+            with self._lock:
+                item = None
+                if self._queue and self._queue[0][0] <= time.perf_counter():
+                    item = heapq.heappop(self._queue)
+            if item is None:
+                time.sleep(0.0005)
+                continue
+            _, after_id, func, args = item
+            if after_id in self._cancelled:
+                continue
+            time.sleep(self.callback_cost)  # 模拟控件刷新耗时
+            func(*args)
+            self.executed += 1
+
+
+def _produce(rate: float, duration: float, publish):
+    timer = PreciseTimer()
+    timer.start()
+    for count in range(1, int(rate * duration) + 1):
+        timer.wait_offset(count / rate)
+        publish(count)
+
+
+def run_case(mode: str, rate: float, duration: float, callback_cost: float, fps: float) -> dict:
+    root = FakeRoot(callback_cost)
+    rendered = []
+
+    if mode == 'per_press':
+        publish = lambda count: root.after(0, rendered.append, count)
+    else:
+        pump = UIPump(root, fps=fps)
+        pump.bind('press_count', rendered.append)
+        pump.start()
+        publish = lambda count: pump.publish('press_count', count)
+
+    producer = threading.Thread(target=_produce, args=(rate, duration, publish), daemon=True)
+    producer.start()
+    root.run(time.perf_counter() + duration)
+    producer.join()
+    return {
+        'callbacks_scheduled': root.scheduled,
+        'callbacks_executed': root.executed,
+        'max_queue_depth': root.max_depth,
+        'queue_depth_at_end': root.depth(),
+        'last_rendered': rendered[-1] if rendered else 0,
+        'produced': int(rate * duration),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='界面刷新泵队列深度基准')
+    parser.add_argument('--rate', type=float, default=1000.0, help='工作线程更新频率(次/秒)')
+    parser.add_argument('--duration', type=float, default=2.0, help='运行时长(秒)')
+    parser.add_argument('--cost', type=float, default=1.5, help='单次界面刷新耗时(毫秒)')
+    parser.add_argument('--fps', type=float, default=30.0, help='刷新泵帧率')
+    args = parser.parse_args()
+    print(json.dumps({
+        mode: run_case(mode, args.rate, args.duration, args.cost / 1000.0, args.fps)
+        for mode in ('per_press', 'ui_pump')
+    }, indent=4))
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""VirtualKeys.get_vk_code 查找速率对比(逐步解析 vs 预编译查找表)"""
+
+import argparse
+import json
+import random
+
+from virtuakeys_mapping import VirtualKeys
+from benchmarks.common import measure
+
+# 典型按键组合: 文本字符、热键名称、功能键及大小写混用
+TEXT_MIX = list("Hello, World! The quick brown fox jumps over the lazy dog 0123456789")
+NAME_MIX = ['enter', 'ENTER', 'Enter', 'space', 'shift', 'ctrl', 'alt', 'esc', 'tab',
+            'left', 'right', 'up', 'down', 'page_up', 'backspace', 'del']
+FKEY_MIX = [f'F{i}' for i in range(1, 25)] + [f'f{i}' for i in range(1, 13)]
+
+
+def _legacy_get_vk_code(key):
+    """优化前的get_vk_code实现(每次调用重建别名字典)"""
+    if not key:
+        return None
+    if key == ' ':
+        return VirtualKeys.VK_CODE['spacebar']
+    key = key.upper()
+    if key.startswith('F') and len(key) <= 3:
+        try:
+            num = int(key[1:])
+            if 1 <= num <= 24:
+                return VirtualKeys.VK_CODE.get(key)
+        except ValueError:
+            pass
+    if len(key) == 1 and 'A' <= key <= 'Z':
+        return VirtualKeys.VK_CODE[key.lower()]
+    if len(key) == 1 and '0' <= key <= '9':
+        return VirtualKeys.VK_CODE[key]
+    special_keys = {
+        'ENTER': 'enter', 'RETURN': 'enter', 'SPACE': 'spacebar', 'TAB': 'tab',
+        'SHIFT': 'shift', 'CTRL': 'ctrl', 'CONTROL': 'ctrl', 'ALT': 'alt',
+        'ESC': 'esc', 'ESCAPE': 'esc', 'BACKSPACE': 'backspace', 'DELETE': 'del',
+        'INSERT': 'ins', 'HOME': 'home', 'END': 'end', 'PAGEUP': 'page_up',
+        'PAGEDOWN': 'page_down', 'UP': 'up_arrow', 'DOWN': 'down_arrow',
+        'LEFT': 'left_arrow', 'RIGHT': 'right_arrow'
+    }
+    if key in special_keys:
+        return VirtualKeys.VK_CODE.get(special_keys[key])
+    return VirtualKeys.VK_CODE.get(key.lower())
+
+
+def run(lookups: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    mixes = {
+        'text': TEXT_MIX,
+        'names': NAME_MIX,
+        'fkeys': FKEY_MIX,
+        'mixed': TEXT_MIX + NAME_MIX + FKEY_MIX,
+    }
+    results = {}
+    for mix_name, pool in mixes.items():
+        keys = [rng.choice(pool) for _ in range(lookups)]
+
+        def legacy(n):
+            for key in keys:
+                _legacy_get_vk_code(key)
+
+        def indexed(n, get_vk_code=VirtualKeys.get_vk_code):
+            for key in keys:
+                get_vk_code(key)
+
+        old = measure(legacy, lookups)
+        new = measure(indexed, lookups)
+        results[mix_name] = {
+            'legacy': old,
+            'indexed': new,
+            'speedup': old['seconds'] / new['seconds'],
+        }
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='按键查找表基准')
+    parser.add_argument('--lookups', type=int, default=200000, help='每种组合的查找次数')
+    args = parser.parse_args()
+    print(json.dumps(run(args.lookups), indent=4))
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import ctypes
+import ctypes.util
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from driver_backends import NullBackend
+
+
+class CtypesStubDriver(NullBackend):
+    """经由libc函数完成真实ctypes调用的替身驱动，用于衡量Python→C的跨界开销"""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'))
+        self.KeyDown = libc.abs
+        self.KeyUp = libc.abs
+
+
+def measure(func, iterations: int) -> dict:
+    """执行func(iterations)并统计吞吐量
+
+    Args:
+        func: 被测函数，接收迭代次数
+        iterations: 事件数
+
+    Returns:
+        dict: 总耗时、每秒操作数及单次耗时(纳秒)
+    """
+    start = time.perf_counter()
+    func(iterations)
+    elapsed = time.perf_counter() - start
+    return {
+        'events': iterations,
+        'seconds': elapsed,
+        'ops_per_sec': iterations / elapsed if elapsed > 0 else 0.0,
+        'ns_per_op': elapsed * 1e9 / iterations if iterations else 0.0,
+    }
+
+
+def machine_info() -> dict:
+    """运行环境信息，随基准结果一起保存，便于判断基准文件是否可比"""
+    info = {
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'numpy': None,
+        'commit': None,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+    try:
+        import numpy
+        info['numpy'] = numpy.__version__
+    except ImportError:
+        pass
+    try:
+        proc = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True)
+        if proc.returncode == 0:
+            info['commit'] = proc.stdout.strip()
+    except OSError:
+        pass
+    return info
+
+
+def find_regressions(results: dict, baseline: dict, metric: str, threshold: float) -> list:
+    """与基准结果比较(指标越小越好)
+
+    Args:
+        results: {名称: {指标: 值}}
+        baseline: 相同结构的基准结果
+        metric: 比较的指标
+        threshold: 允许超出基准的比例
+
+    Returns:
+        list: 超出基准的项目
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name, {})
+        if metric not in result or metric not in base:
+            continue
+        limit = base[metric] * (1.0 + threshold)
+        if result[metric] > limit:
+            regressions.append({
+                'name': name,
+                metric: result[metric],
+                'baseline': base[metric],
+                'limit': limit,
+            })
+    return regressions
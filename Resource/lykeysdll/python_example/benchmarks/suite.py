@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""输入栈热路径微基准套件
+
+针对空驱动和合成的钩子输入测量各热路径的每秒操作数和单次耗时，不依赖Windows:
+    vk.*          VirtualKeys.get_vk_code
+    tester.*      InputTester.key_down/key_up/mouse_move_rel
+    hook.*        KeyboardHook._hook_callback(从lParam取出KBDLLHOOKSTRUCT并入队)
+    move.*        轨迹生成(trajectory)与逐帧发送循环
+    script.*      宏脚本解释器
+    rapid.*       高频测试的流式按键统计(按键循环中的记录与读取方的汇总)
+
+每项重复多次，以最快一次作为单次耗时(受调度噪声影响最小)，同时给出中位数。
+结果连同运行环境信息保存为JSON，指定--baseline时逐项比较单次耗时，
+任一项超出基准的比例大于--threshold时以状态码1退出:
+    python -m benchmarks.suite --save suite_baseline.json
+    python -m benchmarks.suite --baseline suite_baseline.json --threshold 0.15
+    python -m benchmarks.suite --filter vk. hook.
+"""
+
+import argparse
+import ctypes
+import json
+import statistics
+import sys
+import time
+
+import trajectory
+from benchmarks.common import find_regressions, machine_info
+from driver_backends import NullBackend
+from hook_types import KBDLLHOOKSTRUCT, LLKHF_UP, WM_KEYDOWN, WM_KEYUP
+from hotkey_dispatcher import HotkeyDispatcher
+from instrumentation import LatencyHistogram
+from input_tester import InputTester
+from keyboard_hook import KeyboardHook
+from macro_script import compile_script, execute
+from rapid_stats import RapidStats, RunningStats
+from virtuakeys_mapping import VirtualKeys
+
+TEXT_MIX = list("Hello, World! The quick brown fox jumps over the lazy dog 0123456789")
+NAME_MIX = ['enter', 'ENTER', 'Enter', 'space', 'shift', 'ctrl', 'alt', 'esc', 'tab',
+            'left', 'right', 'up', 'down', 'page_up', 'backspace', 'del', 'F5', 'f12']
+KEYS = ['w', 'a', 's', 'd', 'space', 'shift', 'F5', 'enter']
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str, operations: int):
+    """注册基准
+
+    被注册的函数返回一个无参可调用对象，每次调用执行operations次被测操作。
+    """
+    def register(setup):
+        BENCHMARKS[name] = (setup, operations)
+        return setup
+    return register
+
+
+# ===== VirtualKeys =====
+@benchmark('vk.get_vk_code.text', 100000)
+def bench_vk_text():
+    keys = (TEXT_MIX * (100000 // len(TEXT_MIX) + 1))[:100000]
+    get_vk_code = VirtualKeys.get_vk_code
+
+    def run():
+        for key in keys:
+            get_vk_code(key)
+    return run
+
+
+@benchmark('vk.get_vk_code.names', 100000)
+def bench_vk_names():
+    keys = (NAME_MIX * (100000 // len(NAME_MIX) + 1))[:100000]
+    get_vk_code = VirtualKeys.get_vk_code
+
+    def run():
+        for key in keys:
+            get_vk_code(key)
+    return run
+
+
+# ===== InputTester =====
+@benchmark('tester.key_down', 100000)
+def bench_key_down():
+    tester = InputTester(NullBackend())
+    keys = (KEYS * (100000 // len(KEYS) + 1))[:100000]
+
+    def run():
+        key_down = tester.key_down
+        for key in keys:
+            key_down(key)
+    return run
+
+
+@benchmark('tester.key_down_up', 100000)
+def bench_key_down_up():
+    tester = InputTester(NullBackend())
+    keys = (KEYS * (50000 // len(KEYS) + 1))[:50000]
+
+    def run():
+        key_down, key_up = tester.key_down, tester.key_up
+        for key in keys:
+            key_down(key)
+            key_up(key)
+    return run
+
+
+@benchmark('tester.mouse_move_rel', 100000)
+def bench_mouse_move_rel():
+    tester = InputTester(NullBackend())
+
+    def run():
+        move = tester.mouse_move_rel
+        for _ in range(100000):
+            move(1, -1)
+    return run
+
+
+# ===== 键盘钩子 =====
+class _HookHarness:
+    """提供_hook_callback所需属性的替身(CallNextHookEx不做任何事)"""
+
+    class _User32:
+        @staticmethod
+        def CallNextHookEx(hook_id, nCode, wParam, lParam):
+            return 0
+
+    def __init__(self, capacity: int):
+        self.hook_id = None
+        self.user32 = self._User32()
+        self.dispatcher = HotkeyDispatcher(capacity=capacity)
+
+
+@benchmark('hook.callback', 100000)
+def bench_hook_callback():
+    events = []
+    for i in range(50000):
+        vk_code = 0x41 + i % 26
+        events.append((WM_KEYDOWN, KBDLLHOOKSTRUCT(vkCode=vk_code)))
+        events.append((WM_KEYUP, KBDLLHOOKSTRUCT(vkCode=vk_code, flags=LLKHF_UP)))
+    stream = [(wParam, ctypes.addressof(struct)) for wParam, struct in events]
+    callback = KeyboardHook._hook_callback
+
+    def run():
+        # 分发器不启动，只测钩子过程本身(解析结构体并写入环形缓冲区)
+        harness = _HookHarness(len(stream))
+        for wParam, lParam in stream:
+            callback(harness, 0, wParam, lParam)
+    run.keep_alive = events  # 结构体须在回放期间保持有效
+    return run
+
+
+# ===== 鼠标移动 =====
+@benchmark('move.linear', 1000)
+def bench_linear():
+    def run():
+        trajectory.linear(800, -450, 1.0, rate=1000.0, easing='ease_in_out', use_numpy=False)
+    return run
+
+
+@benchmark('move.orbit', 1000)
+def bench_orbit():
+    def run():
+        trajectory.orbit(50.0, 1.0, rate=1000.0, use_numpy=False)
+    return run
+
+
+class _NoWaitTimer:
+    """不等待的定时器，用于只测量逐帧发送循环的开销"""
+
+    def wait_offset(self, offset):
+        return 0.0
+
+
+@benchmark('move.stream_relative', 10000)
+def bench_stream_relative():
+    tester = InputTester(NullBackend())
+    path = trajectory.orbit(50.0, 10.0, rate=1000.0, use_numpy=False)
+    timer = _NoWaitTimer()
+
+    def run():
+        trajectory.stream_relative(tester, path, timer)
+    return run
+
+
+# ===== 宏脚本 =====
+@benchmark('script.execute', 100000)
+def bench_script_execute():
+    tester = InputTester(NullBackend())
+    keys = (KEYS * (50000 // len(KEYS) + 1))[:50000]
+    program = compile_script('\n'.join(f'down {key}\nup {key}' for key in keys))
+    program.code()
+
+    def run():
+        execute(program, tester)
+    return run
+
+
+# ===== 高频测试统计 =====
+@benchmark('rapid.stats_record', 100000)
+def bench_rapid_stats_record():
+    presses = [(i * 0.001, i * 0.001 + 0.0005 + (i % 7) * 1e-6) for i in range(100000)]
+    stats = RapidStats(capacity=len(presses))
+
+    def run():
+        # 每次运行前重置，使每次按键都走写入预分配数组的路径
+        stats.start(0.0)
+        record = stats.record
+        for down_time, up_time in presses:
+            record(down_time, up_time)
+    return run
+
+
+@benchmark('rapid.stats_summary', 100000)
+def bench_rapid_stats_summary():
+    presses = [(i * 0.001, i * 0.001 + 0.0005 + (i % 7) * 1e-6) for i in range(100000)]
+    stats = RapidStats(capacity=len(presses))
+    stats.start(0.0)
+    for down_time, up_time in presses:
+        stats.record(down_time, up_time)
+
+    def run():
+        # 读取方的汇总开销(界面每秒或测试结束时承担)
+        with stats._lock:
+            stats._folded = 0
+            stats._interval, stats._hold = RunningStats(), RunningStats()
+            stats._interval_histogram, stats._hold_histogram = LatencyHistogram(), LatencyHistogram()
+        stats.summary()
+    return run
+
+
+def measure(name: str, repeat: int) -> dict:
+    setup, operations = BENCHMARKS[name]
+    run = setup()
+    run()  # 预热
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    best = min(samples)
+    return {
+        'operations': operations,
+        'ns_per_op': best * 1e9 / operations,
+        'ns_per_op_median': statistics.median(samples) * 1e9 / operations,
+        'ops_per_sec': operations / best if best > 0 else 0.0,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='输入栈热路径微基准套件')
+    parser.add_argument('--filter', nargs='+', help='只运行名称以指定前缀开头的基准')
+    parser.add_argument('--repeat', type=int, default=7, help='每项的重复次数(取最快一次)')
+    parser.add_argument('--list', action='store_true', help='列出所有基准')
+    parser.add_argument('--save', help='把结果保存为基准文件')
+    parser.add_argument('--baseline', help='与指定的基准文件比较')
+    parser.add_argument('--threshold', type=float, default=0.2, help='允许单次耗时超出基准的比例')
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS
+             if not args.filter or any(name.startswith(prefix) for prefix in args.filter)]
+    if args.list:
+        print('\n'.join(names))
+        sys.exit(0)
+
+    output = {
+        'machine': machine_info(),
+        'repeat': args.repeat,
+        'results': {name: measure(name, args.repeat) for name in names},
+    }
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=4)
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(output['results'], baseline.get('results', {}),
+                                       'ns_per_op', args.threshold)
+        output['baseline_machine'] = baseline.get('machine')
+        output['regressions'] = regressions
+        exit_code = 1 if regressions else 0
+    print(json.dumps(output, indent=4, ensure_ascii=False))
+    sys.exit(exit_code)
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+
+import copy
+import json
+import logging
+import os
+import shutil
+import threading
+from typing import Callable
+
+from driver_backends import BACKENDS
+
+DEFAULT_CONFIG_FILE = "driver_config.json"
+
+# 已知配置节及其类型，未知的配置节原样保留
+SECTIONS = {
+    "dll_path": str,
+    "sys_path": str,
+    "backend": dict,
+    "rapid_test": dict,
+    "auto_move": dict,
+}
+
+
+def validate_section(name: str, value) -> None:
+    """校验单个配置节
+
+    Args:
+        name: 配置节名称
+        value: 配置节内容
+
+    Raises:
+        ValueError: 配置节类型或内容无效
+    """
+    expected = SECTIONS.get(name)
+    if expected is not None and not isinstance(value, expected):
+        raise ValueError(f"配置节{name}应为{expected.__name__}，实际为{type(value).__name__}")
+    if name == "backend" and value.get("type", "dll") not in BACKENDS:
+        raise ValueError(f"未知的驱动后端: {value.get('type')}")
+
+
+class ConfigService:
+    """driver_config.json配置服务
+
+    配置文件只在首次访问时解析一次，之后的读取都来自内存缓存。
+    update()按配置节合并(字典节逐字段合并，其余节直接替换)，
+    不会丢失其他写入方的配置节；修改在debounce秒内合并为一次写入，
+    写入时先写临时文件再重命名替换，读取方不会看到写了一半的文件。
+    可选的后台线程按间隔检查文件的修改时间和大小，
+    文件被外部修改时重新加载并在监视线程中通知订阅者。
+    文件存在但无法解析时，首次写入前先把原文件备份为.bak，不会直接覆盖用户的配置。
+    """
+
+    def __init__(self, path: str = DEFAULT_CONFIG_FILE, debounce: float = 0.5,
+                 watch_interval: float = 1.0):
+        """初始化配置服务
+
+        Args:
+            path: 配置文件路径
+            debounce: 修改后延迟写入的时间(秒)
+            watch_interval: 检查外部修改的间隔(秒)
+        """
+        if watch_interval <= 0:
+            raise ValueError(f"无效的检查间隔: {watch_interval}")
+        self.path = path
+        self.debounce = debounce
+        self.watch_interval = watch_interval
+        self.loads = 0  # 解析配置文件的次数
+        self.writes = 0  # 写入配置文件的次数
+        self._data = None
+        self._invalid = {}  # 未通过校验的配置节，不对外提供但写入时原样保留
+        self._dirty = set()  # 尚未写入文件的配置节
+        self._stamp = None  # 最近一次读取或写入后文件的(修改时间, 大小)
+        self._unreadable = False  # 最近一次解析配置文件失败，写入前需要备份
+        self._subscribers = []
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._timer = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    # ===== 读取 =====
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _read(self) -> dict:
+        """解析配置文件并逐节校验，无效的配置节移入self._invalid"""
+        self.loads += 1
+        with open(self.path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        if not isinstance(config, dict):
+            raise ValueError("配置文件顶层应为对象")
+        invalid = {}
+        for name in list(config):
+            try:
+                validate_section(name, config[name])
+            except ValueError as e:
+                logging.warning(f"忽略无效的配置节: {str(e)}")
+                invalid[name] = config.pop(name)
+        self._invalid = invalid
+        self._unreadable = False
+        return config
+
+    def _ensure_loaded(self) -> dict:
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    self._stamp = self._stat()
+                    data = {}
+                    if self._stamp is not None:
+                        try:
+                            data = self._read()
+                        except Exception as e:
+                            self._unreadable = True
+                            logging.warning(f"加载配置文件失败: {str(e)}")
+                    self._data = data
+        return self._data
+
+    def get(self, section: str, default=None):
+        """读取配置节
+
+        Args:
+            section: 配置节名称
+            default: 配置节不存在时的返回值
+
+        Returns:
+            配置节内容的副本
+        """
+        data = self._ensure_loaded()
+        with self._lock:
+            if section not in data:
+                return default
+            return copy.deepcopy(data[section])
+
+    def snapshot(self) -> dict:
+        """获取完整配置的副本"""
+        data = self._ensure_loaded()
+        with self._lock:
+            return copy.deepcopy(data)
+
+    # ===== 写入 =====
+    def update(self, sections: dict) -> bool:
+        """合并修改配置节，debounce秒后写入文件
+
+        Args:
+            sections: 配置节名称到内容的映射，字典节只覆盖给出的字段
+
+        Returns:
+            bool: 配置是否有变化
+
+        Raises:
+            ValueError: 配置节类型或内容无效
+        """
+        data = self._ensure_loaded()
+        changed = False
+        with self._lock:
+            for name, value in sections.items():
+                old = data.get(name)
+                if isinstance(old, dict) and isinstance(value, dict):
+                    value = {**old, **value}
+                validate_section(name, value)
+                if value == old:
+                    continue
+                data[name] = copy.deepcopy(value)
+                self._invalid.pop(name, None)
+                self._dirty.add(name)
+                changed = True
+            if changed and self.debounce > 0:
+                if self._timer is not None:
+                    self._timer.cancel()
+                self._timer = threading.Timer(self.debounce, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if changed and self.debounce <= 0:
+            self.flush()
+        return changed
+
+    def flush(self) -> bool:
+        """立即写入未保存的修改
+
+        Returns:
+            bool: 写入是否成功(没有未保存的修改时返回True)
+        """
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return True
+                data = {**self._invalid, **copy.deepcopy(self._data)}
+                dirty = self._dirty
+                self._dirty = set()
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            try:
+                if self._unreadable:
+                    self._backup()
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=4, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                with self._lock:
+                    self._dirty |= dirty
+                logging.error(f"保存配置失败: {str(e)}")
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                return False
+            self.writes += 1
+            self._stamp = self._stat()  # 自己的写入不触发外部修改通知
+            return True
+
+    def _backup(self) -> None:
+        """把无法解析的配置文件备份为.bak(调用方持有self._write_lock)
+
+        Raises:
+            OSError: 备份失败，此时不应写入
+        """
+        backup_path = f'{self.path}.bak'
+        try:
+            shutil.copy2(self.path, backup_path)
+        except FileNotFoundError:
+            pass  # 文件已被删除，没有需要保留的内容
+        else:
+            logging.warning(f"配置文件无法解析，原文件已备份为: {backup_path}")
+        self._unreadable = False
+
+    @property
+    def dirty(self) -> bool:
+        """是否有尚未写入文件的修改"""
+        return bool(self._dirty)
+
+    # ===== 外部修改通知 =====
+    def subscribe(self, callback: Callable[[dict, set], None]) -> None:
+        """订阅外部修改事件
+
+        Args:
+            callback: 回调函数，参数为(完整配置的副本, 有变化的配置节名称集合)，在监视线程中调用
+        """
+        with self._lock:
+            self._subscribers = self._subscribers + [callback]
+
+    def unsubscribe(self, callback: Callable[[dict, set], None]) -> None:
+        """取消订阅外部修改事件"""
+        with self._lock:
+            self._subscribers = [cb for cb in self._subscribers if cb is not callback]
+
+    def check(self) -> set:
+        """检查配置文件是否被外部修改，是则重新加载并通知订阅者
+
+        Returns:
+            set: 有变化的配置节名称
+        """
+        self._ensure_loaded()
+        stamp = self._stat()
+        if stamp == self._stamp:
+            return set()
+        with self._write_lock:
+            stamp = self._stat()
+            if stamp == self._stamp:
+                return set()
+            self._stamp = stamp
+            if stamp is None:
+                return set()  # 文件被删除时保留内存中的配置
+            try:
+                data = self._read()
+            except Exception as e:
+                # 可能是编辑器写了一半，文件再次变化时重试
+                self._unreadable = True
+                logging.warning(f"重新加载配置文件失败: {str(e)}")
+                return set()
+            with self._lock:
+                old = self._data
+                for name in self._dirty:  # 未保存的本地修改优先
+                    data[name] = old[name]
+                    self._invalid.pop(name, None)
+                changed = {name for name in old.keys() | data.keys() if old.get(name) != data.get(name)}
+                self._data = data
+                snapshot = copy.deepcopy(data)
+        if changed:
+            logging.info(f"配置文件已被外部修改: {', '.join(sorted(changed))}")
+            for callback in self._subscribers:
+                try:
+                    callback(snapshot, changed)
+                except Exception as e:
+                    logging.error(f"配置变化回调出错: {str(e)}")
+        return changed
+
+    def start(self) -> None:
+        """启动后台检查外部修改"""
+        if self._thread is not None:
+            return
+        self._ensure_loaded()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='ConfigWatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台检查"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.watch_interval + 1.0)
+        self._thread = None
+
+    def close(self) -> bool:
+        """停止后台检查并写入未保存的修改
+
+        Returns:
+            bool: 写入是否成功
+        """
+        self.stop()
+        return self.flush()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.watch_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logging.error(f"检查配置文件失败: {str(e)}")
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_config(path: str = DEFAULT_CONFIG_FILE) -> ConfigService:
+    """获取配置文件对应的共享配置服务(同一路径在进程内只解析一次)
+
+    Args:
+        path: 配置文件路径
+
+    Returns:
+        ConfigService: 配置服务
+    """
+    key = os.path.abspath(path)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = _services[key] = ConfigService(path)
+        return service
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+
+import time
+from array import array
+from ctypes import CDLL, c_int, c_ulonglong
+
+# 输入类接口，按顺序编号作为录制时的操作码(从1开始)
+INPUT_EXPORTS = (
+    'KeyDown', 'KeyUp',
+    'MouseLeftButtonDown', 'MouseLeftButtonUp',
+    'MouseRightButtonDown', 'MouseRightButtonUp',
+    'MouseMiddleButtonDown', 'MouseMiddleButtonUp',
+    'MouseXButton1Down', 'MouseXButton1Up',
+    'MouseXButton2Down', 'MouseXButton2Up',
+    'MouseMoveRELATIVE', 'MouseMoveABSOLUTE',
+    'MouseWheelUp', 'MouseWheelDown',
+)
+
+# 驱动管理及状态类接口
+CONTROL_EXPORTS = (
+    'SetHandle', 'LoadNTDriver', 'UnloadNTDriver',
+    'CheckDeviceStatus', 'GetDriverStatus', 'GetDetailedErrorCode', 'GetLastCheckTime',
+)
+
+OP_CODES = {name: i + 1 for i, name in enumerate(INPUT_EXPORTS)}
+OP_NAMES = {code: name for name, code in OP_CODES.items()}
+
+
+class DriverBackend:
+    """驱动后端基类
+
+    后端以与lykeysdll.dll相同名称的方法提供全部导出接口，
+    InputTester等调用方只依赖这些方法名，不关心底层实现。
+    """
+
+    name = 'base'
+
+    def close(self):
+        """释放后端占用的资源"""
+        pass
+
+
+class DllBackend(DriverBackend):
+    """基于lykeysdll.dll的真实驱动后端
+
+    DLL导出函数直接绑定为实例属性，调用时没有额外的Python包装开销。
+    """
+
+    name = 'dll'
+
+    def __init__(self, dll_path: str):
+        """加载DLL
+
+        Args:
+            dll_path: DLL文件的完整路径
+        """
+        self.dll = CDLL(dll_path)
+
+        # 设置返回类型
+        self.dll.GetDriverStatus.restype = c_int
+        self.dll.GetLastCheckTime.restype = c_ulonglong
+
+        for name in CONTROL_EXPORTS + INPUT_EXPORTS:
+            setattr(self, name, getattr(self.dll, name))
+
+        # 批量接口为可选导出
+        if hasattr(self.dll, 'KeyEventBatch'):
+            self.KeyEventBatch = self.dll.KeyEventBatch
+
+
+class NullBackend(DriverBackend):
+    """空驱动后端
+
+    提供与lykeysdll.dll相同的导出接口但不执行任何操作，
+    用于在没有驱动(或非Windows)的环境下运行输入逻辑。
+    """
+
+    name = 'null'
+    DEVICE_STATUS_READY = 1
+
+    def SetHandle(self):
+        return True
+
+    def LoadNTDriver(self, driver_name, driver_path):
+        return True
+
+    def UnloadNTDriver(self, driver_name):
+        return True
+
+    def CheckDeviceStatus(self):
+        pass
+
+    def GetDriverStatus(self):
+        return self.DEVICE_STATUS_READY
+
+    def GetDetailedErrorCode(self):
+        return 0
+
+    def GetLastCheckTime(self):
+        return 0
+
+    def KeyDown(self, vk_code):
+        pass
+
+    def KeyUp(self, vk_code):
+        pass
+
+    def MouseLeftButtonDown(self):
+        pass
+
+    def MouseLeftButtonUp(self):
+        pass
+
+    def MouseRightButtonDown(self):
+        pass
+
+    def MouseRightButtonUp(self):
+        pass
+
+    def MouseMiddleButtonDown(self):
+        pass
+
+    def MouseMiddleButtonUp(self):
+        pass
+
+    def MouseXButton1Down(self):
+        pass
+
+    def MouseXButton1Up(self):
+        pass
+
+    def MouseXButton2Down(self):
+        pass
+
+    def MouseXButton2Up(self):
+        pass
+
+    def MouseMoveRELATIVE(self, dx, dy):
+        pass
+
+    def MouseMoveABSOLUTE(self, x, y):
+        pass
+
+    def MouseWheelUp(self, wheel_delta):
+        pass
+
+    def MouseWheelDown(self, wheel_delta):
+        pass
+
+
+def _recording_method(name):
+    """生成记录调用后再转发给内部后端的输入方法"""
+    op = OP_CODES[name]
+
+    def method(self, *args):
+        self._record(op, *args)
+        inner = self.inner
+        if inner is not None:
+            return getattr(inner, name)(*args)
+
+    method.__name__ = name
+    method.__doc__ = f"记录{name}调用"
+    return method
+
+
+class RecordingBackend(NullBackend):
+    """录制驱动后端
+
+    每次输入调用以(操作码, 参数1, 参数2, 纳秒时间戳)写入预分配的环形缓冲区，
+    缓冲区写满后覆盖最旧的记录，录制过程中不产生任何内存分配。
+    可包装另一个后端(inner)，记录后再转发调用。
+    """
+
+    name = 'recording'
+
+    def __init__(self, capacity: int = 65536, inner=None):
+        """初始化录制后端
+
+        Args:
+            capacity: 环形缓冲区容量(记录条数)
+            inner: 被包装的后端，None表示只记录不转发
+        """
+        if capacity <= 0:
+            raise ValueError(f"无效的缓冲区容量: {capacity}")
+        self.capacity = capacity
+        self.inner = inner
+        self._ops = array('B', bytes(capacity))
+        self._arg0 = array('i', [0]) * capacity
+        self._arg1 = array('i', [0]) * capacity
+        self._timestamps = array('q', [0]) * capacity
+        self._total = 0
+
+    def _record(self, op, arg0=0, arg1=0):
+        i = self._total % self.capacity
+        self._ops[i] = op
+        self._arg0[i] = arg0
+        self._arg1[i] = arg1
+        self._timestamps[i] = time.perf_counter_ns()
+        self._total += 1
+
+    def CheckDeviceStatus(self):
+        if self.inner is not None:
+            self.inner.CheckDeviceStatus()
+
+    def GetDriverStatus(self):
+        if self.inner is not None:
+            return self.inner.GetDriverStatus()
+        return self.DEVICE_STATUS_READY
+
+    @property
+    def total(self) -> int:
+        """累计记录的调用次数"""
+        return self._total
+
+    @property
+    def dropped(self) -> int:
+        """因缓冲区写满而被覆盖的记录数"""
+        return max(0, self._total - self.capacity)
+
+    def __len__(self) -> int:
+        return min(self._total, self.capacity)
+
+    def clear(self):
+        """清空记录"""
+        self._total = 0
+
+    def records(self) -> list:
+        """按时间顺序获取缓冲区中的记录
+
+        Returns:
+            list: [(接口名称, 参数1, 参数2, 纳秒时间戳), ...]
+        """
+        count = len(self)
+        first = self._total - count
+        result = []
+        for n in range(first, self._total):
+            i = n % self.capacity
+            result.append((OP_NAMES[self._ops[i]], self._arg0[i], self._arg1[i], self._timestamps[i]))
+        return result
+
+    def summary(self) -> dict:
+        """统计各接口调用次数及相邻调用的平均间隔
+
+        在紧凑循环中调用时，相邻调用间隔即为每个事件的Python侧开销。
+        """
+        count = len(self)
+        counts = {}
+        for n in range(self._total - count, self._total):
+            name = OP_NAMES[self._ops[n % self.capacity]]
+            counts[name] = counts.get(name, 0) + 1
+
+        mean_interval_ns = 0.0
+        if count > 1:
+            first = self._timestamps[(self._total - count) % self.capacity]
+            last = self._timestamps[(self._total - 1) % self.capacity]
+            mean_interval_ns = (last - first) / (count - 1)
+        return {
+            'total': self._total,
+            'retained': count,
+            'dropped': self.dropped,
+            'calls': counts,
+            'mean_interval_ns': mean_interval_ns,
+        }
+
+
+for _name in INPUT_EXPORTS:
+    setattr(RecordingBackend, _name, _recording_method(_name))
+del _name
+
+
+BACKENDS = {
+    'dll': DllBackend,
+    'null': NullBackend,
+    'recording': RecordingBackend,
+}
+
+
+def create_backend(kind: str = 'dll', dll_path: str = None, **options) -> DriverBackend:
+    """创建驱动后端
+
+    Args:
+        kind: 后端类型，"dll"、"null"或"recording"
+        dll_path: DLL文件路径(仅dll后端需要)
+        **options: 传给后端构造函数的其他参数(如recording后端的capacity)
+
+    Returns:
+        DriverBackend: 后端实例
+
+    Raises:
+        ValueError: 未知的后端类型或缺少DLL路径
+    """
+    if kind not in BACKENDS:
+        raise ValueError(f"未知的驱动后端: {kind}")
+    if kind == 'dll':
+        if not dll_path:
+            raise ValueError("dll后端需要指定DLL路径")
+        return DllBackend(dll_path)
+    return BACKENDS[kind](**options)
@@ -2,19 +2,33 @@
 
 import os
 import logging
-from ctypes import CDLL, c_int, c_ulonglong
-import json
 import sys
 import ctypes
+from config_service import get_config
+from driver_backends import create_backend
+from driver_session import DriverSession
 
 
 class DriverManager:
-    def __init__(self):
+    def __init__(self, backend: str = 'dll', backend_options: dict = None, reuse: bool = True):
+        """初始化驱动管理器
+        
+        Args:
+            backend (str): 驱动后端类型，"dll"、"null"或"recording"
+            backend_options (dict, optional): 传给后端的其他参数
+            reuse (bool): 是否复用其他进程已加载的驱动(否则总是重新加载)
+        """
         self.driver = None
+        self.session = None
+        self.reuse = reuse
+        self.backend = backend
+        self.backend_options = backend_options or {}
+        self.dll_path = None
+        self.sys_path = None
         self._setup_logging()
         
-        # 在初始化时就检查权限
-        if not self.check_and_elevate_privileges():
+        # 只有真实驱动需要管理员权限，在初始化时就检查
+        if self.backend == 'dll' and not self.check_and_elevate_privileges():
             raise PermissionError("需要管理员权限")
             
     def _setup_paths(self, dll_path=None, sys_path=None):
@@ -24,17 +38,19 @@ class DriverManager:
             dll_path (str, optional): DLL文件的完整路径
             sys_path (str, optional): SYS文件的完整路径
         """
-        # 尝试从配置文件加载路径
-        config_file = "driver_config.json"
-        if os.path.exists(config_file):
-            try:
-                with open(config_file, "r") as f:
-                    config = json.load(f)
-                    dll_path = dll_path or config.get("dll_path")
-                    sys_path = sys_path or config.get("sys_path")
-                    logging.info("从配置文件加载驱动路径")
-            except Exception as e:
-                logging.warning(f"加载配置文件失败: {str(e)}")
+        # 未指定的路径从配置文件(进程内共享的缓存)中读取
+        if not dll_path or not sys_path:
+            config = get_config()
+            if config.get("dll_path") or config.get("sys_path"):
+                dll_path = dll_path or config.get("dll_path")
+                sys_path = sys_path or config.get("sys_path")
+                logging.info("从配置文件加载驱动路径")
+        
+        # 非真实驱动后端不需要驱动文件
+        if self.backend != 'dll':
+            self.dll_path = dll_path
+            self.sys_path = sys_path
+            return
         
         # 如果没有提供路径且配置文件不存在或加载失败，则抛出异常
         if not dll_path or not sys_path:
@@ -106,6 +122,15 @@ class DriverManager:
 
     def initialize(self):
         """初始化驱动"""
+        if self.backend != 'dll':
+            try:
+                self.driver = create_backend(self.backend, **self.backend_options)
+                logging.info(f"已使用{self.backend}驱动后端")
+                return True
+            except Exception as e:
+                logging.error(f"初始化失败: {str(e)}")
+                return False
+            
         try:
             # 1. 检查并请求管理员权限
             if not self.is_admin():
@@ -115,11 +140,14 @@ class DriverManager:
                 return False  # 程序将重启
                 
             logging.info("开始加载驱动...")
-            self.driver = CDLL(self.dll_path)
+            self.driver = create_backend('dll', dll_path=self.dll_path)
             
-            # 设置返回类型
-            self.driver.GetDriverStatus.restype = c_int
-            self.driver.GetLastCheckTime.restype = c_ulonglong
+            if self.reuse:
+                # 通过跨进程会话加载或复用驱动，最后一个客户端退出时才卸载
+                self.session = DriverSession(self.driver, self.sys_path)
+                self.session.open()
+                logging.info(f"驱动初始化完成，耗时 {self.session.open_time * 1000:.1f}ms")
+                return True
             
             # 先尝试卸载已存在的驱动
             self._unload_driver()
@@ -155,7 +183,11 @@ class DriverManager:
     def cleanup(self):
         """清理资源"""
         try:
-            if self.driver:
+            if self.session:
+                session, self.session = self.session, None
+                if session.close():
+                    logging.info("驱动卸载成功")
+            elif self.driver:
                 self._unload_driver()
                 logging.info("驱动卸载成功")
         except Exception as e:
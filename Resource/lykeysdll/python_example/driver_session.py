@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+
+import ctypes
+import json
+import logging
+import os
+import tempfile
+import time
+
+from health_monitor import DEVICE_STATUS_READY
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+def _pid_alive(pid: int) -> bool:
+    """进程是否仍在运行"""
+    if pid == os.getpid():
+        return True
+    if os.name == 'nt':
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return ctypes.get_last_error() == 5  # 拒绝访问说明进程存在
+        try:
+            code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+                return False
+            return code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class _FileLock:
+    """跨进程的文件锁(Windows使用msvcrt.locking，其他平台使用fcntl.flock)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'a+b')
+        if os.name == 'nt':
+            self._file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass  # LK_LOCK重试约10秒后仍未获得锁，继续等待
+        else:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if os.name == 'nt':
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+class DriverSession:
+    """跨进程共享的驱动会话
+
+    同一台机器上的多个客户端进程(GUI、lykeys命令行等)共用一个已加载的驱动。
+    会话文件记录驱动是否已加载以及正在使用驱动的客户端进程号，读写时持有文件锁:
+
+    - open(): 已有存活的客户端且驱动状态正常时只调用SetHandle复用驱动，
+      否则按原流程卸载残留驱动后重新加载；
+    - close(): 移除本进程，最后一个客户端退出时才卸载驱动。
+
+    已退出(包括异常退出)的客户端在每次打开或关闭会话时被清理。
+    """
+
+    def __init__(self, driver, sys_path: str, name: str = 'lykeys', state_dir: str = None):
+        """初始化会话
+
+        Args:
+            driver: 驱动后端实例
+            sys_path: 驱动SYS文件路径
+            name: 驱动服务名称
+            state_dir: 会话文件所在目录，默认为系统临时目录
+        """
+        self.driver = driver
+        self.sys_path = sys_path
+        self.name = name
+        state_dir = state_dir or tempfile.gettempdir()
+        self.state_path = os.path.join(state_dir, f'{name}.session.json')
+        self._lock = _FileLock(os.path.join(state_dir, f'{name}.session.lock'))
+        self.opened = False
+        self.reused = False  # 本次是否复用了已加载的驱动
+        self.open_time = 0.0  # 打开会话的耗时(秒)
+
+    def _read_state(self) -> dict:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if isinstance(state, dict):
+                return state
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"会话文件无效，将重新创建: {str(e)}")
+        return {}
+
+    def _write_state(self, state: dict) -> None:
+        temp_path = f'{self.state_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.state_path)
+
+    @staticmethod
+    def _live_clients(state: dict) -> list:
+        return [pid for pid in state.get('clients', []) if _pid_alive(pid)]
+
+    def _healthy(self) -> bool:
+        """打开句柄并确认驱动状态正常"""
+        try:
+            self.driver.SetHandle()
+            self.driver.CheckDeviceStatus()
+            return self.driver.GetDriverStatus() == DEVICE_STATUS_READY
+        except Exception as e:
+            logging.warning(f"检查已加载的驱动失败: {str(e)}")
+            return False
+
+    def _load(self) -> None:
+        # 先尝试卸载残留的驱动
+        try:
+            self.driver.UnloadNTDriver(self.name.encode())
+        except Exception as e:
+            logging.warning(f"卸载驱动时出现异常(可忽略): {str(e)}")
+        if not self.driver.LoadNTDriver(self.name.encode(), self.sys_path.encode()):
+            raise RuntimeError("驱动加载失败")
+        self.driver.SetHandle()
+
+    def open(self) -> bool:
+        """打开会话(复用或加载驱动)
+
+        Returns:
+            bool: 操作是否成功
+
+        Raises:
+            RuntimeError: 驱动加载失败
+        """
+        if self.opened:
+            return True
+        start = time.perf_counter()
+        pid = os.getpid()
+        with self._lock:
+            state = self._read_state()
+            clients = self._live_clients(state)
+            self.reused = bool(state.get('loaded') and clients and self._healthy())
+            if self.reused:
+                logging.info(f"复用已加载的驱动，当前客户端: {len(clients)} 个")
+            else:
+                if clients:
+                    logging.warning("已加载的驱动状态异常，重新加载")
+                self._load()
+                logging.info("驱动加载完成")
+            if pid not in clients:
+                clients.append(pid)
+            self._write_state({'loaded': True, 'sys_path': self.sys_path, 'clients': clients,
+                               'loaded_at': state.get('loaded_at') if self.reused else time.time()})
+        self.opened = True
+        self.open_time = time.perf_counter() - start
+        return True
+
+    def close(self) -> bool:
+        """关闭会话，最后一个客户端退出时卸载驱动
+
+        Returns:
+            bool: 是否卸载了驱动
+        """
+        if not self.opened:
+            return False
+        self.opened = False
+        pid = os.getpid()
+        with self._lock:
+            state = self._read_state()
+            clients = [p for p in self._live_clients(state) if p != pid]
+            if clients:
+                state['clients'] = clients
+                self._write_state(state)
+                logging.info(f"驱动仍被 {len(clients)} 个客户端使用，保持加载")
+                return False
+            try:
+                self.driver.UnloadNTDriver(self.name.encode())
+            except Exception as e:
+                logging.warning(f"卸载驱动时出现异常(可忽略): {str(e)}")
+            self._write_state({'loaded': False, 'clients': []})
+            return True
+
+    def clients(self) -> list:
+        """当前存活的客户端进程号"""
+        with self._lock:
+            return self._live_clients(self._read_state())
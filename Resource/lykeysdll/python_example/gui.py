@@ -4,22 +4,22 @@ import time
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import threading
+from config_service import get_config
 from driver_manager import DriverManager
 from input_tester import InputTester
+from input_arbiter import InputArbiter, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
 from virtuakeys_mapping import VirtualKeys
+from text_compiler import compile_text
+from precise_timer import PreciseTimer
+# macro_script、rapid_stats、headless_runner及其依赖(trajectory、motion_streamer等)在使用时才导入，不拖慢界面启动
+from ui_pump import UIPump
+from log_sink import BufferedTextHandler, create_file_sink
 import logging
 import os
 import json
 import sys
 import ctypes
 from ctypes import wintypes
-import argparse
-import win32gui
-import win32api
-import win32con
-import math
-import random
-from keyboard_hook import KeyboardHook
 
 # 添加 MONITORINFO 结构体定义
 class MONITORINFO(ctypes.Structure):
@@ -30,24 +30,55 @@ class MONITORINFO(ctypes.Structure):
         ("dwFlags", wintypes.DWORD)
     ]
 
-# 添加命令行参数解析
-# python gui.py --debug
-parser = argparse.ArgumentParser()
-parser.add_argument('--debug', action='store_true', help='启用调试模式')
-args = parser.parse_args()
-
-# 使用命令行参数设置调试模式
-DEBUG_MODE = args.debug
-
 # 在类外部或文件开头定义常量
 SW_HIDE = 0
 SW_SHOWNORMAL = 1
 SW_MINIMIZE = 6
 SW_MAXIMIZE = 3
 
+
+# 界面内置测试的宏脚本(语法见macro_script)
+KEYBOARD_TEST_SCRIPT = """
+log "键盘测试3s后开始!"
+wait 3s
+log "测试按键: w"
+key w 100ms
+wait 500ms
+log "测试按键: a"
+key a 100ms
+wait 500ms
+log "测试按键: s"
+key s 100ms
+wait 500ms
+log "测试按键: d"
+key d 100ms
+wait 500ms
+log "测试按键: enter"
+key enter 100ms
+wait 500ms
+log "键盘测试完成"
+"""
+
+INPUT_TEST_SCRIPT = """
+log "输入测试3s后开始!"
+wait 3s
+log "测试输入: Hello, World!"
+text "Hello, World!" 5
+log "输入测试完成"
+"""
+
+
 class LYKeysGUI:
-    def __init__(self):
-        """初始化GUI"""
+    def __init__(self, debug: bool = False, log_file: str = None):
+        """初始化GUI
+
+        Args:
+            debug: 调试模式(以管理员身份重启时保留控制台窗口)
+            log_file: 同时写入的滚动日志文件路径
+        """
+        self.debug = debug
+        self.log_file = log_file
+
         # 权限检查
         if not self.check_privileges():
             sys.exit(0)
@@ -61,9 +92,15 @@ class LYKeysGUI:
         # 驱动相关
         self.driver_mgr = None
         self.input_tester = None
+        self.input_arbiter = None  # 独占驱动的输入分发线程
+        self.async_loop = None  # 运行定时输入序列(鼠标点击测试等)的事件循环线程
+        self.async_tester = None
         self.is_driver_loaded = False
         self.is_closing = False
+        self.rapid_stats = None  # 最近一次高频测试的流式统计
         self.config_file = "driver_config.json"
+        self.config = get_config(self.config_file)  # 配置文件只解析一次，各处读写共享缓存
+        self.backend_config = {}  # 驱动后端配置(配置文件backend节)
         
         # 路径配置变量（在创建根窗口后创建）
         self.dll_path_var = tk.StringVar()
@@ -73,7 +110,8 @@ class LYKeysGUI:
         self.test_key_var = tk.StringVar(value="a")
         self.press_time_var = tk.StringVar(value="1")
         self.interval_time_var = tk.StringVar(value="1")
-        self.duration_var = tk.StringVar(value="0")
+        self.duration_var = tk.StringVar(value="1")
+        self.type_speed_var = tk.StringVar(value="20")
         
         # 自动移动相关变量
         self.keyboard_hook = None
@@ -81,7 +119,8 @@ class LYKeysGUI:
         self.auto_move_config = {
             'hotkey': 'F8',
             'speed': 10,
-            'range': 100
+            'range': 100,
+            'rate': 1000  # 鼠标移动发送频率(Hz)
         }
         
         # 配置界面样式
@@ -127,15 +166,50 @@ class LYKeysGUI:
         if not self.dll_path_var.get() or not self.sys_path_var.get():
             logging.warning("请先在驱动路径配置中设置DLL和SYS文件路径")
         
-        # 创建功能标签页
+        # 创建功能标签页(驱动控制页立即创建，其余标签页在首次选中时创建)
+        self._tab_builders = {}
         self.create_driver_tab()
-        self.create_input_test_tab()
-        self.create_rapid_test_tab()
-        self.create_mouse_test_tab()
+        self._add_lazy_tab("输入测试", self.create_input_test_tab)
+        self._add_lazy_tab("高频测试", self.create_rapid_test_tab)
+        self._add_lazy_tab("鼠标测试", self.create_mouse_test_tab)
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed)
+        
+        # 工作线程的界面更新统一由刷新泵按固定帧率合并刷新
+        self.ui_pump = UIPump(self.root, fps=30)
+        self.ui_pump.bind('press_count', self._update_press_count)
+        self.ui_pump.bind('rapid_status', lambda status: self._update_status(*status))
+        self.ui_pump.bind('input_output', self._update_output)
+        self.ui_pump.bind('driver_status', self._on_driver_status_changed)
+        self.ui_pump.bind('config', self._on_config_changed)
+        self.ui_pump.start()
+        # 配置文件被外部修改时在主线程重新加载
+        self.config.subscribe(lambda config, changed: self.ui_pump.publish('config', config))
+        self.config.start()
         
         # 绑定事件
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
         
+    def _add_lazy_tab(self, text, builder):
+        """添加标签页，内容在首次选中时创建
+
+        Args:
+            text: 标签页标题
+            builder: 创建内容的方法，参数为标签页容器
+        """
+        tab = ttk.Frame(self.notebook)
+        self.notebook.add(tab, text=text)
+        self._tab_builders[str(tab)] = builder
+
+    def _on_tab_changed(self, event):
+        """切换标签页时创建尚未创建的内容"""
+        tab = self.notebook.select()
+        builder = self._tab_builders.pop(tab, None)
+        if builder is None:
+            return
+        builder(self.notebook.nametowidget(tab))
+        # 新建的按钮按当前驱动状态启用或禁用
+        self._update_button_states(self.is_driver_loaded)
+
     def create_driver_tab(self):
         """创建驱动控制标签页"""
         driver_tab = ttk.Frame(self.notebook)
@@ -170,10 +244,12 @@ class LYKeysGUI:
         # 路径配置区域
         self.create_path_frame(driver_tab)
 
-    def create_input_test_tab(self):
-        """创建输入测试标签页"""
-        input_tab = ttk.Frame(self.notebook)
-        self.notebook.add(input_tab, text="输入测试")
+    def create_input_test_tab(self, input_tab):
+        """创建输入测试标签页
+
+        Args:
+            input_tab: 标签页容器
+        """
 
         # 输入/输出区域
         io_frame = ttk.LabelFrame(input_tab, text="输入/输出", padding="5")
@@ -205,6 +281,13 @@ class LYKeysGUI:
         # 创建固定宽度的输出框
         self.output_entry = ttk.Entry(output_frame, state='readonly', width=25, font=self.default_font)  # 设置字体
         self.output_entry.pack(side=tk.LEFT, padx=5, pady=5)
+        
+        # 输入速度设置
+        speed_frame = ttk.Frame(io_frame)
+        speed_frame.pack(fill=tk.X, padx=5, pady=(0,5))
+        ttk.Label(speed_frame, text="输入速度(字符/秒):").pack(side=tk.LEFT, padx=5)
+        self.type_speed_entry = ttk.Entry(speed_frame, textvariable=self.type_speed_var, width=8, font=self.default_font)
+        self.type_speed_entry.pack(side=tk.LEFT, padx=5)
 
         # 测试功能区域
         test_frame = ttk.LabelFrame(input_tab, text="测试功能", padding="5")
@@ -232,10 +315,12 @@ class LYKeysGUI:
                                        width=15)
         self.test_mouse_btn.pack(side=tk.LEFT, padx=5)
 
-    def create_rapid_test_tab(self):
-        """创建高频测试标签页"""
-        rapid_tab = ttk.Frame(self.notebook)
-        self.notebook.add(rapid_tab, text="高频测试")
+    def create_rapid_test_tab(self, rapid_tab):
+        """创建高频测试标签页
+
+        Args:
+            rapid_tab: 标签页容器
+        """
 
         # 创建主容器
         main_container = ttk.Frame(rapid_tab)
@@ -257,7 +342,6 @@ class LYKeysGUI:
         key_frame.pack(fill=tk.X, pady=(0,5))
         
         ttk.Label(key_frame, text="测试按键:").pack(side=tk.LEFT, padx=5)
-        self.test_key_var = tk.StringVar(value="a")
         self.test_key_entry = ttk.Entry(key_frame, textvariable=self.test_key_var, width=8, font=self.default_font)
         self.test_key_entry.pack(side=tk.LEFT, padx=5)
 
@@ -269,7 +353,6 @@ class LYKeysGUI:
         press_frame = ttk.Frame(time_frame)
         press_frame.pack(fill=tk.X, pady=2)
         ttk.Label(press_frame, text="按下抬起间隔:").pack(side=tk.LEFT, padx=5)
-        self.press_time_var = tk.StringVar(value="1")
         self.press_time_entry = ttk.Entry(press_frame, textvariable=self.press_time_var, width=8, font=self.default_font)
         self.press_time_entry.pack(side=tk.LEFT, padx=5)
 
@@ -277,7 +360,6 @@ class LYKeysGUI:
         interval_frame = ttk.Frame(time_frame)
         interval_frame.pack(fill=tk.X, pady=2)
         ttk.Label(interval_frame, text="等待间隔:").pack(side=tk.LEFT, padx=5)
-        self.interval_time_var = tk.StringVar(value="1")
         self.interval_time_entry = ttk.Entry(interval_frame, textvariable=self.interval_time_var, width=8, font=self.default_font)
         self.interval_time_entry.pack(side=tk.LEFT, padx=5)
 
@@ -287,7 +369,6 @@ class LYKeysGUI:
         duration_frame.pack(fill=tk.X, pady=(0,5))
         
         ttk.Label(duration_frame, text="运行时长(秒):").pack(side=tk.LEFT, padx=5)
-        self.duration_var = tk.StringVar(value="1")
         self.duration_entry = ttk.Entry(duration_frame, textvariable=self.duration_var, width=8, font=self.default_font)
         self.duration_entry.pack(side=tk.LEFT, padx=5)
 
@@ -316,6 +397,13 @@ class LYKeysGUI:
         
         self.click_rate_label = ttk.Label(status_right, text="平均频率: 0次/秒")
         self.click_rate_label.pack(fill=tk.X, pady=2)
+        
+        # 间隔抖动和实际按下时长(来自流式统计)
+        self.interval_stats_label = ttk.Label(status_left, text="间隔: -")
+        self.interval_stats_label.pack(fill=tk.X, pady=2)
+        
+        self.hold_stats_label = ttk.Label(status_right, text="按下时长: -")
+        self.hold_stats_label.pack(fill=tk.X, pady=2)
 
         # 控制按钮 - 垂直布局
         control_frame = ttk.Frame(main_container)
@@ -330,11 +418,18 @@ class LYKeysGUI:
                                        command=self._toggle_rapid_test, 
                                        width=15)
         self.rapid_test_btn.pack(pady=5)
+        
+        ttk.Button(button_container, 
+                  text="导出数据", 
+                  command=self._export_rapid_stats, 
+                  width=15).pack(pady=5)
+
+    def create_mouse_test_tab(self, mouse_tab):
+        """创建鼠标测试标签页
 
-    def create_mouse_test_tab(self):
-        """创建鼠标测试标签页"""
-        mouse_tab = ttk.Frame(self.notebook)
-        self.notebook.add(mouse_tab, text="鼠标测试")
+        Args:
+            mouse_tab: 标签页容器
+        """
 
         # 创建主容器
         main_container = ttk.Frame(mouse_tab)
@@ -554,32 +649,25 @@ class LYKeysGUI:
         # 停止自动移动
         self.auto_move_running = False
         
+        if self.input_tester:
+            self.input_tester.stop_health_monitor()
+        self._stop_input_arbiter()
+        self.config.close()
+        
         if self.driver_mgr:
             try:
                 self.driver_mgr.cleanup()
             except Exception as e:
                 print(f"清理驱动时出错: {str(e)}")  # 使用print而不是logging
+        self.ui_pump.stop()
+        self.log_handler.stop()
+        logging.getLogger().removeHandler(self.log_handler)
+        if self.log_listener:
+            self.log_listener.stop()
         self.root.destroy()
     
     def _setup_logging(self):
         """设置日志处理"""
-        class TextHandler(logging.Handler):
-            def __init__(self, text_widget, gui):
-                logging.Handler.__init__(self)
-                self.text_widget = text_widget
-                self.gui = gui
-                
-            def emit(self, record):
-                if not self.gui.is_closing:  # 只在程序未关闭时输出日志
-                    msg = self.format(record) + '\n'
-                    # 使用after方法确保在主线程中更新UI
-                    self.gui.root.after(0, self._insert_log, msg)
-            
-            def _insert_log(self, msg):
-                """在主线程中插入日志并滚动"""
-                self.text_widget.insert(tk.END, msg)
-                self.text_widget.yview_moveto(1.0)  # 确保滚动到底部
-        
         # 创建日志区域（放在右侧面板）
         self.log_frame = ttk.LabelFrame(self.right_panel, text="日志输出")
         self.log_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -600,26 +688,30 @@ class LYKeysGUI:
         self.log_text.grid(row=0, column=0, sticky="nsew", padx=(5,0), pady=5)  # 添加内边距
         self.log_scrollbar.grid(row=0, column=1, sticky="ns", pady=5)
         
-        # 配置日志处理
-        handler = TextHandler(self.log_text, self)
+        # 配置日志处理(日志先进入有界队列，由主线程定时批量写入文本框)
         formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logging.getLogger().addHandler(handler)
+        self.log_handler = BufferedTextHandler(self.log_text, self.root, max_lines=2000)
+        self.log_handler.setFormatter(formatter)
+        self.log_handler.start()
+        logging.getLogger().addHandler(self.log_handler)
         logging.getLogger().setLevel(logging.INFO)
+        
+        # 可选的滚动日志文件
+        self.log_listener = None
+        if self.log_file:
+            file_handler, self.log_listener = create_file_sink(self.log_file, formatter=formatter)
+            logging.getLogger().addHandler(file_handler)
     
     def _update_button_states(self, driver_loaded):
         """更新按钮状态"""
         state = tk.NORMAL if driver_loaded else tk.DISABLED
-        self.unload_btn.config(state=state)
-        self.test_key_btn.config(state=state)
-        self.test_input_btn.config(state=state)
-        self.test_mouse_btn.config(state=state)
-        self.submit_btn.config(state=state)
-        self.clear_btn.config(state=state)
-        self.input_entry.config(state=state)
-        self.check_status_btn.config(state=state)
+        # 部分标签页尚未创建时跳过其中的控件，创建时会再次调用本方法
+        for name in ('unload_btn', 'test_key_btn', 'test_input_btn', 'test_mouse_btn',
+                     'submit_btn', 'clear_btn', 'input_entry', 'check_status_btn', 'rapid_test_btn'):
+            widget = getattr(self, name, None)
+            if widget is not None:
+                widget.config(state=state)
         self.load_btn.config(state=tk.DISABLED if driver_loaded else tk.NORMAL)
-        self.rapid_test_btn.config(state=state)
     
     def _load_driver(self):
         """加载驱动"""
@@ -628,12 +720,15 @@ class LYKeysGUI:
             dll_path = self.dll_path_var.get()
             sys_path = self.sys_path_var.get()
             
+            backend = self.backend_config.get("type", "dll")
+            backend_options = {k: v for k, v in self.backend_config.items() if k != "type"}
+            
             # 检查路径是否已配置
-            if not dll_path or not sys_path:
+            if backend == "dll" and (not dll_path or not sys_path):
                 messagebox.showerror("错误", "请先配置驱动路径")
                 return
             
-            self.driver_mgr = DriverManager()
+            self.driver_mgr = DriverManager(backend=backend, backend_options=backend_options)
             
             # 使用配置的路径
             try:
@@ -646,7 +741,8 @@ class LYKeysGUI:
                 return
             
             if self.driver_mgr.initialize():
-                self.input_tester = InputTester(self.driver_mgr.get_driver())
+                self._create_input_tester()
+                self._start_health_monitor()
                 self.is_driver_loaded = True
                 self._update_button_states(True)
                 self._check_driver_status()  # 初始检查驱动状态
@@ -660,6 +756,9 @@ class LYKeysGUI:
         """卸载驱动"""
         try:
             if self.driver_mgr:
+                if self.input_tester:
+                    self.input_tester.stop_health_monitor()
+                self._stop_input_arbiter()
                 self.driver_mgr.cleanup()
                 self.driver_mgr = None
                 self.input_tester = None
@@ -672,43 +771,25 @@ class LYKeysGUI:
     
     def _test_keyboard(self):
         """测试键盘"""
-        def run_test():
-            try:
-                # 测试一些基本按键
-                logging.info(f"键盘测试3s后开始!")
-                time.sleep(3)
-                test_keys = ['w', 'a', 's', 'd', 'enter']
-                for key in test_keys:
-                    logging.info(f"测试按键: {key}")
-                    self.input_tester.press_key(key)
-                    time.sleep(0.5)
-                logging.info("键盘测试完成")
-            except Exception as e:
-                logging.error(f"键盘测试出错: {str(e)}")
-        
-        threading.Thread(target=run_test, daemon=True).start()
+        self._run_script(KEYBOARD_TEST_SCRIPT, "键盘测试")
     
     def _test_input(self):
         """测试输入固定字符串"""
+        self._run_script(INPUT_TEST_SCRIPT, "输入测试")
+    
+    def _run_script(self, source: str, name: str) -> None:
+        """在后台线程中执行宏脚本
+        
+        Args:
+            source: 脚本文本
+            name: 测试名称(用于日志)
+        """
         def run_test():
             try:
-                logging.info("输入测试3s后开始!")
-                time.sleep(3)
-                test_string = "Hello, World!"
-                logging.info(f"测试输入: {test_string}")
-                
-                for char in test_string:
-                    if char.isupper():
-                        self.input_tester.key_down('shift')
-                        self.input_tester.press_key(char.lower())
-                        self.input_tester.key_up('shift')
-                    else:
-                        self.input_tester.press_key(char)
-                    time.sleep(0.1)
-                
-                logging.info("输入测试完成")
+                from macro_script import compile_script, execute
+                execute(compile_script(source), self.input_tester)
             except Exception as e:
-                logging.error(f"输入测试出错: {str(e)}")
+                logging.error(f"{name}出错: {str(e)}")
         
         threading.Thread(target=run_test, daemon=True).start()
     
@@ -868,6 +949,7 @@ class LYKeysGUI:
         self.output_entry.config(state='normal')
         self.output_entry.delete(0, tk.END)
         self.output_entry.config(state='readonly')
+        self.ui_pump.publish('input_output', "")
 
     def _send_input_text(self):
         """发送输入框中的文本"""
@@ -875,27 +957,20 @@ class LYKeysGUI:
         if not text:
             return
             
+        try:
+            chars_per_second = float(self.type_speed_var.get())
+            compile_text(text, chars_per_second)  # 提前校验参数，编译结果会被缓存
+        except ValueError:
+            messagebox.showerror("错误", "请输入有效的输入速度！")
+            return
+            
         def send_text():
             try:
                 logging.info(f"发送文本: {text}")
-                result = ""
                 
-                for char in text:
-                    if VirtualKeys.needs_shift(char):
-                        # 特殊字符处理
-                        self.input_tester.press_key(char)
-                    elif char.isupper():
-                        # 大写字母处理
-                        self.input_tester.key_down('shift')
-                        self.input_tester.press_key(char.lower())
-                        self.input_tester.key_up('shift')
-                    else:
-                        # 普通字符处理
-                        self.input_tester.press_key(char)
-                    result += char
-                    # 更新输出框
-                    self.root.after(0, self._update_output, result)
-                    time.sleep(0.05)  # 适当的延迟
+                from headless_runner import run_text
+                run_text(self._producer_tester('text'), text, chars_per_second,
+                         on_char=lambda result: self.ui_pump.publish('input_output', result))
                 
                 logging.info("文本发送完成")
                 # 清空输入框
@@ -923,6 +998,60 @@ class LYKeysGUI:
         }
         return status_map.get(status, "未知")
     
+    def _create_input_tester(self):
+        """创建输入仲裁器及界面操作使用的输入测试器，此后驱动只由仲裁器的分发线程调用"""
+        self.input_arbiter = InputArbiter(self.driver_mgr.get_driver())
+        self.input_arbiter.start()
+        self.input_tester = InputTester(self.input_arbiter.producer('gui', priority=PRIORITY_HIGH))
+        # asyncio较重，驱动加载后才导入
+        from async_input_tester import AsyncInputTester, EventLoopThread
+        self.async_loop = EventLoopThread()
+        self.async_loop.start()
+        self.async_tester = AsyncInputTester(self.input_tester)
+
+    def _producer_tester(self, name, priority=PRIORITY_NORMAL, rate_limit=0.0):
+        """获取绑定到指定生产者的输入测试器(与界面共享驱动状态监视器)
+
+        Args:
+            name: 生产者名称
+            priority: 优先级，数值越小越优先
+            rate_limit: 速率上限(事件/秒)，0表示不限制
+        """
+        tester = InputTester(self.input_arbiter.producer(name, priority=priority, rate_limit=rate_limit))
+        tester.health_monitor = self.input_tester.health_monitor
+        return tester
+
+    def _stop_input_arbiter(self):
+        """停止输入分发线程并记录各生产者的统计"""
+        if self.async_loop:
+            self.async_loop.stop()
+            self.async_loop = None
+            self.async_tester = None
+        if not self.input_arbiter:
+            return
+        try:
+            logging.info(f"输入分发统计: {json.dumps(self.input_arbiter.stats(), ensure_ascii=False)}")
+            self.input_arbiter.stop()
+        except Exception as e:
+            logging.error(f"停止输入分发线程失败: {str(e)}")
+        self.input_arbiter = None
+
+    def _start_health_monitor(self):
+        """启动驱动状态后台监视，状态变化经刷新泵更新到界面"""
+        self.input_tester.start_health_monitor(
+            interval=1.0,
+            on_change=lambda old_status, new_status: self.ui_pump.publish('driver_status', new_status))
+    
+    def _on_driver_status_changed(self, status):
+        """驱动状态变化时更新显示(在主线程中调用)"""
+        if not self.input_tester:
+            return  # 驱动已卸载
+        self.driver_status.config(text=f"驱动状态: {self._get_status_text(status)}")
+        if status == 1:  # DEVICE_STATUS_READY
+            logging.info(f"驱动状态: {self._get_status_text(status)}")
+        else:
+            logging.warning(f"驱动状态变化: {self._get_status_text(status)}")
+    
     def _check_driver_status(self):
         """检查驱动状态"""
         if not self.input_tester:
@@ -1008,7 +1137,8 @@ class LYKeysGUI:
             logging.error("DLL路径和SYS路径不能为空")
             return
             
-        config = {
+        # 只更新本页的配置节，其他配置节(auto_move等)保持不变
+        self.config.update({
             # 驱动路径配置
             "dll_path": dll_path,
             "sys_path": sys_path,
@@ -1020,43 +1150,40 @@ class LYKeysGUI:
                 "interval_time": self.interval_time_var.get(),
                 "duration": self.duration_var.get()
             }
-        }
+        })
         
-        try:
-            with open(self.config_file, "w") as f:
-                json.dump(config, f, indent=4)
+        if self.config.flush():
             logging.info("配置保存成功")
-        except Exception as e:
-            error_msg = f"保存配置失败: {str(e)}"
-            logging.error(error_msg)
-            messagebox.showerror("错误", error_msg)
+        else:
+            messagebox.showerror("错误", "保存配置失败，详见日志")
     
     def load_path_config(self):
         """加载保存的路径配置"""
         try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, "r") as f:
-                    config = json.load(f)
-                    
-                # 加载驱动路径配置
-                dll_path = config.get("dll_path", "")
-                sys_path = config.get("sys_path", "")
-                
-                # 设置路径变量
-                if dll_path:
-                    self.dll_path_var.set(dll_path)
-                    
-                if sys_path:
-                    self.sys_path_var.set(sys_path)
+            # 加载驱动路径配置
+            dll_path = self.config.get("dll_path", "")
+            sys_path = self.config.get("sys_path", "")
+            
+            # 设置路径变量
+            if dll_path:
+                self.dll_path_var.set(dll_path)
                 
-                # 加载高频按键测试配置
-                rapid_test_config = config.get("rapid_test", {})
-                if rapid_test_config:
-                    self.test_key_var.set(rapid_test_config.get("test_key", "a"))
-                    self.press_time_var.set(rapid_test_config.get("press_time", "1"))
-                    self.interval_time_var.set(rapid_test_config.get("interval_time", "1"))
-                    self.duration_var.set(rapid_test_config.get("duration", "0"))
-                    logging.info("已加载高频按键测试配置")
+            if sys_path:
+                self.sys_path_var.set(sys_path)
+            
+            # 加载驱动后端配置
+            self.backend_config = self.config.get("backend", {})
+            if self.backend_config.get("type", "dll") != "dll":
+                logging.info(f"使用{self.backend_config['type']}驱动后端")
+            
+            # 加载高频按键测试配置
+            rapid_test_config = self.config.get("rapid_test", {})
+            if rapid_test_config:
+                self.test_key_var.set(rapid_test_config.get("test_key", "a"))
+                self.press_time_var.set(rapid_test_config.get("press_time", "1"))
+                self.interval_time_var.set(rapid_test_config.get("interval_time", "1"))
+                self.duration_var.set(rapid_test_config.get("duration", "0"))
+                logging.info("已加载高频按键测试配置")
                     
         except Exception as e:
             logging.error(f"加载配置失败: {str(e)}")
@@ -1067,15 +1194,19 @@ class LYKeysGUI:
             dll_path = self.dll_path_var.get()
             sys_path = self.sys_path_var.get()
             
-            if not dll_path or not sys_path:
+            backend = self.backend_config.get("type", "dll")
+            backend_options = {k: v for k, v in self.backend_config.items() if k != "type"}
+            
+            if backend == "dll" and (not dll_path or not sys_path):
                 logging.error("请先设置DLL和SYS文件路径！")
                 return False
             
-            self.driver_mgr = DriverManager()
+            self.driver_mgr = DriverManager(backend=backend, backend_options=backend_options)
             self.driver_mgr._setup_paths(dll_path=dll_path, sys_path=sys_path)
             
             if self.driver_mgr.initialize():
-                self.input_tester = InputTester(self.driver_mgr.get_driver())
+                self._create_input_tester()
+                self._start_health_monitor()
                 logging.info("驱动初始化成功！")
                 return True
             else:
@@ -1137,9 +1268,10 @@ class LYKeysGUI:
                 
                 # 重置所有计数和统计数据
                 self.press_count = 0
-                self._update_press_count()
-                self.run_time_label.config(text="运行时间: 0秒")
-                self.click_rate_label.config(text="平均频率: 0次/秒")
+                self.rapid_stats = None
+                self.ui_pump.publish('press_count', 0)
+                self.ui_pump.publish('rapid_status', (0, 0.0))
+                self.ui_pump.flush()
                 
                 # 更新UI状态
                 self.rapid_test_btn.config(text="停止测试")
@@ -1181,52 +1313,50 @@ class LYKeysGUI:
             except ValueError:
                 duration = 0  # 默认无限运行
             
-            # 初始化计时和计数
-            start_time = time.perf_counter()  # 使用高精度计时器
+            from headless_runner import run_rapid_test
+            from rapid_stats import RapidStats
+
+            start_time = time.perf_counter()
             last_update_time = start_time
-            last_press_time = start_time
+            self.rapid_stats = RapidStats.for_run(duration, press_time + interval_time)
             
-            while self.rapid_test_running and self.is_driver_loaded:
-                current_time = time.perf_counter()
-                elapsed_time = current_time - start_time
-                
-                # 检查是否达到运行时长
-                if duration > 0 and elapsed_time >= duration:
-                    # 确保最后一次更新显示准确的运行时间
-                    self.root.after(0, self._update_status, duration, self.press_count / duration if duration > 0 else 0)
-                    self.root.after(0, self._stop_test)
-                    break
+            def on_press(count, elapsed_time):
+                nonlocal last_update_time
+                self.press_count = count
+                self.ui_pump.publish('press_count', count)
                 
                 # 每秒更新一次状态
+                current_time = start_time + elapsed_time
                 if current_time - last_update_time >= 1.0:
-                    # 计算并更新频率
-                    rate = self.press_count / elapsed_time if elapsed_time > 0 else 0
-                    self.root.after(0, self._update_status, elapsed_time, rate)
+                    self.ui_pump.publish('rapid_status', (elapsed_time, count / elapsed_time))
                     last_update_time = current_time
-                
-                # 检查驱动状态
-                if not self.input_tester._check_device_status():
-                    raise RuntimeError("驱动状态异常")
-                
-                # 按下按键
-                if not self.input_tester.key_down(key):
-                    raise RuntimeError("按键按下失败")
-                
-                # 使用高精度计时器等待按下时间
-                while time.perf_counter() - current_time < press_time:
-                    pass
-                
-                # 释放按键
-                if not self.input_tester.key_up(key):
-                    raise RuntimeError("按键释放失败")
-                
-                # 更新计数
-                self.press_count += 1
-                self.root.after(0, self._update_press_count)
-                
-                # 使用高精度计时器等待间隔时间
-                while time.perf_counter() - current_time < (press_time + interval_time):
-                    pass
+            
+            result = run_rapid_test(
+                self._producer_tester('rapid_test'), key, press_time, interval_time,
+                duration=duration,
+                should_continue=lambda: self.rapid_test_running and self.is_driver_loaded,
+                on_press=on_press,
+                stats=self.rapid_stats
+            )
+            
+            if result['completed']:
+                # 确保最后一次更新显示准确的运行时间
+                self.ui_pump.publish('rapid_status', (duration, result['rate_per_second']))
+                self.root.after(0, self._stop_test)
+            
+            stats = result['timing']
+            logging.info(
+                f"定时抖动: p50={stats['jitter_p50_us']:.1f}us, p99={stats['jitter_p99_us']:.1f}us, "
+                f"max={stats['jitter_max_us']:.1f}us, CPU占用: {stats['cpu_percent']:.1f}%"
+            )
+            interval = result['stats']['interval']
+            hold = result['stats']['hold']
+            if interval['count']:
+                logging.info(
+                    f"按键间隔: 平均={interval['mean_us']:.1f}us, 标准差={interval['stddev_us']:.1f}us, "
+                    f"p99={interval['p99_us']:.1f}us, max={interval['max_us']:.1f}us; "
+                    f"按下时长: 平均={hold['mean_us']:.1f}us, p99={hold['p99_us']:.1f}us"
+                )
                 
         except Exception as e:
             self.rapid_test_running = False
@@ -1245,6 +1375,41 @@ class LYKeysGUI:
         """
         self.run_time_label.config(text=f"运行时间: {round(elapsed_time, 1)}秒")
         self.click_rate_label.config(text=f"平均频率: {rate:.1f}次/秒")
+        
+        if self.rapid_stats is None:
+            self.interval_stats_label.config(text="间隔: -")
+            self.hold_stats_label.config(text="按下时长: -")
+            return
+        interval, hold = self.rapid_stats.summary()
+        if not interval.count:
+            self.interval_stats_label.config(text="间隔: -")
+            self.hold_stats_label.config(text="按下时长: -")
+            return
+        self.interval_stats_label.config(
+            text=f"间隔: {interval.mean * 1000:.3f}±{interval.stddev * 1000:.3f}毫秒")
+        self.hold_stats_label.config(
+            text=f"按下时长: {hold.mean * 1000:.3f}毫秒 (最大{hold.max * 1000:.3f})")
+    
+    def _export_rapid_stats(self):
+        """导出上一次高频测试每次按键的间隔和按下时长"""
+        if self.rapid_stats is None or not self.rapid_stats.presses:
+            messagebox.showerror("错误", "没有可导出的测试数据")
+            return
+        if getattr(self, 'rapid_test_running', False):
+            messagebox.showerror("错误", "请先停止测试")
+            return
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".npy",
+            filetypes=[("NumPy files", "*.npy"), ("CSV files", "*.csv")])
+        if not filename:
+            return
+        try:
+            rows = self.rapid_stats.export(filename)
+            logging.info(f"已导出{rows}次按键数据到: {filename}")
+        except Exception as e:
+            error_msg = f"导出测试数据失败: {str(e)}"
+            logging.error(error_msg)
+            messagebox.showerror("错误", error_msg)
     
     def _stop_test(self):
         """停止测试"""
@@ -1252,9 +1417,15 @@ class LYKeysGUI:
         self.rapid_test_btn.config(text="开始测试")
         self.rapid_test_status.config(text="状态: 已完成")
     
-    def _update_press_count(self):
-        """更新按键计数显示"""
-        self.press_count_label.config(text=f"按键次数: {self.press_count}")
+    def _update_press_count(self, count=None):
+        """更新按键计数显示
+        
+        Args:
+            count (int, optional): 按键次数，默认使用self.press_count
+        """
+        if count is None:
+            count = self.press_count
+        self.press_count_label.config(text=f"按键次数: {count}")
     
     def check_privileges(self):
         """检查权限并在需要时请求提升
@@ -1278,7 +1449,7 @@ class LYKeysGUI:
                 script = os.path.abspath(sys.argv[0])
                 
                 # 根据调试模式选择python解释器
-                if DEBUG_MODE:
+                if self.debug:
                     python_exe = sys.executable  # 使用python.exe
                     window_mode = SW_SHOWNORMAL  # 显示窗口
                 else:
@@ -1328,7 +1499,7 @@ class LYKeysGUI:
         Args:
             button: 鼠标按钮，"left", "right", "middle", "x1", "x2"
         """
-        def run_test():
+        async def run_test():
             try:
                 # 检查驱动状态
                 if not self.is_driver_loaded or not self.input_tester:
@@ -1348,37 +1519,37 @@ class LYKeysGUI:
                 logging.info(f"移动鼠标到测试位置: ({test_x}, {test_y})")
                 if not self.input_tester.mouse_move_abs(test_x, test_y):
                     raise Exception("鼠标移动失败")
-                time.sleep(1)  # 等待移动完成
+                await self.async_tester.sleep(1)  # 等待移动完成
 
                 # 根据按钮类型执行不同的测试
                 if button == "left":
                     logging.info("测试左键点击 - 请观察鼠标位置的选择效果")
                     # 双击测试
-                    self.input_tester.mouse_click(duration=0.1)
-                    time.sleep(0.1)
-                    self.input_tester.mouse_click(duration=0.1)
+                    await self.async_tester.mouse_click(duration=0.1)
+                    await self.async_tester.sleep(0.1)
+                    await self.async_tester.mouse_click(duration=0.1)
                     
                 elif button == "right":
                     logging.info("测试右键点击 - 请观察是否出现右键菜单")
-                    self.input_tester.mouse_right_click()
+                    await self.async_tester.mouse_right_click()
                     
                 elif button == "middle":
                     # 先移动到浏览器标签区域位置
                     test_y = screen_height // 8
                     logging.info(f"移动鼠标到标签栏位置: ({test_x}, {test_y})")
                     self.input_tester.mouse_move_abs(test_x, test_y)
-                    time.sleep(1)
+                    await self.async_tester.sleep(1)
                     
                     logging.info("测试中键点击 - 如果在浏览器中，应该会打开新标签页")
-                    self.input_tester.mouse_middle_click()
+                    await self.async_tester.mouse_middle_click()
                     
                 elif button == "x1":
                     logging.info("测试X1键点击 - 如果在浏览器中，应该会后退")
-                    self.input_tester.mouse_x1_click()
+                    await self.async_tester.mouse_x1_click()
                     
                 elif button == "x2":
                     logging.info("测试X2键点击 - 如果在浏览器中，应该会前进")
-                    self.input_tester.mouse_x2_click()
+                    await self.async_tester.mouse_x2_click()
 
                 logging.info(f"{button}键测试完成")
                     
@@ -1386,8 +1557,11 @@ class LYKeysGUI:
                 logging.error(f"鼠标点击测试出错: {str(e)}")
                 messagebox.showerror("错误", f"鼠标点击测试出错: {str(e)}")
 
-        # 在新线程中运行测试
-        threading.Thread(target=run_test, daemon=True).start()
+        # 在事件循环线程中运行测试，不再为每次点击创建线程
+        if not self.async_loop:
+            messagebox.showerror("错误", "请先加载驱动")
+            return
+        self.async_loop.submit(run_test())
 
     def _test_mouse_wheel(self, direction: str) -> None:
         """测试鼠标滚轮
@@ -1529,17 +1703,16 @@ class LYKeysGUI:
 
                 logging.info(f"开始相对平滑移动测试 - 方向: {direction}, 距离: {distance}")
                 
-                # 执行平滑移动
-                STEPS = 10  # 将移动分成10步
-                step_x = dx / STEPS
-                step_y = dy / STEPS
+                # 执行平滑移动: 200ms内分10帧，位移之和严格等于目标距离
+                import trajectory
+                path = trajectory.linear(dx, dy, duration=0.2, rate=50)
                 
                 time.sleep(3)
                 logging.info("3秒后开始移动")
                 
-                for _ in range(STEPS):
-                    self.input_tester.mouse_move_rel(int(step_x), int(step_y))
-                    time.sleep(0.02)  # 20ms的延迟使移动更平滑
+                timer = PreciseTimer()
+                timer.start()
+                trajectory.stream_relative(self.input_tester, path, timer)
                     
                 logging.info("相对平滑移动完成")
 
@@ -1568,6 +1741,7 @@ class LYKeysGUI:
                 target_y = int(self.abs_y_var.get())
 
                 # 获取当前鼠标位置
+                import win32gui  # pywin32较重，只在需要时导入
                 cursor = win32gui.GetCursorPos()
                 start_x, start_y = cursor[0], cursor[1]
 
@@ -1577,18 +1751,12 @@ class LYKeysGUI:
 
                 logging.info(f"开始绝对平滑移动测试 - 目标位置: ({target_x}, {target_y})")
                 
-                # 执行平滑移动
-                STEPS = 20  # 将移动分成20步
-                for i in range(STEPS + 1):
-                    # 使用缓动函数使移动更自然
-                    progress = i / STEPS
-                    eased_progress = progress * (2 - progress)  # 二次缓动
-                    
-                    current_x = int(start_x + dx * eased_progress)
-                    current_y = int(start_y + dy * eased_progress)
-                    
-                    self.input_tester.mouse_move_abs(current_x, current_y)
-                    time.sleep(0.01)  # 10ms的延迟使移动更平滑
+                # 执行平滑移动: 200ms内分20帧，使用二次缓动使移动更自然
+                import trajectory
+                path = trajectory.linear(dx, dy, duration=0.2, rate=100, easing='ease_out')
+                timer = PreciseTimer()
+                timer.start()
+                trajectory.stream_absolute(self.input_tester, path, start_x, start_y, timer)
                     
                 logging.info("绝对平滑移动完成")
 
@@ -1606,7 +1774,8 @@ class LYKeysGUI:
         """切换键盘钩子状态"""
         if not self.keyboard_hook:
             try:
-                # 创建并启动键盘钩子
+                # 创建并启动键盘钩子(只在启用热键时导入)
+                from keyboard_hook import KeyboardHook
                 self.keyboard_hook = KeyboardHook()
                 
                 # 注册热键回调
@@ -1616,7 +1785,10 @@ class LYKeysGUI:
                     messagebox.showerror("错误", f"无效的热键: {hotkey}")
                     return
                     
-                self.keyboard_hook.register_hotkey(vk_code, self._toggle_auto_move)
+                # 自动重复已由按键状态机过滤，防抖用于避免快速连按时反复切换
+                # 回调在热键工作线程中执行，切换(读取设置、弹窗、更新控件)交给主线程
+                self.keyboard_hook.register_hotkey(
+                    vk_code, lambda: self.root.after(0, self._toggle_auto_move), debounce=0.3)
                 self.keyboard_hook.start()
                 
                 # 更新UI
@@ -1644,7 +1816,7 @@ class LYKeysGUI:
                 messagebox.showerror("错误", f"停止键盘钩子失败: {str(e)}")
 
     def _toggle_auto_move(self):
-        """切换自动移动状态"""
+        """切换自动移动状态(在主线程中调用)"""
         if not self.is_driver_loaded or not self.input_tester:
             messagebox.showerror("错误", "请先加载驱动")
             return
@@ -1685,54 +1857,15 @@ class LYKeysGUI:
             move_range: 移动范围
         """
         try:
-            # 获取屏幕尺寸
-            screen_width = win32api.GetSystemMetrics(win32con.SM_CXSCREEN)
-            screen_height = win32api.GetSystemMetrics(win32con.SM_CYSCREEN)
-            
-            # 获取初始鼠标位置
-            cursor_pos = win32gui.GetCursorPos()
-            center_x, center_y = cursor_pos[0], cursor_pos[1]
-            
-            # 减小移动速度和范围的影响
-            actual_speed = speed * 0.01  # 降低速度
-            actual_range = move_range * 0.5  # 减小范围
-            
-            angle = 0.0
-            last_x = center_x
-            last_y = center_y
-            
-            while self.auto_move_running:
-                try:
-                    # 计算新位置（圆形轨迹）
-                    new_x = center_x + int(actual_range * math.cos(angle))
-                    new_y = center_y + int(actual_range * math.sin(angle))
-                    
-                    # 计算相对移动距离
-                    dx = new_x - last_x
-                    dy = new_y - last_y
-                    
-                    # 确保移动距离不会太大
-                    if abs(dx) > 5 or abs(dy) > 5:
-                        dx = max(min(dx, 5), -5)
-                        dy = max(min(dy, 5), -5)
-                    
-                    # 移动鼠标（使用相对移动）
-                    if dx != 0 or dy != 0:
-                        self.input_tester.mouse_move_rel(dx, dy)
-                        last_x += dx
-                        last_y += dy
-                    
-                    # 更新角度
-                    angle += actual_speed
-                    if angle >= 2 * math.pi:
-                        angle -= 2 * math.pi
-                    
-                    # 增加延迟以减缓移动速度
-                    time.sleep(0.016)  # 约60fps的更新率
-                    
-                except Exception as e:
-                    logging.error(f"自动移动出错: {str(e)}")
-                    time.sleep(0.1)  # 出错时等待较长时间
+            from headless_runner import run_auto_move
+            result = run_auto_move(
+                self._producer_tester('auto_move', priority=PRIORITY_LOW), speed, move_range,
+                should_continue=lambda: self.auto_move_running,
+                on_error=lambda e: logging.error(f"自动移动出错: {str(e)}"),
+                rate=float(self.auto_move_config.get('rate', 1000))
+            )
+            logging.info(f"自动移动结束 - 实际频率: {result['achieved_rate']:.1f}Hz, "
+                         f"错过截止时间: {result['missed_deadlines']} 次")
                     
         except Exception as e:
             logging.error(f"自动移动线程出错: {str(e)}")
@@ -1749,21 +1882,11 @@ class LYKeysGUI:
                 'range': float(self.range_var.get())
             })
             
-            # 保存到文件
-            config = {
-                'dll_path': self.dll_path_var.get(),
-                'sys_path': self.sys_path_var.get(),
-                'rapid_test': {
-                    'test_key': self.test_key_var.get(),
-                    'press_time': self.press_time_var.get(),
-                    'interval_time': self.interval_time_var.get(),
-                    'duration': self.duration_var.get()
-                },
-                'auto_move': self.auto_move_config
-            }
-            
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f, indent=4)
+            # 只更新auto_move配置节，路径和高频测试配置保持不变
+            self.config.update({'auto_move': self.auto_move_config})
+            if not self.config.flush():
+                messagebox.showerror("错误", "保存配置失败，详见日志")
+                return
                 
             messagebox.showinfo("成功", "配置保存成功！")
             
@@ -1773,22 +1896,39 @@ class LYKeysGUI:
     def load_auto_move_config(self):
         """加载自动移动配置"""
         try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
-                    
-                if 'auto_move' in config:
-                    self.auto_move_config.update(config['auto_move'])
+            self.auto_move_config.update(self.config.get('auto_move', {}))
                     
         except Exception as e:
             logging.error(f"加载自动移动配置失败: {str(e)}")
 
+    def _on_config_changed(self, config: dict):
+        """配置文件被外部修改(在主线程中调用)"""
+        self.load_path_config()
+        self.load_auto_move_config()
+        if hasattr(self, 'hotkey_var'):
+            self.hotkey_var.set(self.auto_move_config['hotkey'])
+            self.speed_var.set(str(self.auto_move_config['speed']))
+            self.range_var.set(str(self.auto_move_config['range']))
+        logging.info("已重新加载外部修改的配置")
+
+
+def main():
+    # 命令行参数只在直接运行时解析，导入本模块没有副作用
+    # python gui.py --debug
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--debug', action='store_true', help='启用调试模式')
+    parser.add_argument('--log-file', help='同时将日志写入滚动日志文件')
+    args = parser.parse_args()
 
-if __name__ == '__main__':
     try:
-        app = LYKeysGUI()
+        app = LYKeysGUI(debug=args.debug, log_file=args.log_file)
         app.run()
         
     except Exception as e:
         # 其他未预期的错误
-        messagebox.showerror("错误", f"程序运行出错: {str(e)}") 
\ No newline at end of file
+        messagebox.showerror("错误", f"程序运行出错: {str(e)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+
+import math
+import time
+from typing import Callable, Optional
+
+from input_tester import InputTester, ACTION_KEY_UP
+from macro import MacroReader
+from macro_script import load_script, execute
+from motion_streamer import MotionStreamer
+from precise_timer import PreciseTimer
+from rapid_stats import RapidStats
+from text_compiler import compile_text
+import trajectory
+
+
+def run_rapid_test(tester: InputTester, key: str, press_time: float, interval_time: float,
+                   duration: float = 0.0,
+                   should_continue: Optional[Callable[[], bool]] = None,
+                   on_press: Optional[Callable[[int, float], None]] = None,
+                   stats: Optional[RapidStats] = None) -> dict:
+    """运行高频按键测试
+
+    Args:
+        tester: 输入测试器
+        key: 要测试的按键
+        press_time: 按键按下时间(秒)
+        interval_time: 按键间隔时间(秒)
+        duration: 运行时长(秒)，0表示一直运行直到should_continue返回False
+        should_continue: 每个周期开始前调用，返回False时停止
+        on_press: 每次按键完成后调用，参数为(累计次数, 已运行时间)
+        stats: 记录每次按键间隔和按下时长的流式统计(可在运行中读取或结束后导出)，默认新建
+
+    按键按固定周期排程，释放时刻不早于实际按下时刻之后press_time秒，迟到不会缩短按下时长；
+    落后超过一个周期时跳过错过的周期(计入missed_cycles)，不会连续补发按键。
+
+    Returns:
+        dict: 按键次数、跳过的周期数、运行时间、频率、定时抖动统计和按键统计
+
+    Raises:
+        RuntimeError: 驱动状态异常或按键失败
+    """
+    # 未启动状态监视时由本次测试临时启动，热路径中不再同步查询驱动
+    owns_monitor = tester.health_monitor is None
+    monitor = tester.start_health_monitor()
+
+    period = press_time + interval_time
+    if stats is None:
+        stats = RapidStats.for_run(duration, period)
+    record = stats.record
+    # 通过仲裁器发送时key_down/key_up放入队列即返回，改为在分发线程中记录实际发送时刻
+    mark = getattr(tester.driver, 'mark', None)
+    down_at = [0.0]
+
+    def on_down(now):
+        down_at[0] = now
+
+    def on_up(now):
+        record(down_at[0], now)
+
+    timer = PreciseTimer()
+    start_time = timer.start()
+    stats.start(start_time)
+    press_count = 0
+    cycle = 0  # 当前周期序号
+    missed_cycles = 0
+    completed = False
+    perf_counter = time.perf_counter
+
+    try:
+        while should_continue is None or should_continue():
+            timer.wait_offset(cycle * period)
+            elapsed_time = perf_counter() - start_time
+
+            # 检查是否达到运行时长
+            if duration > 0 and elapsed_time >= duration:
+                completed = True
+                break
+
+            # 落后超过一个周期时跳过错过的周期
+            late = int(elapsed_time / period) - cycle
+            if late > 0:
+                cycle += late
+                missed_cycles += late
+            release_offset = cycle * period + press_time
+
+            # 检查驱动状态(只读取监视器发布的状态)
+            if not monitor.ready:
+                raise RuntimeError("驱动状态异常")
+
+            # 按下按键
+            if not tester.key_down(key):
+                raise RuntimeError("按键按下失败")
+            down_time = perf_counter()
+            if mark:
+                mark(on_down)
+
+            # 等待到本周期的释放时间，按下迟到时顺延，保证完整的按下时长
+            timer.wait_until(max(start_time + release_offset, down_time + press_time))
+
+            # 释放按键
+            if not tester.key_up(key):
+                raise RuntimeError("按键释放失败")
+            up_time = perf_counter()
+            if mark:
+                mark(on_up)
+            else:
+                record(down_time, up_time)
+
+            press_count += 1
+            cycle += 1
+            if on_press:
+                on_press(press_count, up_time - start_time)
+    finally:
+        if owns_monitor:
+            tester.stop_health_monitor()
+
+    if mark:
+        tester.driver.flush(timeout=1.0)  # 等待分发线程记录完最后一次按键
+    stats.finish(perf_counter())
+    elapsed_time = duration if completed else timer.elapsed()
+    return {
+        'workload': 'rapid',
+        'key': key,
+        'completed': completed,
+        'presses': press_count,
+        'missed_cycles': missed_cycles,
+        'elapsed_seconds': elapsed_time,
+        'rate_per_second': press_count / elapsed_time if elapsed_time > 0 else 0.0,
+        'timing': timer.stats(),
+        'stats': stats.snapshot(),
+    }
+
+
+def run_text(tester: InputTester, text: str, chars_per_second: float,
+             on_char: Optional[Callable[[str], None]] = None) -> dict:
+    """输入一段文本
+
+    Args:
+        tester: 输入测试器
+        text: 要输入的文本
+        chars_per_second: 输入速度(字符/秒)
+        on_char: 每输入一个字符后调用，参数为已输入的文本
+
+    Returns:
+        dict: 字符数、事件数、耗时和实际输入速度
+
+    Raises:
+        ValueError: 输入速度无效
+        RuntimeError: 按键发送失败
+    """
+    plan = compile_text(text, chars_per_second)
+    result = ""
+    start = 0
+    start_time = time.perf_counter()
+    for char, end in zip(plan.chars, plan.char_ends):
+        if not tester.send_batch(plan.batch, start, end):
+            raise RuntimeError("按键发送失败")
+        start = end
+        if on_char:
+            result += char
+            on_char(result)
+    elapsed_time = time.perf_counter() - start_time
+    return {
+        'workload': 'text',
+        'chars': len(plan.chars),
+        'skipped': len(plan.skipped),
+        'events': len(plan),
+        'elapsed_seconds': elapsed_time,
+        'chars_per_second': len(plan.chars) / elapsed_time if elapsed_time > 0 else 0.0,
+    }
+
+
+def run_macro(tester: InputTester, path: str, speed: float = 1.0,
+              should_continue: Optional[Callable[[], bool]] = None) -> dict:
+    """回放录制的按键宏
+
+    事件从内存映射的宏文件中逐条读取，并按录制时间戳对应的绝对时间发送，
+    误差不会随事件数累积。结束或中断时释放仍处于按下状态的按键。
+
+    Args:
+        tester: 输入测试器
+        path: 宏文件路径
+        speed: 回放速度倍数，2表示两倍速
+        should_continue: 每个事件发送前检查的间隔内调用，返回False时停止
+
+    Returns:
+        dict: 事件数、耗时、是否完成和定时抖动统计
+
+    Raises:
+        ValueError: 回放速度或宏文件无效
+        RuntimeError: 驱动状态异常
+    """
+    if speed <= 0:
+        raise ValueError(f"无效的回放速度: {speed}")
+
+    key_down = tester.driver.KeyDown
+    key_up = tester.driver.KeyUp
+    held = bytearray(256)
+    sent = 0
+    completed = False
+    scale = 1e-9 / speed
+
+    with MacroReader(path) as reader:
+        total = len(reader)
+        owns_monitor = tester.health_monitor is None
+        monitor = tester.start_health_monitor()
+        timer = PreciseTimer()
+        timer.start()
+        wait_offset = timer.wait_offset
+        try:
+            for offset_ns, vk_code, action, _ in reader.records():
+                # 每256个事件检查一次是否继续
+                if not sent & 0xFF:
+                    if should_continue is not None and not should_continue():
+                        break
+                    if not monitor.ready:
+                        raise RuntimeError("驱动状态异常")
+                wait_offset(offset_ns * scale)
+                if action == ACTION_KEY_UP:
+                    key_up(vk_code)
+                    held[vk_code & 0xFF] = 0
+                else:
+                    key_down(vk_code)
+                    held[vk_code & 0xFF] = 1
+                sent += 1
+            else:
+                completed = True
+        finally:
+            # 释放仍处于按下状态的按键，避免中断后按键卡住
+            for vk_code in range(256):
+                if held[vk_code]:
+                    key_up(vk_code)
+            if owns_monitor:
+                tester.stop_health_monitor()
+
+    elapsed_time = timer.elapsed()
+    return {
+        'workload': 'macro',
+        'file': path,
+        'completed': completed,
+        'events': sent,
+        'total_events': total,
+        'speed': speed,
+        'elapsed_seconds': elapsed_time,
+        'events_per_second': sent / elapsed_time if elapsed_time > 0 else 0.0,
+        'timing': timer.stats(),
+    }
+
+
+def run_script(tester: InputTester, path: str, speed: float = 1.0,
+               should_continue: Optional[Callable[[], bool]] = None) -> dict:
+    """执行宏脚本(编译结果缓存在__lykcache__中)
+
+    Args:
+        tester: 输入测试器
+        path: 脚本文件路径
+        speed: 执行速度倍数，2表示等待时间减半
+        should_continue: 每次等待前调用，返回False时停止
+
+    Returns:
+        dict: 执行的指令数、是否完成、耗时和定时抖动统计
+
+    Raises:
+        ValueError: 脚本或执行速度无效
+        RuntimeError: 驱动状态异常
+    """
+    load_start = time.perf_counter()
+    program = load_script(path)
+    load_time = time.perf_counter() - load_start
+
+    owns_monitor = tester.health_monitor is None
+    tester.start_health_monitor()
+    try:
+        result = execute(program, tester, speed, should_continue)
+    finally:
+        if owns_monitor:
+            tester.stop_health_monitor()
+    result['workload'] = 'script'
+    result['file'] = path
+    result['load_seconds'] = load_time
+    return result
+
+
+def run_auto_move(tester: InputTester, speed: float, move_range: float,
+                  duration: float = 0.0,
+                  should_continue: Optional[Callable[[], bool]] = None,
+                  on_error: Optional[Callable[[Exception], None]] = None,
+                  rate: float = 1000.0) -> dict:
+    """以当前鼠标位置为起点做圆周相对移动
+
+    Args:
+        tester: 输入测试器
+        speed: 移动速度
+        move_range: 移动范围
+        duration: 运行时长(秒)，0表示一直运行直到should_continue返回False
+        should_continue: 定期调用，返回False时停止
+        on_error: 移动出错时调用(在发送线程中)，未提供时记录日志
+        rate: 发送频率(125-1000Hz)
+
+    Returns:
+        dict: 帧数、移动次数、运行时间、实际频率、错过的截止时间和定时抖动统计
+    """
+    # 减小移动速度和范围的影响(沿用按16ms一帧定义的角速度: 每帧speed*0.01弧度)
+    angular_speed = speed * 0.01 / 0.016  # 弧度/秒
+    radius = move_range * 0.5
+
+    streamer = MotionStreamer(tester, rate=rate, on_error=on_error)
+    if angular_speed > 0:
+        # 预先计算一整圈的逐帧位移并循环播放；误差扩散保证每圈回到起点，不会漂移
+        streamer.play(trajectory.orbit(radius, period=2 * math.pi / angular_speed, rate=rate), loop=True)
+
+    start_time = time.perf_counter()
+    streamer.start()
+    try:
+        while should_continue is None or should_continue():
+            if duration > 0:
+                remaining = duration - (time.perf_counter() - start_time)
+                if remaining <= 0:
+                    break
+                time.sleep(min(remaining, 0.05))
+            else:
+                time.sleep(0.05)
+    finally:
+        streamer.stop()
+
+    stats = streamer.stats()
+    return {
+        'workload': 'auto_move',
+        'frames': stats['ticks'],
+        'moves': stats['moves'],
+        'elapsed_seconds': time.perf_counter() - start_time,
+        'rate': stats['rate'],
+        'achieved_rate': stats['achieved_rate'],
+        'missed_deadlines': stats['missed_deadlines'],
+        'errors': stats['errors'],
+        'timing': stats['timing'],
+    }
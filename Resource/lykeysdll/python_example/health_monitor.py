@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import threading
+import time
+from typing import Callable
+
+# 驱动状态(与GetDriverStatus返回值一致)
+DEVICE_STATUS_UNKNOWN = 0
+DEVICE_STATUS_READY = 1
+DEVICE_STATUS_ERROR = 2
+
+
+class DeviceHealthMonitor:
+    """驱动状态后台监视器
+
+    后台线程按固定间隔调用CheckDeviceStatus/GetDriverStatus，并把结果写入普通属性。
+    热路径只读取ready属性(单次属性读取，无系统调用、无锁)；
+    状态发生变化时在监视线程中通知订阅者。
+    """
+
+    def __init__(self, driver, interval: float = 1.0):
+        """初始化监视器
+
+        Args:
+            driver: 驱动实例
+            interval: 轮询间隔(秒)
+        """
+        if interval <= 0:
+            raise ValueError(f"无效的轮询间隔: {interval}")
+        self.driver = driver
+        self.interval = interval
+        self.status = DEVICE_STATUS_UNKNOWN
+        self.ready = False
+        self.polls = 0
+        self.errors = 0
+        self.last_poll_time = 0.0  # 上次轮询的time.time()
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def subscribe(self, callback: Callable[[int, int], None]) -> None:
+        """订阅状态变化事件
+
+        Args:
+            callback: 回调函数，参数为(旧状态, 新状态)，在监视线程中调用
+        """
+        with self._lock:
+            self._subscribers = self._subscribers + [callback]
+
+    def unsubscribe(self, callback: Callable[[int, int], None]) -> None:
+        """取消订阅状态变化事件"""
+        with self._lock:
+            self._subscribers = [cb for cb in self._subscribers if cb is not callback]
+
+    def poll(self) -> int:
+        """立即查询一次驱动状态并发布结果
+
+        Returns:
+            int: 最新的驱动状态
+        """
+        try:
+            self.driver.CheckDeviceStatus()
+            status = self.driver.GetDriverStatus()
+        except Exception as e:
+            self.errors += 1
+            logging.error(f"查询驱动状态失败: {str(e)}")
+            status = DEVICE_STATUS_ERROR
+        self.polls += 1
+        self.last_poll_time = time.time()
+        self._publish(status)
+        return status
+
+    def _publish(self, status: int) -> None:
+        old_status = self.status
+        self.status = status
+        self.ready = status == DEVICE_STATUS_READY
+        if status == old_status:
+            return
+        for callback in self._subscribers:
+            try:
+                callback(old_status, status)
+            except Exception as e:
+                logging.error(f"驱动状态回调出错: {str(e)}")
+
+    def start(self) -> None:
+        """启动后台轮询(启动前先同步查询一次，保证ready立即可用)"""
+        if self._thread is not None:
+            return
+        self.poll()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='DeviceHealthMonitor', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台轮询"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval + 1.0)
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        """后台轮询是否在运行"""
+        return self._thread is not None
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.poll()
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""低级键盘钩子使用的结构体和常量(不依赖pywin32，可在非Windows平台导入)"""
+
+import ctypes
+from ctypes import wintypes
+
+# 键盘消息
+WM_KEYDOWN = 0x0100
+WM_KEYUP = 0x0101
+WM_SYSKEYDOWN = 0x0104
+WM_SYSKEYUP = 0x0105
+WM_QUIT = 0x0012
+
+# KBDLLHOOKSTRUCT.flags
+LLKHF_EXTENDED = 0x01
+LLKHF_LOWER_IL_INJECTED = 0x02
+LLKHF_INJECTED = 0x10
+LLKHF_ALTDOWN = 0x20
+LLKHF_UP = 0x80
+
+
+# 定义KBDLLHOOKSTRUCT结构体
+class KBDLLHOOKSTRUCT(ctypes.Structure):
+    _fields_ = [
+        ("vkCode", wintypes.DWORD),
+        ("scanCode", wintypes.DWORD),
+        ("flags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ctypes.POINTER(wintypes.ULONG))
+    ]
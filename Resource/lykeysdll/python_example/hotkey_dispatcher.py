@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from hotkey_matcher import HotkeyMatcher
+from key_state import EDGE_DOWN
+from instrumentation import LatencyHistogram
+
+
+class HotkeyDispatcher:
+    """键盘钩子事件的异步分发器
+
+    钩子线程只调用push()把(vk, flags, 时间戳)写入预分配的环形缓冲区后立即返回；
+    分发线程按顺序取出事件交给按键状态机，只在按下边沿(不含自动重复和被过滤的注入事件)
+    匹配热键，匹配到的回调交给工作线程池执行，钩子过程中不再运行任何用户代码。
+
+    缓冲区写满时丢弃最旧的事件。丢弃的事件可能包含按键释放，为避免误触发组合键，
+    发生丢弃后分发线程会清空按键状态。
+    """
+
+    def __init__(self, matcher: HotkeyMatcher = None, capacity: int = 1024,
+                 workers: int = 1, debounce: float = 0.0):
+        """初始化分发器
+
+        Args:
+            matcher: 热键匹配器，默认新建
+            capacity: 环形缓冲区容量(事件数)
+            workers: 执行回调的工作线程数
+            debounce: 默认的热键防抖间隔(秒)，间隔内重复触发的同一热键将被忽略
+        """
+        if capacity <= 0:
+            raise ValueError(f"无效的缓冲区容量: {capacity}")
+        if workers <= 0:
+            raise ValueError(f"无效的工作线程数: {workers}")
+        self.matcher = matcher or HotkeyMatcher()
+        self.capacity = capacity
+        self.workers = workers
+        self.debounce = debounce
+        self._default_debounce = int(debounce * 1e9)
+        self._debounce = {}  # {热键: 防抖间隔(纳秒)}
+        self._listeners = ()  # 每个事件的监听函数(如宏录制)
+        self._last_fired = {}  # {热键: 上次触发的事件时间戳}
+
+        # 环形缓冲区
+        self._vks = array('H', [0]) * capacity
+        self._flags = array('I', [0]) * capacity
+        self._timestamps = array('q', [0]) * capacity
+        self._head = 0  # 下一个读取位置(累计序号)
+        self._tail = 0  # 下一个写入位置(累计序号)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+        # 统计
+        self.received = 0
+        self.dropped = 0
+        self.dispatched = 0
+        self.debounced = 0
+        self.max_depth = 0
+        self.latency = LatencyHistogram()  # 事件发生到回调开始执行的耗时
+        self._latency_lock = threading.Lock()
+
+        self._executor = None
+        self._worker_ids = set()  # 工作线程的线程标识
+        self._thread = None
+        self._running = False
+
+    def set_debounce(self, hotkey, seconds: float) -> None:
+        """设置单个热键的防抖间隔
+
+        Args:
+            hotkey: 虚拟键码或键码元组(组合键)
+            seconds: 防抖间隔(秒)，0表示不防抖
+        """
+        self._debounce[hotkey] = int(seconds * 1e9)
+
+    def add_listener(self, listener) -> None:
+        """添加事件监听函数
+
+        Args:
+            listener: 在分发线程中对每个事件调用，参数为(vk_code, flags, 时间戳, 边沿类型)
+        """
+        self._listeners = self._listeners + (listener,)
+
+    def remove_listener(self, listener) -> None:
+        """移除事件监听函数"""
+        self._listeners = tuple(l for l in self._listeners if l is not listener)
+
+    def push(self, vk_code: int, flags: int, timestamp: int = None) -> None:
+        """写入一个键盘事件(在钩子线程中调用)
+
+        Args:
+            vk_code: 虚拟键码
+            flags: KBDLLHOOKSTRUCT.flags，按键释放时包含LLKHF_UP
+            timestamp: 事件时间(time.perf_counter_ns)，默认取当前时间
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter_ns()
+        with self._lock:
+            tail = self._tail
+            if tail - self._head >= self.capacity:
+                self._head += 1
+                self.dropped += 1
+            slot = tail % self.capacity
+            self._vks[slot] = vk_code
+            self._flags[slot] = flags
+            self._timestamps[slot] = timestamp
+            self._tail = tail + 1
+            self.received += 1
+            depth = self._tail - self._head
+            if depth > self.max_depth:
+                self.max_depth = depth
+        self._wakeup.set()
+
+    @property
+    def depth(self) -> int:
+        """当前排队的事件数"""
+        return self._tail - self._head
+
+    def _drain(self):
+        """取出缓冲区中的全部事件"""
+        with self._lock:
+            head = self._head
+            tail = self._tail
+            dropped = self.dropped
+            events = []
+            for seq in range(head, tail):
+                slot = seq % self.capacity
+                events.append((self._vks[slot], self._flags[slot], self._timestamps[slot]))
+            self._head = tail
+        return events, dropped
+
+    def _run(self) -> None:
+        seen_dropped = 0
+        matcher = self.matcher
+        state = matcher.state
+        while self._running:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            events, dropped = self._drain()
+            if dropped != seen_dropped:
+                seen_dropped = dropped
+                matcher.reset()
+                logging.warning(f"热键事件队列已满，累计丢弃 {dropped} 个事件")
+            for vk_code, flags, timestamp in events:
+                edge = state.feed(vk_code, flags)
+                for listener in self._listeners:
+                    try:
+                        listener(vk_code, flags, timestamp, edge)
+                    except Exception as e:
+                        logging.error(f"键盘事件监听函数错误: {str(e)}")
+                if edge != EDGE_DOWN:
+                    continue
+                for hotkey, callback in matcher.match(vk_code):
+                    if self._should_debounce(hotkey, timestamp):
+                        self.debounced += 1
+                        continue
+                    self.dispatched += 1
+                    self._executor.submit(self._invoke, callback, timestamp)
+
+    def _should_debounce(self, hotkey, timestamp: int) -> bool:
+        interval = self._debounce.get(hotkey, self._default_debounce)
+        if interval <= 0:
+            return False
+        last = self._last_fired.get(hotkey)
+        if last is not None and timestamp - last < interval:
+            return True
+        self._last_fired[hotkey] = timestamp
+        return False
+
+    def _invoke(self, callback, timestamp: int) -> None:
+        latency = time.perf_counter_ns() - timestamp
+        with self._latency_lock:
+            self.latency.record(latency)
+        try:
+            callback()
+        except Exception as e:
+            logging.error(f"热键回调错误: {str(e)}")
+
+    def start(self) -> None:
+        """启动分发线程和工作线程池"""
+        if self._running:
+            return
+        self._running = True
+        self._worker_ids = set()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='HotkeyWorker',
+                                            initializer=self._register_worker)
+        self._thread = threading.Thread(target=self._run, name='HotkeyDispatcher', daemon=True)
+        self._thread.start()
+
+    def _register_worker(self) -> None:
+        self._worker_ids.add(threading.get_ident())
+
+    def stop(self, wait: bool = True) -> None:
+        """停止分发
+
+        在热键回调(工作线程)中调用时不等待回调执行完毕，否则工作线程会等待自己结束。
+
+        Args:
+            wait: 是否等待已提交的回调执行完毕
+        """
+        if not self._running:
+            return
+        self._running = False
+        self._wakeup.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+        if threading.get_ident() in self._worker_ids:
+            wait = False
+        self._executor.shutdown(wait=wait)
+        self._executor = None
+
+    def stats(self) -> dict:
+        """获取队列与分发统计"""
+        with self._latency_lock:
+            latency = self.latency.snapshot()
+        return {
+            'queue_depth': self.depth,
+            'max_queue_depth': self.max_depth,
+            'received': self.received,
+            'dropped': self.dropped,
+            'dispatched': self.dispatched,
+            'debounced': self.debounced,
+            'dispatch_latency': latency,
+        }
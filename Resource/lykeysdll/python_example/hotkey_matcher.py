@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+from typing import Callable, Tuple, Union
+
+from key_state import KeyStateEngine, MODIFIER_SIDES, EDGE_DOWN
+
+Hotkey = Union[int, Tuple[int, ...]]
+
+
+class HotkeyMatcher:
+    """按触发键索引的热键匹配器
+
+    按键状态由KeyStateEngine以256位的位集合保存，每个热键预先编译为所需按键的位掩码，
+    并登记到其中每个按键的触发列表下。按键按下时只检查以该键为触发键的热键，
+    每个热键的判断是一次位与运算，与已注册的热键总数无关。
+
+    通用修饰键(VK_SHIFT/VK_CONTROL/VK_MENU)在左右任意一侧按下时都视为按下。
+    注册/注销时整体重建索引并替换引用，钩子线程读取时无需加锁。
+    """
+
+    def __init__(self, state: KeyStateEngine = None):
+        """初始化匹配器
+
+        Args:
+            state: 按键状态机，默认新建
+        """
+        self.state = state or KeyStateEngine()
+        self.hotkeys = {}  # {热键: 回调}，热键为虚拟键码或键码元组(组合键)
+        self._index = [()] * 256  # 触发键 -> ((掩码, 热键, 回调), ...)
+
+        # 通用修饰键 -> 可触发它的左右键码
+        self._triggers = {vk: (vk,) for vk in range(256)}
+        for side, generic in MODIFIER_SIDES.items():
+            self._triggers[generic] = self._triggers[generic] + (side,)
+
+    @staticmethod
+    def _keys(hotkey: Hotkey) -> Tuple[int, ...]:
+        keys = hotkey if isinstance(hotkey, tuple) else (hotkey,)
+        for vk_code in keys:
+            if not isinstance(vk_code, int) or not 0 < vk_code < 256:
+                raise ValueError(f"无效的虚拟键码: {vk_code}")
+        return keys
+
+    def register(self, hotkey: Hotkey, callback: Callable[[], None]) -> None:
+        """注册热键
+
+        Args:
+            hotkey: 虚拟键码或键码元组(组合键)
+            callback: 回调函数
+
+        Raises:
+            ValueError: 键码无效
+        """
+        self._keys(hotkey)
+        self.hotkeys[hotkey] = callback
+        self._rebuild()
+
+    def unregister(self, hotkey: Hotkey) -> None:
+        """注销热键"""
+        if hotkey in self.hotkeys:
+            del self.hotkeys[hotkey]
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        index = [[] for _ in range(256)]
+        for hotkey, callback in self.hotkeys.items():
+            keys = self._keys(hotkey)
+            mask = 0
+            for vk_code in keys:
+                mask |= 1 << vk_code
+            triggers = set()
+            for vk_code in keys:
+                triggers.update(self._triggers[vk_code])
+            for trigger in triggers:
+                index[trigger].append((mask, hotkey, callback))
+        self._index = [tuple(entries) for entries in index]
+
+    def match(self, vk_code: int) -> tuple:
+        """按当前按键状态匹配以vk_code为触发键的热键
+
+        Args:
+            vk_code: 刚按下的虚拟键码(0-255)
+
+        Returns:
+            tuple: 满足条件的((热键, 回调), ...)
+        """
+        entries = self._index[vk_code]
+        if not entries:
+            return ()
+        pressed = self.state.mask
+        return tuple((hotkey, callback) for mask, hotkey, callback in entries if pressed & mask == mask)
+
+    def key_down(self, vk_code: int) -> tuple:
+        """处理按键按下(按住时的自动重复不会再次触发)
+
+        Args:
+            vk_code: 虚拟键码(0-255)
+
+        Returns:
+            tuple: 本次按键触发的((热键, 回调), ...)
+        """
+        if self.state.press(vk_code) != EDGE_DOWN:
+            return ()
+        return self.match(vk_code)
+
+    def key_up(self, vk_code: int) -> None:
+        """处理按键释放"""
+        self.state.release(vk_code)
+
+    def is_pressed(self, vk_code: int) -> bool:
+        """按键当前是否按下"""
+        return self.state.is_pressed(vk_code)
+
+    def pressed_keys(self) -> set:
+        """当前按下的按键集合"""
+        return self.state.pressed_keys()
+
+    def reset(self) -> None:
+        """清空按键状态(例如钩子重启后)"""
+        self.state.reset()
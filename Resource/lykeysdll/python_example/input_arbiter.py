@@ -0,0 +1,436 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from driver_backends import INPUT_EXPORTS, CONTROL_EXPORTS
+from instrumentation import LatencyHistogram
+
+# 生产者优先级(数值越小越优先)
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+
+class _SyncCall:
+    """在分发线程中同步执行的调用(驱动状态查询等需要返回值的接口)"""
+
+    __slots__ = ('func', 'args', 'result', 'error', 'done')
+
+    def __init__(self, func, args):
+        self.func = func
+        self.args = args
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+    def __call__(self):
+        try:
+            self.result = self.func(*self.args)
+        except Exception as e:
+            self.error = e
+        self.done.set()
+
+
+def _queued(producer, func):
+    def call(*args):
+        producer._submit(((func, args),))
+        return 1
+    return call
+
+
+def _stamp(callback):
+    callback(time.perf_counter())
+
+
+def _synchronous(producer, func):
+    def call(*args):
+        return producer._call(func, args)
+    return call
+
+
+class InputProducer:
+    """输入生产者，同时是驱动的代理
+
+    输入类接口(KeyDown、MouseMoveRELATIVE等)只把调用放入仲裁器队列后立即返回，
+    由分发线程按顺序执行；状态类接口(CheckDeviceStatus等)在分发线程中同步执行并返回结果。
+    因此可以直接用InputTester(producer)包装，现有测试代码无需修改。
+
+    在group()中发出的调用作为一个整体提交，分发时连续执行，不会与其他生产者的事件交错。
+    """
+
+    def __init__(self, arbiter, name: str, priority: int, rate_limit: float, burst: float,
+                 max_pending: int):
+        self.arbiter = arbiter
+        self.name = name
+        self.priority = priority
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.max_pending = max_pending
+
+        self._groups = deque()  # (提交序号, 提交时间ns, 调用元组)
+        self._group = None  # group()中收集的调用
+        self.removed = False  # 已从仲裁器移除
+        self._tokens = burst
+        self._refilled = time.perf_counter()
+
+        # 统计
+        self.pending = 0  # 排队中的事件数
+        self.in_flight = 0  # 已取出但尚未执行完的事件数
+        self.max_depth = 0
+        self.submitted = 0
+        self.dispatched = 0
+        self.groups = 0
+        self.throttled = 0  # 因速率限制被推迟的组数
+        self._deferred = 0  # 最近一次计入throttled的组的提交序号
+        self.errors = 0
+        self.first_submit = 0.0
+        self.last_dispatch = 0.0
+        self.queue_wait = LatencyHistogram()
+
+        driver = arbiter.driver
+        for name in INPUT_EXPORTS + ('KeyEventBatch',):
+            func = getattr(driver, name, None)
+            if func is not None:
+                setattr(self, name, _queued(self, func))
+        for name in CONTROL_EXPORTS:
+            func = getattr(driver, name, None)
+            if func is not None:
+                setattr(self, name, _synchronous(self, func))
+
+    @contextmanager
+    def group(self):
+        """原子提交: with块中发出的输入调用合并为一组，连续发送(例如Shift+按键)
+
+        组内不能包含需要返回值的状态查询。
+        """
+        if self._group is not None:
+            yield self  # 嵌套时并入外层组
+            return
+        self._group = []
+        try:
+            yield self
+            calls = tuple(self._group)
+        finally:
+            self._group = None
+        if calls:
+            self.arbiter._enqueue(self, calls)
+
+    def submit(self, calls) -> None:
+        """提交一组调用
+
+        Args:
+            calls: (驱动接口名, 参数元组)序列，整组连续执行
+        """
+        driver = self.arbiter.driver
+        self._submit(tuple((getattr(driver, name), tuple(args)) for name, args in calls))
+
+    def _submit(self, calls) -> None:
+        if self._group is not None:
+            self._group.extend(calls)
+        else:
+            self.arbiter._enqueue(self, calls)
+
+    def mark(self, callback) -> None:
+        """在分发线程中按提交顺序调用callback(time.perf_counter())
+
+        之前提交的事件此时已经交给驱动，用于记录事件实际发送的时刻(而不是放入队列的时刻)。
+        回调在分发线程中执行，应当尽量简短。
+
+        Args:
+            callback: 回调函数，参数为执行时刻(perf_counter)
+        """
+        self._submit(((_stamp, (callback,)),))
+
+    def _call(self, func, args):
+        if self._group is not None:
+            raise RuntimeError("原子提交组内不能调用状态查询接口")
+        call = _SyncCall(func, args)
+        self.arbiter._enqueue(self, ((call, None),), urgent=True)
+        if not call.done.wait(self.arbiter.call_timeout):
+            raise TimeoutError(f"状态查询超时: {getattr(func, '__name__', func)}")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def flush(self, timeout: float = None) -> bool:
+        """等待本生产者已提交的事件全部执行完毕
+
+        Returns:
+            bool: 是否在超时前完成
+        """
+        return self.arbiter._wait_idle(self, timeout)
+
+    def _take_tokens(self, count: int, now: float) -> float:
+        """尝试消耗count个令牌
+
+        Returns:
+            float: 0表示成功，否则为令牌足够前还需等待的时间(秒)
+        """
+        rate = self.rate_limit
+        if rate <= 0:
+            return 0.0
+        tokens = min(self.burst, self._tokens + (now - self._refilled) * rate)
+        self._refilled = now
+        needed = min(count, self.burst)  # 超过突发上限的组允许透支，之后按速率偿还
+        if tokens < needed:
+            self._tokens = tokens
+            return (needed - tokens) / rate
+        self._tokens = tokens - count
+        return 0.0
+
+    def stats(self) -> dict:
+        """获取本生产者的统计"""
+        elapsed = self.last_dispatch - self.first_submit
+        return {
+            'priority': self.priority,
+            'rate_limit': self.rate_limit,
+            'submitted': self.submitted,
+            'dispatched': self.dispatched,
+            'groups': self.groups,
+            'throttled': self.throttled,
+            'errors': self.errors,
+            'queue_depth': self.pending,
+            'max_queue_depth': self.max_depth,
+            'events_per_second': self.dispatched / elapsed if elapsed > 0 else 0.0,
+            'queue_wait': self.queue_wait.snapshot(),
+        }
+
+    def __getattr__(self, name):
+        return getattr(self.arbiter.driver, name)
+
+
+class InputArbiter:
+    """多生产者输入仲裁器
+
+    由单个分发线程独占驱动，所有生产者(高频测试、自动移动、文本输入、鼠标测试等)
+    只向队列提交事件，驱动不会被多个线程同时调用。
+
+    调度规则: 状态查询最先执行；其余按生产者优先级(数值小者优先)，同优先级按提交顺序；
+    超出速率限制的生产者暂时跳过，不阻塞其他生产者。每个生产者的队列有长度上限，
+    队列满时提交方阻塞等待。
+    """
+
+    def __init__(self, driver, call_timeout: float = 5.0):
+        """初始化仲裁器
+
+        Args:
+            driver: 驱动实例(由分发线程独占调用)
+            call_timeout: 状态查询等待分发线程执行的最长时间(秒)
+        """
+        self.driver = driver
+        self.call_timeout = call_timeout
+        self.producers = {}
+        self._levels = []  # 按优先级分组的生产者列表(由高到低)，增删生产者时重建
+        self._urgent = deque()
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._work = threading.Condition(self._lock)  # 分发线程等待新事件
+        self._space = threading.Condition(self._lock)  # 生产者等待队列空间或执行完毕
+        self._thread = None
+        self._running = False
+        self.dispatched = 0
+
+    def producer(self, name: str, priority: int = PRIORITY_NORMAL, rate_limit: float = 0.0,
+                 burst: float = None, max_pending: int = 4096) -> InputProducer:
+        """获取(不存在时创建)生产者
+
+        Args:
+            name: 生产者名称，同名返回同一个生产者
+            priority: 优先级，数值越小越优先
+            rate_limit: 速率上限(事件/秒)，0表示不限制
+            burst: 允许的突发事件数，默认为10ms的配额(至少1个)
+            max_pending: 排队事件数上限
+
+        Returns:
+            InputProducer: 生产者
+        """
+        if rate_limit < 0:
+            raise ValueError(f"无效的速率上限: {rate_limit}")
+        if max_pending <= 0:
+            raise ValueError(f"无效的队列长度: {max_pending}")
+        with self._lock:
+            producer = self.producers.get(name)
+            if producer is None:
+                if burst is None:
+                    burst = max(1.0, rate_limit * 0.01)
+                producer = InputProducer(self, name, priority, rate_limit, burst, max_pending)
+                self.producers[name] = producer
+                self._rebuild_levels()
+            return producer
+
+    def _rebuild_levels(self) -> None:
+        """按优先级重建生产者分组(在锁内调用)"""
+        levels = {}
+        for producer in self.producers.values():
+            levels.setdefault(producer.priority, []).append(producer)
+        self._levels = [levels[priority] for priority in sorted(levels)]
+
+    def remove_producer(self, name: str) -> int:
+        """移除生产者并丢弃其排队中的事件(正在执行的组仍会执行完)
+
+        移除后该生产者再提交事件会抛出RuntimeError，同名生产者可重新创建。
+
+        Args:
+            name: 生产者名称
+
+        Returns:
+            int: 丢弃的事件数
+        """
+        with self._lock:
+            producer = self.producers.pop(name, None)
+            if producer is None:
+                return 0
+            producer.removed = True
+            self._rebuild_levels()
+            dropped = producer.pending
+            producer._groups.clear()
+            producer.pending = 0
+            self._space.notify_all()  # 唤醒等待队列空间或flush的提交方
+            return dropped
+
+    def _enqueue(self, producer: InputProducer, calls, urgent: bool = False) -> None:
+        now = time.perf_counter_ns()
+        with self._lock:
+            # 在锁内检查，stop()清空队列后不会再有调用进入队列
+            if not self._running:
+                raise RuntimeError("输入分发线程未运行")
+            if producer.removed:
+                raise RuntimeError(f"生产者已移除: {producer.name}")
+            if urgent:
+                self._urgent.append((producer, now, calls))
+                self._work.notify()
+                return
+            count = len(calls)
+            while producer.pending and producer.pending + count > producer.max_pending:
+                self._space.wait()
+                if not self._running:
+                    raise RuntimeError("输入分发线程未运行")
+            if producer.removed:
+                raise RuntimeError(f"生产者已移除: {producer.name}")
+            self._sequence += 1
+            producer._groups.append((self._sequence, now, calls))
+            producer.pending += count
+            producer.submitted += count
+            if not producer.first_submit:
+                producer.first_submit = time.perf_counter()
+            if producer.pending > producer.max_depth:
+                producer.max_depth = producer.pending
+            self._work.notify()
+
+    def _next(self):
+        """取出下一组要执行的调用(在锁内调用)
+
+        Returns:
+            tuple: (生产者, 调用元组)，没有可执行的组时返回(None, 需要等待的秒数或None)
+        """
+        if self._urgent:
+            producer, submitted, calls = self._urgent.popleft()
+            return producer, calls
+        wait = None
+        now = time.perf_counter()
+        for level in self._levels:
+            # 同优先级按队首组的提交顺序，通常只有一个生产者有排队事件，无需排序
+            candidates = [p for p in level if p._groups]
+            if len(candidates) > 1:
+                candidates.sort(key=lambda p: p._groups[0][0])
+            for producer in candidates:
+                sequence, submitted, calls = producer._groups[0]
+                delay = producer._take_tokens(len(calls), now)
+                if delay:
+                    if producer._deferred != sequence:  # 同一组被多次推迟只计一次
+                        producer._deferred = sequence
+                        producer.throttled += 1
+                    wait = delay if wait is None else min(wait, delay)
+                    continue
+                producer._groups.popleft()
+                count = len(calls)
+                producer.pending -= count
+                producer.in_flight += count
+                producer.queue_wait.record(time.perf_counter_ns() - submitted)
+                return producer, calls
+        return None, wait
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while True:
+                    if not self._running:
+                        return
+                    producer, calls = self._next()
+                    if producer is not None:
+                        break
+                    self._work.wait(calls)
+            if calls[0][1] is None:
+                calls[0][0]()  # 同步调用
+                continue
+            errors = 0
+            for func, args in calls:
+                try:
+                    func(*args)
+                except Exception as e:
+                    errors += 1
+                    logging.error(f"输入事件发送失败({producer.name}): {str(e)}")
+            count = len(calls)
+            with self._lock:
+                producer.in_flight -= count
+                producer.dispatched += count
+                producer.groups += 1
+                producer.errors += errors
+                producer.last_dispatch = time.perf_counter()
+                self.dispatched += count
+                self._space.notify_all()
+
+    def _wait_idle(self, producer: InputProducer, timeout: float = None) -> bool:
+        with self._lock:
+            return self._space.wait_for(lambda: not producer.pending and not producer.in_flight
+                                        or not self._running, timeout)
+
+    def start(self) -> None:
+        """启动分发线程"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='InputArbiter', daemon=True)
+        self._thread.start()
+
+    def stop(self, drain: bool = True, timeout: float = 1.0) -> None:
+        """停止分发线程
+
+        Args:
+            drain: 是否先等待已提交的事件执行完毕
+            timeout: 等待排空的最长时间(秒)
+        """
+        if not self._running:
+            return
+        if drain:
+            deadline = time.perf_counter() + timeout
+            for producer in list(self.producers.values()):
+                if not producer.flush(max(0.0, deadline - time.perf_counter())):
+                    break
+        with self._lock:
+            self._running = False
+            self._work.notify_all()
+            self._space.notify_all()
+            while self._urgent:
+                call = self._urgent.popleft()[2][0][0]
+                call.error = RuntimeError("输入分发线程已停止")
+                call.done.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def stats(self) -> dict:
+        """获取每个生产者的吞吐量和排队等待统计"""
+        with self._lock:
+            return {
+                'dispatched': self.dispatched,
+                'producers': {name: producer.stats() for name, producer in self.producers.items()},
+            }
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing.connection import Client
+
+from driver_backends import INPUT_EXPORTS, OP_CODES
+from input_protocol import (REQUEST, EVENT, RESPONSE, REQUEST_EVENTS, REQUEST_CALL, REQUEST_CLOSE,
+                            CALL_CODES,
+                            STATUS_OK, ARG_COUNTS, MAX_BATCH, default_address, address_family,
+                            authkey_path, read_authkey)
+from instrumentation import LatencyHistogram
+
+
+def _input_method(client, op, argc):
+    if argc == 0:
+        def call():
+            client._add(op, 0, 0)
+            return 1
+    elif argc == 1:
+        def call(arg0):
+            client._add(op, arg0, 0)
+            return 1
+    else:
+        def call(arg0, arg1):
+            client._add(op, arg0, arg1)
+            return 1
+    return call
+
+
+def _call_method(client, code):
+    def call():
+        return client._call(code)
+    return call
+
+
+class InputClient:
+    """本地输入服务的客户端，同时是驱动的代理
+
+    用InputTester(InputClient())包装后与直接使用驱动的接口完全相同，但不需要管理员权限，
+    也不需要自己加载驱动。输入事件以流水线方式发送，不等待服务端确认；
+    在batch()中发出的事件合并为一个请求，服务端连续发送，不会与其他客户端的事件交错。
+    状态查询同步等待服务端返回。
+
+    后台线程接收服务端的确认，按序号计算每个请求的往返延迟。
+    """
+
+    def __init__(self, address: str = None, authkey: bytes = None, max_in_flight: int = 65536,
+                 call_timeout: float = 5.0):
+        """连接输入服务
+
+        Args:
+            address: 服务地址，默认为input_protocol.default_address()
+            authkey: 连接认证密钥(须与服务端一致)，默认从服务端写入的密钥文件读取
+            max_in_flight: 尚未确认的最大请求数，超出时发送方等待
+            call_timeout: 状态查询等待服务端返回的最长时间(秒)
+        """
+        self.address = address or default_address()
+        if authkey is None:
+            authkey = read_authkey(authkey_path(self.address))
+        self._conn = Client(self.address, family=address_family(self.address), authkey=authkey)
+        self._send_lock = threading.Lock()
+        self._sequence = 0
+        self._sent_at = {}  # {序号: 发送时间ns}
+        self._calls = {}  # {序号: [Event, 状态, 返回值]}
+        self._in_flight = threading.Semaphore(max_in_flight)
+        self._batch = None  # batch()中收集的事件
+        self._closed = False
+        self._disconnected = False  # 接收线程已退出，不能再发送
+        self.call_timeout = call_timeout
+
+        # 统计
+        self.requests = 0
+        self.events = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()  # 请求往返延迟(纳秒)
+
+        for name in INPUT_EXPORTS:
+            setattr(self, name, _input_method(self, OP_CODES[name], ARG_COUNTS[name]))
+        for name, code in CALL_CODES.items():
+            setattr(self, name, _call_method(self, code))
+
+        self._reader = threading.Thread(target=self._read, name='InputClientReader', daemon=True)
+        self._reader.start()
+
+    # ===== 发送 =====
+    def _send(self, kind: int, events: bytes, count: int, waiter=None) -> int:
+        if not self._in_flight.acquire(blocking=False):
+            # 等待确认释放名额，连接断开后不再等待
+            while not self._in_flight.acquire(timeout=0.1):
+                if self._disconnected:
+                    raise ConnectionError("与输入服务的连接已断开")
+        with self._send_lock:
+            if self._disconnected:
+                raise ConnectionError("与输入服务的连接已断开")
+            self._sequence = sequence = (self._sequence + 1) & 0xFFFFFFFF
+            if waiter is not None:
+                self._calls[sequence] = waiter
+            self._sent_at[sequence] = time.perf_counter_ns()
+            self._conn.send_bytes(REQUEST.pack(sequence, kind, count) + events)
+            self.requests += 1
+            self.events += count
+        return sequence
+
+    def _add(self, op: int, arg0: int, arg1: int) -> None:
+        event = EVENT.pack(op, arg0, arg1)
+        batch = self._batch
+        if batch is None:
+            self._send(REQUEST_EVENTS, event, 1)
+            return
+        batch.append(event)
+        if len(batch) == MAX_BATCH:
+            self._flush_batch()
+
+    def _flush_batch(self) -> None:
+        batch = self._batch
+        if batch:
+            self._send(REQUEST_EVENTS, b''.join(batch), len(batch))
+            batch.clear()
+
+    @contextmanager
+    def batch(self):
+        """批量发送: with块中的输入事件合并为一个请求(超过65535个时拆分)"""
+        if self._batch is not None:
+            yield self
+            return
+        self._batch = []
+        try:
+            yield self
+            self._flush_batch()
+        finally:
+            self._batch = None
+
+    def _call(self, code: int):
+        if self._batch is not None:
+            self._flush_batch()
+        waiter = [threading.Event(), STATUS_OK, 0]
+        sequence = self._send(REQUEST_CALL, EVENT.pack(code, 0, 0), 1, waiter)
+        if not waiter[0].wait(self.call_timeout):
+            self._calls.pop(sequence, None)
+            raise TimeoutError("等待输入服务返回状态查询结果超时")
+        if waiter[1] == -1:
+            raise ConnectionError("与输入服务的连接已断开")
+        if waiter[1] != STATUS_OK:
+            raise RuntimeError("输入服务执行状态查询失败")
+        return waiter[2]
+
+    # ===== 接收 =====
+    def _read(self) -> None:
+        try:
+            self._receive()
+        except Exception as e:
+            logging.error(f"接收输入服务响应失败: {str(e)}")
+        finally:
+            # 接收线程退出后不再接受新请求，并唤醒所有等待中的状态查询
+            with self._send_lock:
+                self._disconnected = True
+                calls, self._calls = self._calls, {}
+            for waiter in calls.values():
+                waiter[1] = -1
+                waiter[0].set()
+
+    def _receive(self) -> None:
+        recv = self._conn.recv_bytes
+        unpack = RESPONSE.unpack
+        while True:
+            try:
+                data = recv()
+            except (EOFError, OSError):
+                break
+            sequence, status, value = unpack(data)
+            now = time.perf_counter_ns()
+            sent_at = self._sent_at.pop(sequence, None)
+            if sent_at is not None:
+                self.latency.record(now - sent_at)
+            if status != STATUS_OK:
+                self.errors += 1
+            waiter = self._calls.pop(sequence, None)
+            if waiter is not None:
+                waiter[1] = status
+                waiter[2] = value
+                waiter[0].set()
+            self._in_flight.release()
+
+    def wait_acknowledged(self, timeout: float = None) -> bool:
+        """等待已发送的请求全部被服务端确认
+
+        Returns:
+            bool: 是否在超时前完成
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self._sent_at and not self._disconnected:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+            time.sleep(0.0005)
+        return True
+
+    def stats(self) -> dict:
+        """获取本客户端的请求数、事件数和往返延迟统计"""
+        return {
+            'requests': self.requests,
+            'events': self.events,
+            'errors': self.errors,
+            'in_flight': len(self._sent_at),
+            'round_trip': self.latency.snapshot(),
+        }
+
+    def close(self) -> None:
+        """断开连接"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._batch is not None:
+            self._flush_batch()
+        try:
+            # 服务端处理完之前的请求后关闭连接，接收线程随之退出
+            self._send(REQUEST_CLOSE, b'', 0)
+            self._reader.join(timeout=1.0)
+        except OSError:
+            pass
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""本地输入服务的二进制协议
+
+传输层使用multiprocessing.connection(Windows为命名管道，其他平台为Unix域套接字)，
+每条消息自带长度前缀。消息内容(小端):
+    请求: 请求头(7字节): 序号(u32), 类型(u8), 事件数(u16)，之后是若干事件
+    事件(9字节): 操作码(u8), 参数1(i32), 参数2(i32)
+    响应(13字节): 序号(u32), 状态(u8, 0成功/1失败), 返回值(i64)
+输入事件的操作码与driver_backends.OP_CODES相同，一个请求中的全部事件作为一组连续发送。
+
+连接总是需要认证: 服务端启动时生成随机密钥，写入只有当前用户可读的密钥文件
+(见authkey_path)，同一用户的客户端从该文件读取密钥。命名管道本身没有访问控制，
+没有密钥的本地进程无法通过认证，也就无法发送输入。
+"""
+
+import os
+import struct
+
+from driver_backends import INPUT_EXPORTS, OP_CODES
+
+REQUEST = struct.Struct('<IBH')
+EVENT = struct.Struct('<Bii')
+RESPONSE = struct.Struct('<IBq')
+
+# 请求类型
+REQUEST_EVENTS = 0  # 输入事件批次
+REQUEST_CALL = 1    # 需要返回值的状态查询(只含一个事件)
+REQUEST_CLOSE = 2   # 客户端断开，服务端确认后关闭连接
+
+# 状态查询的操作码
+CALL_CODES = {
+    'CheckDeviceStatus': 1,
+    'GetDriverStatus': 2,
+    'GetDetailedErrorCode': 3,
+    'GetLastCheckTime': 4,
+}
+CALL_NAMES = {code: name for name, code in CALL_CODES.items()}
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# 每个输入接口的参数个数
+ARG_COUNTS = {name: 0 for name in INPUT_EXPORTS}
+ARG_COUNTS.update({
+    'KeyDown': 1, 'KeyUp': 1,
+    'MouseMoveRELATIVE': 2, 'MouseMoveABSOLUTE': 2,
+    'MouseWheelUp': 1, 'MouseWheelDown': 1,
+})
+OP_ARG_COUNTS = {OP_CODES[name]: count for name, count in ARG_COUNTS.items()}
+
+MAX_BATCH = 0xFFFF  # 单个请求的最大事件数
+
+
+def default_address() -> str:
+    """默认的服务地址"""
+    if os.name == 'nt':
+        return r'\\.\pipe\lykeys-input'
+    return os.path.join('/tmp', f'lykeys-input-{os.getuid()}.sock')
+
+
+def address_family(address: str) -> str:
+    return 'AF_PIPE' if address.startswith('\\\\') else 'AF_UNIX'
+
+
+def authkey_path(address: str) -> str:
+    """服务地址对应的密钥文件路径
+
+    Unix域套接字为套接字路径加.key后缀；命名管道为当前用户LOCALAPPDATA目录下的同名文件。
+    """
+    if address_family(address) == 'AF_UNIX':
+        return address + '.key'
+    base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    return os.path.join(base, 'LingYaoKeys', address.rsplit('\\', 1)[-1] + '.key')
+
+
+def write_authkey(path: str) -> bytes:
+    """生成随机密钥并写入只有当前用户可读写的文件
+
+    Returns:
+        bytes: 密钥
+    """
+    authkey = os.urandom(32)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(authkey.hex().encode('ascii'))
+    os.replace(tmp_path, path)
+    return authkey
+
+
+def read_authkey(path: str) -> bytes:
+    """读取密钥文件
+
+    Raises:
+        FileNotFoundError: 密钥文件不存在(服务未运行或由其他用户运行)
+    """
+    with open(path, 'rb') as f:
+        return bytes.fromhex(f.read().decode('ascii').strip())
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import stat
+import threading
+import time
+from multiprocessing.connection import Listener, Client
+
+from driver_backends import OP_NAMES
+from input_arbiter import PRIORITY_NORMAL
+from input_protocol import (REQUEST, EVENT, RESPONSE, REQUEST_EVENTS, REQUEST_CALL, REQUEST_CLOSE,
+                            CALL_NAMES, STATUS_OK, STATUS_ERROR, OP_ARG_COUNTS,
+                            default_address, address_family, authkey_path, write_authkey)
+
+
+class _ClientConnection:
+    """一个客户端连接，对应仲裁器中的一个生产者"""
+
+    def __init__(self, server, conn, name: str, producer):
+        self.server = server
+        self.conn = conn
+        self.name = name
+        self.producer = producer
+        self.connected_at = time.perf_counter()
+        self.disconnected_at = 0.0
+        self.requests = 0
+        self.events = 0
+        self.errors = 0
+
+        # 按操作码直接索引驱动接口，避免每个事件查找名称
+        driver = server.arbiter.driver
+        self._funcs = [None] * (max(OP_NAMES) + 1)
+        for op, name in OP_NAMES.items():
+            self._funcs[op] = getattr(driver, name, None)
+
+    def _events(self, data: bytes):
+        """把请求中的事件解码为(驱动接口, 参数)元组"""
+        funcs = self._funcs
+        calls = []
+        for op, arg0, arg1 in EVENT.iter_unpack(memoryview(data)[REQUEST.size:]):
+            func = funcs[op] if op < len(funcs) else None
+            if func is None:
+                raise ValueError(f"未知的操作码: {op}")
+            argc = OP_ARG_COUNTS[op]
+            calls.append((func, (arg0, arg1)[:argc]))
+        return tuple(calls)
+
+    def _handle(self, data: bytes):
+        """处理一个请求
+
+        Returns:
+            tuple: (状态, 返回值)
+        """
+        sequence, kind, count = REQUEST.unpack_from(data)
+        if len(data) != REQUEST.size + count * EVENT.size:
+            raise ValueError(f"请求长度与事件数不符: {len(data)} / {count}")
+        if kind == REQUEST_EVENTS:
+            calls = self._events(data)
+            if calls:
+                # 一个请求的事件作为一组提交，放入队列即确认
+                self.producer._submit(calls)
+            self.events += count
+            return STATUS_OK, 0
+        if kind == REQUEST_CALL:
+            code = EVENT.unpack_from(data, REQUEST.size)[0]
+            name = CALL_NAMES.get(code)
+            if name is None:
+                raise ValueError(f"未知的状态查询: {code}")
+            return STATUS_OK, int(getattr(self.producer, name)() or 0)
+        raise ValueError(f"未知的请求类型: {kind}")
+
+    def serve(self) -> None:
+        recv = self.conn.recv_bytes
+        send = self.conn.send_bytes
+        try:
+            while True:
+                try:
+                    data = recv()
+                except (EOFError, OSError):
+                    break
+                if len(data) >= REQUEST.size and data[4] == REQUEST_CLOSE:
+                    # 正常关闭: 已确认的事件先发送完，异常断开时则直接丢弃
+                    self.producer.flush(timeout=self.server.close_timeout)
+                    break
+                self.requests += 1
+                sequence = REQUEST.unpack_from(data)[0] if len(data) >= REQUEST.size else 0
+                try:
+                    status, value = self._handle(data)
+                except Exception as e:
+                    self.errors += 1
+                    logging.error(f"处理客户端请求失败({self.name}): {str(e)}")
+                    status, value = STATUS_ERROR, 0
+                try:
+                    send(RESPONSE.pack(sequence, status, value))
+                except OSError:
+                    break
+        finally:
+            self.disconnected_at = time.perf_counter()
+            self.conn.close()
+            self.server._disconnected(self)
+
+    def stats(self) -> dict:
+        end = self.disconnected_at or time.perf_counter()
+        elapsed = end - self.connected_at
+        producer_stats = self.producer.stats()
+        return {
+            'connected': not self.disconnected_at,
+            'connected_seconds': elapsed,
+            'requests': self.requests,
+            'events': self.events,
+            'errors': self.errors + producer_stats['errors'],
+            'events_per_second': self.events / elapsed if elapsed > 0 else 0.0,
+            'events_per_request': self.events / self.requests if self.requests else 0.0,
+            'queue_wait': producer_stats['queue_wait'],
+        }
+
+
+class InputServer:
+    """本地输入服务
+
+    由一个进程加载驱动并运行仲裁器，其他进程通过InputClient提交输入事件，
+    不需要各自加载驱动。每个连接在仲裁器中对应一个生产者(client-1、client-2...)，
+    同一请求中的事件连续发送，不会与其他客户端的事件交错。
+
+    输入事件放入仲裁器队列后即向客户端确认，队列满时暂停读取该连接，形成背压。
+
+    连接总是需要认证: 未指定密钥时启动时生成随机密钥并写入只有当前用户可读的密钥文件，
+    停止时删除。Windows命名管道没有设置访问控制，任何本地进程都能连接，
+    只有读得到密钥文件的进程才能通过认证。
+    """
+
+    def __init__(self, arbiter, address: str = None, authkey: bytes = None,
+                 priority: int = PRIORITY_NORMAL, max_pending: int = 4096):
+        """初始化输入服务
+
+        Args:
+            arbiter: 已启动的输入仲裁器
+            address: 监听地址，默认为input_protocol.default_address()
+            authkey: 连接认证密钥，默认在启动时随机生成并写入authkey_path(address)
+            priority: 客户端生产者的优先级
+            max_pending: 每个客户端排队事件数上限
+        """
+        self.arbiter = arbiter
+        self.address = address or default_address()
+        self.authkey = authkey
+        self.authkey_file = None  # 由本服务写入、停止时删除的密钥文件
+        self.priority = priority
+        self.max_pending = max_pending
+        self.close_timeout = 5.0  # 客户端正常关闭时等待其已确认事件发送完毕的最长时间(秒)
+        self._listener = None
+        self._thread = None
+        self._running = False
+        self._lock = threading.Lock()
+        self._clients = {}  # {名称: _ClientConnection}，只保留已连接的客户端
+        self._count = 0
+        self._closed = {'clients': 0, 'requests': 0, 'events': 0, 'errors': 0}  # 已断开客户端的累计
+
+    def start(self) -> None:
+        """开始监听"""
+        if self._running:
+            return
+        family = address_family(self.address)
+        if family == 'AF_UNIX':
+            self._remove_stale_socket()
+            # 在创建套接字前收紧umask，绑定后即只有当前用户可访问(同时作用于密钥文件)
+            old_umask = os.umask(0o077)
+        try:
+            if self.authkey is None:
+                self.authkey_file = authkey_path(self.address)
+                self.authkey = write_authkey(self.authkey_file)
+            self._listener = Listener(self.address, family=family, authkey=self.authkey)
+        finally:
+            if family == 'AF_UNIX':
+                os.umask(old_umask)
+        self._running = True
+        self._thread = threading.Thread(target=self._accept, name='InputServer', daemon=True)
+        self._thread.start()
+        logging.info(f"输入服务已启动: {self.address}" +
+                     (f", 密钥文件: {self.authkey_file}" if self.authkey_file else ""))
+
+    def _remove_stale_socket(self) -> None:
+        """删除上次异常退出残留的套接字文件，监听地址是其他类型的文件时拒绝启动"""
+        try:
+            st = os.lstat(self.address)
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(st.st_mode):
+            raise FileExistsError(f"监听地址已存在且不是套接字文件: {self.address}")
+        os.remove(self.address)
+
+    def _accept(self) -> None:
+        while self._running:
+            try:
+                conn = self._listener.accept()
+            except Exception as e:
+                if self._running:
+                    logging.warning(f"接受客户端连接失败: {str(e)}")
+                    continue
+                break
+            if not self._running:
+                conn.close()
+                break
+            with self._lock:
+                self._count += 1
+                name = f'client-{self._count}'
+                producer = self.arbiter.producer(name, self.priority, max_pending=self.max_pending)
+                client = _ClientConnection(self, conn, name, producer)
+                self._clients[name] = client
+            logging.info(f"客户端已连接: {name}")
+            threading.Thread(target=client.serve, name=f'InputServer-{name}', daemon=True).start()
+
+    def _disconnected(self, client: _ClientConnection) -> None:
+        # 移除生产者，长时间运行的服务中仲裁器的生产者数量不随连接次数增长
+        dropped = self.arbiter.remove_producer(client.name)
+        errors = client.errors + client.producer.errors
+        with self._lock:
+            self._clients.pop(client.name, None)
+            closed = self._closed
+            closed['clients'] += 1
+            closed['requests'] += client.requests
+            closed['events'] += client.events
+            closed['errors'] += errors
+        logging.info(f"客户端已断开: {client.name}, 请求 {client.requests} 个, 事件 {client.events} 个, "
+                     f"丢弃未发送事件 {dropped} 个")
+
+    def stop(self) -> None:
+        """停止监听并断开所有客户端"""
+        if not self._running:
+            return
+        self._running = False
+        listener, self._listener = self._listener, None
+        family = address_family(self.address)
+        authkey = self.authkey
+
+        # 连接一次以唤醒阻塞在accept中的线程。accept线程可能已经因为其他连接失败而退出，
+        # 此时没有人应答认证，因此在后台线程中连接，监听关闭后该连接随之失败
+        def wake():
+            try:
+                Client(self.address, family=family, authkey=authkey).close()
+            except Exception:
+                pass
+
+        waker = threading.Thread(target=wake, name='InputServerWake', daemon=True)
+        waker.start()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        listener.close()
+        waker.join(timeout=1.0)
+        if self.authkey_file:
+            try:
+                os.remove(self.authkey_file)
+            except OSError:
+                pass
+            self.authkey_file = None
+            self.authkey = None  # 下次启动重新生成
+        with self._lock:
+            clients = list(self._clients.values())
+        for client in clients:
+            if not client.disconnected_at:
+                client.conn.close()
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def stats(self) -> dict:
+        """获取已连接客户端的请求数、事件吞吐量和排队等待统计，以及已断开客户端的累计"""
+        with self._lock:
+            clients = list(self._clients.values())
+            closed = dict(self._closed)
+        return {
+            'address': self.address,
+            'clients': {client.name: client.stats() for client in clients},
+            'disconnected': closed,
+            'dispatched': self.arbiter.dispatched,
+        }
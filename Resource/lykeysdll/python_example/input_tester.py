@@ -1,9 +1,90 @@
 # -*- coding: utf-8 -*-
 
 from virtuakeys_mapping import VirtualKeys
+from precise_timer import PreciseTimer
+from instrumentation import InstrumentedDriver
+from health_monitor import DeviceHealthMonitor, DEVICE_STATUS_READY
 import logging
+import json
 import time
-from typing import Optional
+import ctypes
+from array import array
+from typing import Iterable, Optional, Tuple, Union
+
+# 批量按键事件动作类型
+ACTION_KEY_DOWN = 0
+ACTION_KEY_UP = 1
+
+
+class KeyEvent(ctypes.Structure):
+    """批量提交时的单条按键事件(与DLL批量接口的内存布局一致)"""
+    _fields_ = [
+        ("action", ctypes.c_ubyte),   # 0 = 按下, 1 = 释放
+        ("vk", ctypes.c_ushort),      # 虚拟键码
+        ("delay", ctypes.c_double),   # 事件发送后的等待时间(秒)
+    ]
+
+
+class KeyBatch:
+    """预解析的按键事件批次
+
+    事件在构建时一次性完成键码解析，并以连续的数组缓冲区保存，
+    重复发送同一批次时不再有任何字符串处理开销。
+    """
+
+    __slots__ = ('actions', 'vks', 'delays', '_packed')
+
+    def __init__(self):
+        self.actions = array('B')
+        self.vks = array('H')
+        self.delays = array('d')
+        self._packed = None
+
+    @classmethod
+    def from_events(cls, events: Iterable[Tuple[int, Union[int, str], float]]) -> 'KeyBatch':
+        """从(action, key, delay)序列构建批次
+
+        Args:
+            events: 事件序列，key可以是虚拟键码或按键名称
+
+        Returns:
+            KeyBatch: 构建好的批次
+
+        Raises:
+            ValueError: 动作类型、按键或延时无效
+            TypeError: 事件格式或延时类型错误
+        """
+        batch = cls()
+        for action, key, delay in events:
+            if action not in (ACTION_KEY_DOWN, ACTION_KEY_UP):
+                raise ValueError(f"无效的事件类型: {action}")
+            vk_code = key if isinstance(key, int) else VirtualKeys.get_vk_code(key)
+            if vk_code is None:
+                raise ValueError(f"无效的按键: {key}")
+            if not 0 < vk_code < 256:
+                raise ValueError(f"无效的虚拟键码: {vk_code}")
+            if not delay >= 0:  # 同时排除NaN
+                raise ValueError(f"无效的延时: {delay}")
+            batch.actions.append(action)
+            batch.vks.append(vk_code)
+            batch.delays.append(delay)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def packed(self):
+        """获取打包后的KeyEvent数组(首次调用时生成并缓存)"""
+        if self._packed is None:
+            count = len(self.actions)
+            packed = (KeyEvent * count)()
+            for i in range(count):
+                event = packed[i]
+                event.action = self.actions[i]
+                event.vk = self.vks[i]
+                event.delay = self.delays[i]
+            self._packed = packed
+        return self._packed
 
 
 class InputTester:
@@ -18,19 +99,109 @@ class InputTester:
         self.driver = driver
         self.last_check_time = 0
         self.check_interval = 1.0  # 状态检查间隔(秒)
+        self.health_monitor = None  # 驱动状态后台监视器
         # self.min_key_interval = 0.001  # 最小按键间隔(秒)
     
+    # ===== 延迟统计相关方法 =====
+    def enable_instrumentation(self) -> None:
+        """开启驱动调用延迟统计
+
+        开启后驱动被替换为记录耗时的代理；未开启时调用路径与原来完全相同，没有额外开销。
+        """
+        if not isinstance(self.driver, InstrumentedDriver):
+            self.driver = InstrumentedDriver(self.driver)
+
+    def disable_instrumentation(self) -> None:
+        """关闭驱动调用延迟统计(已记录的数据随之丢弃)"""
+        if isinstance(self.driver, InstrumentedDriver):
+            self.driver = self.driver.wrapped
+
+    @property
+    def instrumentation_enabled(self) -> bool:
+        """是否已开启延迟统计"""
+        return isinstance(self.driver, InstrumentedDriver)
+
+    def latency_stats(self) -> dict:
+        """获取各驱动接口的调用延迟统计
+
+        Returns:
+            dict: {接口名: {count, mean_us, min_us, p50_us, p99_us, max_us}}，未开启时为空
+        """
+        if not self.instrumentation_enabled:
+            return {}
+        return self.driver.snapshot()
+
+    def reset_latency_stats(self) -> None:
+        """清空延迟统计"""
+        if self.instrumentation_enabled:
+            self.driver.reset()
+
+    def dump_latency_stats(self, path: str) -> bool:
+        """把当前延迟统计快照写入JSON文件
+
+        Args:
+            path: 输出文件路径
+
+        Returns:
+            bool: 是否写入成功
+        """
+        try:
+            snapshot = {
+                'timestamp': time.time(),
+                'operations': self.latency_stats(),
+            }
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, indent=4, ensure_ascii=False)
+            return True
+        except Exception as e:
+            logging.error(f"保存延迟统计失败: {str(e)}")
+            return False
+
     # ===== 状态检查相关方法 =====
+    def start_health_monitor(self, interval: float = 1.0, on_change=None) -> DeviceHealthMonitor:
+        """启动驱动状态后台监视
+
+        启动后_check_device_status()只读取监视器发布的状态，不再调用驱动。
+
+        Args:
+            interval: 轮询间隔(秒)
+            on_change: 可选的状态变化回调，参数为(旧状态, 新状态)，在首次查询前订阅
+
+        Returns:
+            DeviceHealthMonitor: 监视器，可用于订阅状态变化
+        """
+        if self.health_monitor is None:
+            driver = self.driver
+            if isinstance(driver, InstrumentedDriver):
+                driver = driver.wrapped  # 状态轮询不计入调用延迟统计
+            self.health_monitor = DeviceHealthMonitor(driver, interval)
+        if on_change is not None:
+            self.health_monitor.subscribe(on_change)
+        self.health_monitor.start()
+        return self.health_monitor
+
+    def stop_health_monitor(self) -> None:
+        """停止驱动状态后台监视"""
+        if self.health_monitor is not None:
+            self.health_monitor.stop()
+            self.health_monitor = None
+
     def _check_device_status(self) -> bool:
-        """检查驱动状态"""
-        current_time = time.time()
+        """检查驱动状态
+
+        已启动后台监视时直接返回缓存的状态；否则按check_interval节流同步查询。
+        """
+        monitor = self.health_monitor
+        if monitor is not None:
+            return monitor.ready
+        current_time = time.perf_counter()
         if current_time - self.last_check_time >= self.check_interval:
             self.driver.CheckDeviceStatus()
             self.last_check_time = current_time
             
             driver_status = self.driver.GetDriverStatus()
             
-            if driver_status != 1:  # 1 = DEVICE_STATUS_READY
+            if driver_status != DEVICE_STATUS_READY:
                 logging.warning(f"驱动状态异常: {driver_status}")
                 return False
         return True
@@ -134,7 +305,65 @@ class InputTester:
         except Exception as e:
             logging.error(f"按键操作失败: {str(e)}")
             return False
-    
+
+    def send_batch(self, events, start: int = 0, stop: Optional[int] = None) -> bool:
+        """批量发送按键事件
+
+        驱动DLL导出KeyEventBatch时整批一次性提交，否则退化为本地绑定的紧凑循环，
+        避免逐个事件调用key_down/key_up带来的键码解析和属性查找开销。
+
+        Args:
+            events: KeyBatch，或(action, key, delay)序列(将先构建为KeyBatch)
+            start: 起始事件下标
+            stop: 结束事件下标(不含)，None表示到批次末尾
+
+        Returns:
+            bool: 操作是否成功
+        """
+        try:
+            batch = events if isinstance(events, KeyBatch) else KeyBatch.from_events(events)
+        except (ValueError, TypeError) as e:
+            logging.error(f"批量事件无效: {str(e)}")
+            return False
+
+        if stop is None:
+            stop = len(batch)
+        if start >= stop:
+            return True
+
+        try:
+            batch_func = getattr(self.driver, 'KeyEventBatch', None)
+            if batch_func is not None:
+                packed = batch.packed()
+                count = stop - start
+                if count != len(packed):
+                    packed = (KeyEvent * count).from_buffer(packed, start * ctypes.sizeof(KeyEvent))
+                batch_func(packed, count)
+                return True
+
+            key_down = self.driver.KeyDown
+            key_up = self.driver.KeyUp
+            # 每次调用单独的定时器，多线程发送互不影响，且不保留延迟样本
+            wait_until = PreciseTimer(max_samples=0).wait_until
+            deadline = time.perf_counter()
+            if start or stop != len(batch):
+                events = zip(batch.actions[start:stop], batch.vks[start:stop], batch.delays[start:stop])
+            else:
+                events = zip(batch.actions, batch.vks, batch.delays)
+            for action, vk_code, delay in events:
+                if action == ACTION_KEY_UP:
+                    key_up(vk_code)
+                else:
+                    key_down(vk_code)
+                # 按绝对截止时间等待，避免延迟误差逐个累积
+                if delay > 0:
+                    deadline += delay
+                    wait_until(deadline)
+            return True
+        except Exception as e:
+            logging.error(f"批量按键发送失败: {str(e)}")
+            return False
+
     # ===== 鼠标操作相关方法 =====
     def mouse_move_rel(self, dx: int, dy: int) -> bool:
         """相对移动鼠标
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+import time
+from array import array
+
+from driver_backends import INPUT_EXPORTS, CONTROL_EXPORTS
+
+
+class LatencyHistogram:
+    """固定大小的对数-线性延迟直方图(HDR风格)
+
+    以纳秒为单位记录，每个2的幂区间再均分为16个子桶，相对误差约6%。
+    桶数量固定，记录时不分配内存；超过上限的值计入最后一个桶。
+    """
+
+    SUB_BUCKET_BITS = 4  # record()中内联了该值
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+    MAX_BITS = 40  # 约18分钟
+
+    def __init__(self):
+        self.bucket_count = (self.MAX_BITS - self.SUB_BUCKET_BITS) * self.SUB_BUCKETS + self.SUB_BUCKETS
+        self.counts = array('Q', [0]) * self.bucket_count
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        if value < self.SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - self.SUB_BUCKET_BITS - 1
+        index = (shift << self.SUB_BUCKET_BITS) + (value >> shift)
+        return min(index, self.bucket_count - 1)
+
+    def _upper_bound(self, index: int) -> int:
+        """桶所覆盖的最大值"""
+        if index < 2 * self.SUB_BUCKETS:
+            return index
+        shift = (index >> self.SUB_BUCKET_BITS) - 1
+        mantissa = (index & (self.SUB_BUCKETS - 1)) | self.SUB_BUCKETS
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        """记录一个值(纳秒)"""
+        # 与_index()相同的计算，内联以减少热路径上的调用开销
+        if value < 16:
+            index = value if value > 0 else 0
+        else:
+            shift = value.bit_length() - 5
+            index = (shift << 4) + (value >> shift)
+            if index >= self.bucket_count:
+                index = self.bucket_count - 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def minimum(self) -> int:
+        """最小值所在桶的下界(纳秒)"""
+        for index, bucket in enumerate(self.counts):
+            if bucket:
+                if index < 2 * self.SUB_BUCKETS:
+                    return index
+                return self._upper_bound(index - 1) + 1
+        return 0
+
+    def percentile(self, p: float) -> int:
+        """获取百分位值(纳秒)，返回所在桶的上界且不超过最大值"""
+        if not self.count:
+            return 0
+        target = max(1, int(p / 100.0 * self.count + 0.5))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= target:
+                return min(self._upper_bound(index), self.max)
+        return self.max
+
+    def reset(self) -> None:
+        """清空记录"""
+        for i in range(self.bucket_count):
+            self.counts[i] = 0
+        self.count = self.total = self.max = 0
+
+    def snapshot(self) -> dict:
+        """获取统计快照(微秒)"""
+        return {
+            'count': self.count,
+            'mean_us': self.total / self.count / 1000.0 if self.count else 0.0,
+            'min_us': self.minimum() / 1000.0,
+            'p50_us': self.percentile(50) / 1000.0,
+            'p99_us': self.percentile(99) / 1000.0,
+            'max_us': self.max / 1000.0,
+        }
+
+
+def _timed(func, histogram):
+    """包装驱动函数，记录每次调用耗时(抛出异常的调用不计入)"""
+    record = histogram.record
+    perf_counter_ns = time.perf_counter_ns
+
+    def call(*args):
+        start = perf_counter_ns()
+        result = func(*args)
+        record(perf_counter_ns() - start)
+        return result
+
+    return call
+
+
+class InstrumentedDriver:
+    """为每个驱动接口记录调用耗时的驱动代理
+
+    各接口按名称分别统计，未包装的属性直接转发给原驱动。
+    """
+
+    def __init__(self, driver):
+        """包装驱动
+
+        Args:
+            driver: 原驱动实例
+        """
+        self.wrapped = driver
+        self.histograms = {}
+        names = INPUT_EXPORTS + CONTROL_EXPORTS + ('KeyEventBatch',)
+        for name in names:
+            func = getattr(driver, name, None)
+            if func is None:
+                continue
+            histogram = LatencyHistogram()
+            self.histograms[name] = histogram
+            setattr(self, name, _timed(func, histogram))
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+    def snapshot(self) -> dict:
+        """获取有调用记录的接口统计"""
+        return {
+            name: histogram.snapshot()
+            for name, histogram in self.histograms.items()
+            if histogram.count
+        }
+
+    def reset(self) -> None:
+        """清空所有统计"""
+        for histogram in self.histograms.values():
+            histogram.reset()
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+from typing import Iterable, List, Tuple
+
+from hook_types import (WM_KEYDOWN, WM_KEYUP, WM_SYSKEYDOWN, WM_SYSKEYUP,
+                        LLKHF_UP, LLKHF_INJECTED, LLKHF_LOWER_IL_INJECTED)
+
+# feed()返回的边沿类型
+EDGE_NONE = 0     # 无状态变化(被过滤的注入事件，或未按下时收到的释放)
+EDGE_DOWN = 1     # 按下
+EDGE_UP = 2       # 释放
+EDGE_REPEAT = 3   # 按住时的自动重复
+
+# 左右修饰键 -> 通用修饰键(低级钩子只会报告区分左右的键码)
+MODIFIER_SIDES = {
+    0xA0: 0x10, 0xA1: 0x10,  # VK_LSHIFT / VK_RSHIFT -> VK_SHIFT
+    0xA2: 0x11, 0xA3: 0x11,  # VK_LCONTROL / VK_RCONTROL -> VK_CONTROL
+    0xA4: 0x12, 0xA5: 0x12,  # VK_LMENU / VK_RMENU -> VK_MENU
+}
+
+KEY_MESSAGES = (WM_KEYDOWN, WM_KEYUP, WM_SYSKEYDOWN, WM_SYSKEYUP)
+
+
+class KeyStateEngine:
+    """按键状态机
+
+    用bytearray(256)和256位整数位集合保存每个虚拟键的按下状态，is_pressed()为O(1)查询。
+    每个事件被归类为按下/释放/自动重复三种边沿，重复的按下不改变状态，由调用方决定是否忽略。
+    WM_SYSKEYDOWN/WM_SYSKEYUP(按住Alt时的按键)与普通按键同样处理。
+    可选择忽略带LLKHF_INJECTED标志的注入事件(例如SendInput产生的输入)。
+
+    只依赖事件本身(vk, flags)，可直接用录制的事件流驱动，无需真实钩子。
+    """
+
+    def __init__(self, ignore_injected: bool = True):
+        """初始化状态机
+
+        Args:
+            ignore_injected: 是否忽略注入的按键事件
+        """
+        self.ignore_injected = ignore_injected
+        self.mask = 0  # 已按下按键的位集合(包含通用修饰键)
+        self._down = bytearray(256)
+
+        # 统计
+        self.repeats = 0
+        self.injected = 0
+        self.spurious_ups = 0
+
+        # 每个按键按下时要置位的掩码(左右修饰键同时置位通用修饰键)
+        self._press_bits = [1 << vk for vk in range(256)]
+        for side, generic in MODIFIER_SIDES.items():
+            self._press_bits[side] |= 1 << generic
+        # 通用修饰键 -> 左右两侧的掩码
+        self._side_masks = {}
+        for side, generic in MODIFIER_SIDES.items():
+            self._side_masks[generic] = self._side_masks.get(generic, 0) | (1 << side)
+
+    def feed(self, vk_code: int, flags: int = 0) -> int:
+        """处理一个键盘事件
+
+        Args:
+            vk_code: 虚拟键码(0-255)
+            flags: KBDLLHOOKSTRUCT.flags，释放事件包含LLKHF_UP
+
+        Returns:
+            int: 边沿类型(EDGE_NONE/EDGE_DOWN/EDGE_UP/EDGE_REPEAT)
+        """
+        if self.ignore_injected and flags & (LLKHF_INJECTED | LLKHF_LOWER_IL_INJECTED):
+            self.injected += 1
+            return EDGE_NONE
+        if flags & LLKHF_UP:
+            return self.release(vk_code)
+        return self.press(vk_code)
+
+    def feed_message(self, message: int, vk_code: int, flags: int = 0) -> int:
+        """按窗口消息类型处理一个键盘事件(录制数据中flags可能不含LLKHF_UP)
+
+        Args:
+            message: WM_KEYDOWN/WM_KEYUP/WM_SYSKEYDOWN/WM_SYSKEYUP
+            vk_code: 虚拟键码
+            flags: KBDLLHOOKSTRUCT.flags
+
+        Returns:
+            int: 边沿类型，非键盘消息返回EDGE_NONE
+        """
+        if message == WM_KEYUP or message == WM_SYSKEYUP:
+            return self.feed(vk_code, flags | LLKHF_UP)
+        if message == WM_KEYDOWN or message == WM_SYSKEYDOWN:
+            return self.feed(vk_code, flags & ~LLKHF_UP)
+        return EDGE_NONE
+
+    def press(self, vk_code: int) -> int:
+        """标记按键按下
+
+        Returns:
+            int: EDGE_DOWN，已按下时为EDGE_REPEAT
+        """
+        if self._down[vk_code]:
+            self.repeats += 1
+            return EDGE_REPEAT
+        self._down[vk_code] = 1
+        self.mask |= self._press_bits[vk_code]
+        return EDGE_DOWN
+
+    def release(self, vk_code: int) -> int:
+        """标记按键释放
+
+        Returns:
+            int: EDGE_UP，未按下时为EDGE_NONE
+        """
+        if not self._down[vk_code]:
+            self.spurious_ups += 1
+            return EDGE_NONE
+        self._down[vk_code] = 0
+        mask = self.mask & ~(1 << vk_code)
+        generic = MODIFIER_SIDES.get(vk_code)
+        if generic is not None and not mask & self._side_masks[generic]:
+            mask &= ~(1 << generic)
+        self.mask = mask
+        return EDGE_UP
+
+    def replay(self, events: Iterable[Tuple[int, int, int]]) -> List[Tuple[int, int]]:
+        """用录制的事件流驱动状态机
+
+        Args:
+            events: (message, vk_code, flags)序列
+
+        Returns:
+            list: 每个事件对应的(vk_code, 边沿类型)
+        """
+        feed_message = self.feed_message
+        return [(vk_code, feed_message(message, vk_code, flags)) for message, vk_code, flags in events]
+
+    def is_pressed(self, vk_code: int) -> bool:
+        """按键当前是否按下(通用修饰键在任意一侧按下时为True)"""
+        return bool(self.mask >> vk_code & 1)
+
+    def pressed_keys(self) -> set:
+        """当前按下的按键集合"""
+        mask = self.mask
+        return {vk for vk in range(256) if mask >> vk & 1}
+
+    def reset(self) -> None:
+        """清空按键状态(例如钩子重启或丢失事件后)"""
+        self.mask = 0
+        self._down = bytearray(256)
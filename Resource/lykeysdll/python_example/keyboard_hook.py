@@ -1,22 +1,16 @@
 import ctypes
 from ctypes import wintypes
-import win32con
-import win32api
-import win32gui
 import threading
 import logging
 import sys
 import os
+import time
+
+from hook_types import KBDLLHOOKSTRUCT, WM_QUIT
+from hotkey_dispatcher import HotkeyDispatcher
+from hotkey_matcher import HotkeyMatcher
+from key_state import KeyStateEngine, KEY_MESSAGES
 
-# 定义KBDLLHOOKSTRUCT结构体
-class KBDLLHOOKSTRUCT(ctypes.Structure):
-    _fields_ = [
-        ("vkCode", wintypes.DWORD),
-        ("scanCode", wintypes.DWORD),
-        ("flags", wintypes.DWORD),
-        ("time", wintypes.DWORD),
-        ("dwExtraInfo", ctypes.POINTER(wintypes.ULONG))
-    ]
 
 class KeyboardHook:
     """全局键盘钩子类"""
@@ -24,16 +18,24 @@ class KeyboardHook:
     # Windows钩子类型
     WH_KEYBOARD_LL = 13
     
-    # 回调函数类型
-    HOOKPROC = ctypes.WINFUNCTYPE(
+    # 回调函数类型(非Windows平台没有WINFUNCTYPE，只用于导入本模块做基准测试)
+    HOOKPROC = getattr(ctypes, 'WINFUNCTYPE', ctypes.CFUNCTYPE)(
         wintypes.LPARAM,
         ctypes.c_int,
         wintypes.WPARAM,
         wintypes.LPARAM
     )
     
-    def __init__(self):
-        """初始化键盘钩子"""
+    def __init__(self, workers: int = 1, queue_size: int = 1024, debounce: float = 0.0,
+                 ignore_injected: bool = True):
+        """初始化键盘钩子
+        
+        Args:
+            workers: 执行热键回调的工作线程数
+            queue_size: 钩子事件队列容量，写满时丢弃最旧的事件
+            debounce: 默认的热键防抖间隔(秒)
+            ignore_injected: 是否忽略注入的按键事件(例如SendInput产生的输入)
+        """
         self.user32 = ctypes.windll.user32
         self.kernel32 = ctypes.windll.kernel32
         
@@ -51,37 +53,41 @@ class KeyboardHook:
         self.is_running = False
         self._hook_callback_ptr = None  # 保持回调函数的引用
         
-        # 热键回调字典 {vk_code: callback_func}
-        self.hotkey_callbacks = {}
-        
-        # 当前按下的按键集合
-        self.pressed_keys = set()
+        # 热键分发器(钩子只负责入队，热键匹配和回调在其他线程中执行)
+        self.key_state = KeyStateEngine(ignore_injected=ignore_injected)
+        self.dispatcher = HotkeyDispatcher(HotkeyMatcher(self.key_state), capacity=queue_size,
+                                           workers=workers, debounce=debounce)
+        self.matcher = self.dispatcher.matcher
+    
+    @property
+    def hotkey_callbacks(self):
+        """热键回调字典 {vk_code: callback_func}"""
+        return self.matcher.hotkeys
+    
+    @property
+    def pressed_keys(self):
+        """当前按下的按键集合"""
+        return self.key_state.pressed_keys()
+    
+    def is_pressed(self, vk_code: int) -> bool:
+        """按键当前是否按下(O(1)，状态由分发线程按事件顺序更新)"""
+        return self.key_state.is_pressed(vk_code)
+    
+    def stats(self) -> dict:
+        """获取事件队列深度、丢弃数、分发延迟及按键过滤统计"""
+        stats = self.dispatcher.stats()
+        stats['repeats'] = self.key_state.repeats
+        stats['injected'] = self.key_state.injected
+        return stats
         
     def _hook_callback(self, nCode, wParam, lParam):
         """钩子回调函数"""
         if nCode >= 0:
             try:
-                kb_struct = ctypes.cast(lParam, ctypes.POINTER(KBDLLHOOKSTRUCT)).contents
-                vk_code = kb_struct.vkCode
-                
-                # 按键按下
-                if wParam == win32con.WM_KEYDOWN:
-                    self.pressed_keys.add(vk_code)
-                    # 检查是否触发了任何热键组合
-                    for hotkey_combo, callback in self.hotkey_callbacks.items():
-                        if isinstance(hotkey_combo, tuple):
-                            # 组合键
-                            if all(key in self.pressed_keys for key in hotkey_combo):
-                                callback()
-                        else:
-                            # 单个键
-                            if vk_code == hotkey_combo:
-                                callback()
-                
-                # 按键释放
-                elif wParam == win32con.WM_KEYUP:
-                    if vk_code in self.pressed_keys:
-                        self.pressed_keys.remove(vk_code)
+                # 按键按下/释放(包括按住Alt时的WM_SYSKEYDOWN/WM_SYSKEYUP): 只入队，不在钩子过程中执行回调
+                if wParam in KEY_MESSAGES:
+                    kb_struct = KBDLLHOOKSTRUCT.from_address(lParam)
+                    self.dispatcher.push(kb_struct.vkCode, kb_struct.flags, time.perf_counter_ns())
                 
             except Exception as e:
                 logging.error(f"键盘钩子回调错误: {str(e)}")
@@ -89,25 +95,29 @@ class KeyboardHook:
         # 继续传递给其他钩子
         return self.user32.CallNextHookEx(self.hook_id, nCode, wParam, lParam)
     
-    def register_hotkey(self, vk_code, callback):
+    def register_hotkey(self, vk_code, callback, debounce: float = None):
         """注册热键回调
         
         Args:
             vk_code: 虚拟键码或键码元组(组合键)
-            callback: 回调函数
+            callback: 回调函数(在工作线程中执行)
+            debounce: 该热键的防抖间隔(秒)，默认使用构造时的设置
         """
-        self.hotkey_callbacks[vk_code] = callback
+        self.matcher.register(vk_code, callback)
+        if debounce is not None:
+            self.dispatcher.set_debounce(vk_code, debounce)
     
     def unregister_hotkey(self, vk_code):
         """注销热键回调"""
-        if vk_code in self.hotkey_callbacks:
-            del self.hotkey_callbacks[vk_code]
+        self.matcher.unregister(vk_code)
     
     def start(self):
         """启动键盘钩子"""
         if self.is_running:
             return
             
+        self.dispatcher.start()
+        
         def run_hook():
             try:
                 # 创建钩子回调函数并保持引用
@@ -144,6 +154,8 @@ class KeyboardHook:
             except Exception as e:
                 logging.error(f"键盘钩子启动错误: {str(e)}")
                 self.is_running = False
+                # 钩子没有运行，stop()不会再被调用，在这里停止已启动的热键分发
+                self.dispatcher.stop(wait=False)
         
         # 在新线程中运行钩子
         self.hook_thread = threading.Thread(target=run_hook, daemon=True)
@@ -151,10 +163,9 @@ class KeyboardHook:
     
     def stop(self):
         """停止键盘钩子"""
-        if not self.is_running:
-            return
-            
         try:
+            if not self.is_running:
+                return
             self.is_running = False
             
             # 卸载钩子
@@ -166,7 +177,7 @@ class KeyboardHook:
             # 发送退出消息
             self.user32.PostThreadMessageW(
                 self.hook_thread.ident,
-                win32con.WM_QUIT,
+                WM_QUIT,
                 0,
                 0
             )
@@ -177,7 +188,10 @@ class KeyboardHook:
             
             self.hook_thread = None
             self._hook_callback_ptr = None  # 清除回调函数引用
-            logging.info("键盘钩子已停止")
+            logging.info(f"键盘钩子已停止: {self.dispatcher.stats()}")
             
         except Exception as e:
-            logging.error(f"键盘钩子停止错误: {str(e)}") 
\ No newline at end of file
+            logging.error(f"键盘钩子停止错误: {str(e)}")
+        finally:
+            # 钩子启动失败或卸载出错时同样停止热键分发(已停止时不做任何事)
+            self.dispatcher.stop() 
\ No newline at end of file
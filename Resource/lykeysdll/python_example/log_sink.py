@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import logging.handlers
+import queue
+from collections import deque
+
+
+class BufferedTextHandler(logging.Handler):
+    """批量刷新到Tk文本框的日志处理器
+
+    emit()只把日志记录放入有界队列(deque.append是线程安全的)，不做格式化也不触碰界面，
+    主线程按固定间隔批量格式化并一次性插入文本框，文本框行数超过上限时删除最旧的行。
+    队列写满时丢弃最旧的记录。
+    """
+
+    def __init__(self, text_widget, root, max_lines: int = 2000,
+                 buffer_size: int = 10000, flush_interval_ms: int = 100):
+        """初始化处理器
+
+        Args:
+            text_widget: tk.Text控件
+            root: Tk根窗口
+            max_lines: 文本框最多保留的行数
+            buffer_size: 待刷新记录的最大数量
+            flush_interval_ms: 刷新间隔(毫秒)
+        """
+        logging.Handler.__init__(self)
+        self.text_widget = text_widget
+        self.root = root
+        self.max_lines = max_lines
+        self.flush_interval_ms = flush_interval_ms
+        self.received = 0
+        self._records = deque(maxlen=buffer_size)
+        self._written = 0
+        self._after_id = None
+
+    @property
+    def dropped(self) -> int:
+        """因队列写满而被丢弃的记录数"""
+        return self.received - self._written - len(self._records)
+
+    def emit(self, record):
+        self.received += 1
+        self._records.append(record)
+
+    def start(self):
+        """开始定时刷新"""
+        if self._after_id is None:
+            self._after_id = self.root.after(self.flush_interval_ms, self._tick)
+
+    def stop(self):
+        """停止定时刷新，未刷新的记录将被丢弃"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def flush(self):
+        """把队列中的记录写入文本框(仅在主线程调用)"""
+        records = self._records
+        if not records:
+            return
+        lines = []
+        while records:
+            try:
+                record = records.popleft()
+            except IndexError:
+                break
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+        self._written += len(lines)
+        if not lines:
+            return
+
+        widget = self.text_widget
+        widget.insert('end', '\n'.join(lines) + '\n')
+
+        # 超出行数上限时删除最旧的行(末尾总有一个空行)
+        line_count = int(widget.index('end-1c').split('.')[0]) - 1
+        if line_count > self.max_lines:
+            widget.delete('1.0', f'{line_count - self.max_lines + 1}.0')
+        widget.yview_moveto(1.0)  # 确保滚动到底部
+
+    def _tick(self):
+        try:
+            self.flush()
+        finally:
+            self._after_id = self.root.after(self.flush_interval_ms, self._tick)
+
+
+def create_file_sink(path: str, max_bytes: int = 5 * 1024 * 1024, backup_count: int = 3,
+                     formatter: logging.Formatter = None):
+    """创建滚动日志文件输出
+
+    文件写入在QueueListener的后台线程中完成，记录日志的线程只需入队。
+
+    Args:
+        path: 日志文件路径
+        max_bytes: 单个文件的最大字节数
+        backup_count: 保留的历史文件个数
+        formatter: 日志格式，默认与界面日志一致
+
+    Returns:
+        tuple: (QueueHandler, QueueListener)，调用方负责把handler加入logger并在退出时停止listener
+    """
+    file_handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+    )
+    file_handler.setFormatter(formatter or logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+    return logging.handlers.QueueHandler(log_queue), listener
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""无界面运行入口
+
+在python_example目录下运行，参数默认取自driver_config.json，命令行参数优先:
+    python -m lykeys run rapid --backend null --duration 5
+    python -m lykeys run rapid --press-time 0.5 --interval-time 0.5 --stats-out rapid.npy
+    python -m lykeys run text --text "Hello, World!" --cps 50
+    python -m lykeys run auto-move --duration 10 --rate 500
+    python -m lykeys run macro --file demo.lykm --replay-speed 2
+    python -m lykeys run script --file demo.lyks
+    python -m lykeys record --output demo.lykm --duration 30
+    python -m lykeys serve --address /tmp/lykeys-input.sock
+结果以JSON格式输出到标准输出。
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+
+from config_service import get_config
+from driver_backends import BACKENDS
+from driver_manager import DriverManager
+from headless_runner import run_rapid_test, run_text, run_auto_move, run_macro, run_script
+from input_tester import InputTester
+from rapid_stats import RapidStats
+
+
+def load_config(config_file: str) -> dict:
+    """读取配置文件(经共享的配置服务缓存，进程内只解析一次)，不存在或解析失败时返回空配置"""
+    return get_config(config_file).snapshot()
+
+
+def open_driver(backend: str, config: dict) -> DriverManager:
+    """按配置创建并初始化驱动管理器
+
+    Args:
+        backend: 驱动后端类型
+        config: 配置内容，backend节中除type以外的字段作为后端参数
+    """
+    backend_options = {k: v for k, v in config.get("backend", {}).items() if k != "type"}
+    driver_mgr = DriverManager(backend=backend, backend_options=backend_options)
+    driver_mgr._setup_paths(dll_path=config.get("dll_path"), sys_path=config.get("sys_path"))
+    if not driver_mgr.initialize():
+        raise RuntimeError("驱动加载失败")
+    return driver_mgr
+
+
+def run_workload(args, config: dict, tester: InputTester) -> dict:
+    """根据命令行参数运行指定负载"""
+    if args.workload == 'rapid':
+        rapid_config = config.get("rapid_test", {})
+        key = args.key or rapid_config.get("test_key", "a")
+        press_time = float(args.press_time if args.press_time is not None
+                           else rapid_config.get("press_time", 1))
+        interval_time = float(args.interval_time if args.interval_time is not None
+                              else rapid_config.get("interval_time", 1))
+        duration = float(args.duration if args.duration is not None
+                         else rapid_config.get("duration", 1))
+        if duration <= 0:
+            raise ValueError("运行时长必须大于0")
+        stats = None
+        if args.stats_out:
+            stats = RapidStats.for_run(duration, (press_time + interval_time) / 1000.0)
+        result = run_rapid_test(tester, key, press_time / 1000.0, interval_time / 1000.0, duration,
+                                stats=stats)
+        if stats:
+            result['stats_rows'] = stats.export(args.stats_out)
+        return result
+
+    if args.workload == 'text':
+        if not args.text:
+            raise ValueError("请通过--text指定要输入的文本")
+        return run_text(tester, args.text, args.cps)
+
+    if args.workload == 'macro':
+        if not args.file:
+            raise ValueError("请通过--file指定宏文件")
+        return run_macro(tester, args.file, args.replay_speed)
+
+    if args.workload == 'script':
+        if not args.file:
+            raise ValueError("请通过--file指定宏脚本")
+        return run_script(tester, args.file, args.replay_speed)
+
+    auto_move_config = config.get("auto_move", {})
+    speed = float(args.speed if args.speed is not None else auto_move_config.get("speed", 10))
+    move_range = float(args.range if args.range is not None else auto_move_config.get("range", 100))
+    rate = float(args.rate if args.rate is not None else auto_move_config.get("rate", 1000))
+    duration = float(args.duration if args.duration is not None else 5)
+    if duration <= 0:
+        raise ValueError("运行时长必须大于0")
+    return run_auto_move(tester, speed, move_range, duration, rate=rate)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='lykeys', description='LingYaoDriver无界面测试工具')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='运行测试负载')
+    run_parser.add_argument('workload', choices=['rapid', 'text', 'auto-move', 'macro', 'script'], help='负载类型')
+    run_parser.add_argument('--backend', choices=sorted(BACKENDS),
+                            help='驱动后端类型，默认取配置文件backend.type，未配置时为dll')
+    run_parser.add_argument('--config', default='driver_config.json', help='配置文件路径')
+    run_parser.add_argument('--key', help='高频测试按键')
+    run_parser.add_argument('--press-time', type=float, help='按下抬起间隔(毫秒)')
+    run_parser.add_argument('--interval-time', type=float, help='等待间隔(毫秒)')
+    run_parser.add_argument('--duration', type=float, help='运行时长(秒)')
+    run_parser.add_argument('--stats-out', help='把高频测试每次按键的间隔和按下时长导出为.npy或CSV文件')
+    run_parser.add_argument('--text', help='要输入的文本')
+    run_parser.add_argument('--cps', type=float, default=20.0, help='输入速度(字符/秒)')
+    run_parser.add_argument('--speed', type=float, help='自动移动速度')
+    run_parser.add_argument('--range', type=float, help='自动移动范围')
+    run_parser.add_argument('--rate', type=float, help='自动移动发送频率(125-1000Hz)')
+    run_parser.add_argument('--file', help='要回放的宏文件(.lykm)或宏脚本')
+    run_parser.add_argument('--replay-speed', type=float, default=1.0, help='宏回放/脚本执行速度倍数')
+    run_parser.add_argument('--health-interval', type=float, default=1.0, help='驱动状态轮询间隔(秒)')
+    run_parser.add_argument('--latency', action='store_true', help='统计每次驱动调用的耗时')
+    run_parser.add_argument('--latency-out', help='把驱动调用耗时统计写入指定JSON文件(隐含--latency)')
+
+    record_parser = subparsers.add_parser('record', help='录制按键宏(仅Windows)')
+    record_parser.add_argument('--output', required=True, help='输出的宏文件路径')
+    record_parser.add_argument('--duration', type=float, default=0.0,
+                               help='录制时长(秒)，0表示直到按下Ctrl+C')
+    record_parser.add_argument('--include-repeats', action='store_true', help='记录按住按键时的自动重复')
+
+    serve_parser = subparsers.add_parser('serve', help='运行本地输入服务，供其他进程通过InputClient发送输入')
+    serve_parser.add_argument('--backend', choices=sorted(BACKENDS),
+                              help='驱动后端类型，默认取配置文件backend.type，未配置时为dll')
+    serve_parser.add_argument('--config', default='driver_config.json', help='配置文件路径')
+    serve_parser.add_argument('--address', help='监听地址(命名管道或Unix域套接字路径)')
+    serve_parser.add_argument('--duration', type=float, default=0.0,
+                              help='运行时长(秒)，0表示直到按下Ctrl+C')
+    return parser
+
+
+def serve(args, config: dict) -> int:
+    """运行本地输入服务，结束时输出每个客户端的统计"""
+    from input_arbiter import InputArbiter
+    from input_server import InputServer
+
+    backend = args.backend or config.get("backend", {}).get("type", "dll")
+    driver_mgr = open_driver(backend, config)
+    arbiter = InputArbiter(driver_mgr.get_driver())
+    server = InputServer(arbiter, args.address)
+    start_time = time.perf_counter()
+    try:
+        arbiter.start()
+        server.start()
+        while args.duration <= 0 or time.perf_counter() - start_time < args.duration:
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        arbiter.stop()
+        driver_mgr.cleanup()
+    result = server.stats()
+    result['backend'] = backend
+    result['elapsed_seconds'] = time.perf_counter() - start_time
+    print(json.dumps(result, indent=4, ensure_ascii=False))
+    return 0
+
+
+def record_macro(args) -> int:
+    """通过全局键盘钩子录制按键宏"""
+    # 键盘钩子只能在Windows上运行，只在录制时导入
+    from keyboard_hook import KeyboardHook
+    from macro import MacroRecorder
+
+    hook = KeyboardHook()
+    recorder = MacroRecorder(hook, args.output, include_repeats=args.include_repeats)
+    hook.start()
+    recorder.start()
+    start_time = time.perf_counter()
+    try:
+        while args.duration <= 0 or time.perf_counter() - start_time < args.duration:
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        count = recorder.stop()
+        hook.stop()
+    print(json.dumps({
+        'file': args.output,
+        'events': count,
+        'elapsed_seconds': time.perf_counter() - start_time,
+    }, indent=4, ensure_ascii=False))
+    return 0
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
+                        stream=sys.stderr)
+    if args.command == 'record':
+        try:
+            return record_macro(args)
+        except Exception as e:
+            logging.error(f"录制失败: {str(e)}")
+            return 1
+
+    config = load_config(args.config)
+
+    if args.command == 'serve':
+        try:
+            return serve(args, config)
+        except Exception as e:
+            logging.error(f"输入服务运行失败: {str(e)}")
+            return 1
+
+    backend = args.backend or config.get("backend", {}).get("type", "dll")
+
+    driver_mgr = None
+    tester = None
+    try:
+        driver_mgr = open_driver(backend, config)
+        driver = driver_mgr.get_driver()
+        tester = InputTester(driver)
+        transitions = []
+
+        def on_status_change(old_status, new_status):
+            transitions.append({'time': time.time(), 'from': old_status, 'to': new_status})
+            logging.info(f"驱动状态变化: {old_status} -> {new_status}")
+
+        monitor = tester.start_health_monitor(args.health_interval, on_status_change)
+        if args.latency or args.latency_out:
+            tester.enable_instrumentation()
+        result = run_workload(args, config, tester)
+        monitor.stop()
+        result['backend'] = backend
+        result['device_status'] = {
+            'status': monitor.status,
+            'polls': monitor.polls,
+            'transitions': transitions,
+        }
+        if tester.instrumentation_enabled:
+            result['latency'] = tester.latency_stats()
+            if args.latency_out:
+                tester.dump_latency_stats(args.latency_out)
+        if hasattr(driver, 'summary'):
+            result['backend_stats'] = driver.summary()
+        print(json.dumps(result, indent=4, ensure_ascii=False))
+        return 0
+    except Exception as e:
+        logging.error(f"运行失败: {str(e)}")
+        return 1
+    finally:
+        if tester:
+            tester.stop_health_monitor()
+        if driver_mgr:
+            driver_mgr.cleanup()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
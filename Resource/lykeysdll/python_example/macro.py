@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""按键宏文件格式与录制
+
+文件由固定长度的文件头和若干固定长度的事件记录组成(小端):
+    文件头(24字节): magic 'LYKM', 版本(u16), 记录长度(u16), 事件数(u64), 创建时间(u64, Unix纳秒)
+    事件记录(12字节): 相对录制开始的时间(u64, 纳秒), 虚拟键码(u16), 动作(u8, 0按下/1释放), 标志(u8)
+读取时直接对文件做内存映射并逐条解包，百万级事件的文件也无需整体载入为Python对象。
+"""
+
+import logging
+import mmap
+import struct
+import threading
+import time
+
+from input_tester import ACTION_KEY_DOWN, ACTION_KEY_UP
+from key_state import EDGE_DOWN, EDGE_UP, EDGE_REPEAT
+
+MACRO_MAGIC = b'LYKM'
+MACRO_VERSION = 1
+HEADER = struct.Struct('<4sHHQQ')
+RECORD = struct.Struct('<QHBB')
+
+
+class MacroWriter:
+    """宏文件写入器
+
+    事件先打包进固定大小的缓冲区，写满后整块写入文件；关闭时回填文件头中的事件数。
+    """
+
+    def __init__(self, path: str, buffer_records: int = 4096):
+        """创建宏文件
+
+        Args:
+            path: 文件路径(已存在时覆盖)
+            buffer_records: 缓冲的事件数
+        """
+        self.path = path
+        self.count = 0
+        self.created = time.time_ns()
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MACRO_MAGIC, MACRO_VERSION, RECORD.size, 0, self.created))
+        self._buffer = bytearray(RECORD.size * buffer_records)
+        self._buffered = 0
+        self._capacity = buffer_records
+
+    def write(self, offset_ns: int, vk_code: int, action: int, flags: int = 0) -> None:
+        """追加一个事件
+
+        Args:
+            offset_ns: 相对录制开始的时间(纳秒)
+            vk_code: 虚拟键码
+            action: ACTION_KEY_DOWN或ACTION_KEY_UP
+            flags: 事件标志(KBDLLHOOKSTRUCT.flags的低8位)
+        """
+        RECORD.pack_into(self._buffer, self._buffered * RECORD.size, offset_ns, vk_code, action, flags & 0xFF)
+        self._buffered += 1
+        self.count += 1
+        if self._buffered == self._capacity:
+            self.flush()
+
+    def flush(self) -> None:
+        """把缓冲区写入文件"""
+        if self._buffered:
+            self._file.write(memoryview(self._buffer)[:self._buffered * RECORD.size])
+            self._buffered = 0
+        self._file.flush()
+
+    def close(self) -> None:
+        """写入剩余事件并回填文件头"""
+        if self._file is None:
+            return
+        self.flush()
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MACRO_MAGIC, MACRO_VERSION, RECORD.size, self.count, self.created))
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class MacroReader:
+    """宏文件读取器(内存映射，按需解包)"""
+
+    def __init__(self, path: str):
+        """打开宏文件
+
+        Args:
+            path: 文件路径
+
+        Raises:
+            ValueError: 文件格式无效
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"无效的宏文件: {path}")
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise ValueError(f"无效的宏文件: {path}")
+        magic, version, record_size, count, created = HEADER.unpack_from(self._map, 0)
+        if magic != MACRO_MAGIC or version != MACRO_VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"不支持的宏文件格式: {path}")
+        # 以文件长度为准，录制中断时文件头的事件数可能尚未回填
+        available = (len(self._map) - HEADER.size) // RECORD.size
+        if count and count != available:
+            logging.warning(f"宏文件事件数与文件长度不符: {count} != {available}")
+        self.count = available
+        self.created = created
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def duration(self) -> float:
+        """最后一个事件的时间(秒)"""
+        if not self.count:
+            return 0.0
+        return RECORD.unpack_from(self._map, HEADER.size + (self.count - 1) * RECORD.size)[0] / 1e9
+
+    def records(self, start: int = 0, stop: int = None):
+        """逐条解包事件
+
+        Args:
+            start: 起始事件下标
+            stop: 结束事件下标(不含)，None表示到文件末尾
+
+        Returns:
+            iterator: (时间偏移纳秒, 虚拟键码, 动作, 标志)
+        """
+        if stop is None or stop > self.count:
+            stop = self.count
+        if start >= stop:
+            return iter(())
+        view = memoryview(self._map)[HEADER.size + start * RECORD.size:HEADER.size + stop * RECORD.size]
+        return RECORD.iter_unpack(view)
+
+    def __iter__(self):
+        return self.records()
+
+    def close(self) -> None:
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass  # 仍有迭代器引用映射内存，由垃圾回收释放
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class MacroRecorder:
+    """基于KeyboardHook的按键录制器
+
+    在热键分发线程中接收按键状态机处理后的事件，只记录真实的按下/释放边沿
+    (自动重复和被过滤的注入事件默认不记录)，时间戳取钩子收到事件时的perf_counter_ns。
+    """
+
+    def __init__(self, hook, path: str, include_repeats: bool = False):
+        """初始化录制器
+
+        Args:
+            hook: KeyboardHook实例
+            path: 输出文件路径
+            include_repeats: 是否把自动重复记录为按下事件
+        """
+        self.hook = hook
+        self.path = path
+        self.include_repeats = include_repeats
+        self.writer = None
+        self._start_ns = 0
+        self._lock = threading.Lock()
+
+    def _on_event(self, vk_code: int, flags: int, timestamp: int, edge: int) -> None:
+        if edge == EDGE_DOWN or (edge == EDGE_REPEAT and self.include_repeats):
+            action = ACTION_KEY_DOWN
+        elif edge == EDGE_UP:
+            action = ACTION_KEY_UP
+        else:
+            return
+        with self._lock:
+            if self.writer is None:
+                return
+            try:
+                self.writer.write(max(0, timestamp - self._start_ns), vk_code, action, flags)
+            except Exception as e:
+                logging.error(f"写入宏文件失败: {str(e)}")
+
+    def start(self) -> None:
+        """开始录制"""
+        if self.writer is not None:
+            return
+        self.writer = MacroWriter(self.path)
+        self._start_ns = time.perf_counter_ns()
+        self.hook.dispatcher.add_listener(self._on_event)
+        logging.info(f"开始录制: {self.path}")
+
+    def stop(self) -> int:
+        """停止录制
+
+        Returns:
+            int: 录制的事件数
+        """
+        if self.writer is None:
+            return 0
+        self.hook.dispatcher.remove_listener(self._on_event)
+        with self._lock:
+            self.writer.close()
+            count = self.writer.count
+            self.writer = None
+        logging.info(f"录制结束: {self.path}, 共 {count} 个事件")
+        return count
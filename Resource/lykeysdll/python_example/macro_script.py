@@ -0,0 +1,587 @@
+# -*- coding: utf-8 -*-
+"""宏脚本语言
+
+每行一条语句，#之后为注释，时长可写作 50ms、0.5s、200us 或不带单位的秒数:
+    key <按键> [按下时长]          按下并释放(需要Shift的字符自动加Shift)，默认按下50ms
+    down <按键> / up <按键>        单独按下/释放
+    combo <键1+键2+...> [按下时长]  依次按下，保持后逆序释放
+    text "<文本>" [字符/秒]         输入文本(与text_compiler相同的编排)，默认20字符/秒
+    move <dx> <dy> [时长] [频率]    相对移动；指定时长时按频率(默认100Hz)分帧平滑移动
+    moveto <x> <y>                 绝对移动
+    click [left|right|middle|x1|x2] [按下时长]
+    mousedown <按钮> / mouseup <按钮>
+    wheel <up|down> [滚动量]        默认120
+    wait <时长>
+    log "<消息>"
+    repeat <次数> ... end           重复执行
+    loop ... end                   一直重复直到被停止(循环体内必须有等待)
+
+脚本一次编译为扁平的指令数组(操作码u8、参数1 i32、参数2 i32)，键码在编译时解析，
+文本和平滑移动在编译时展开为按键、移动和等待指令。编译结果缓存在脚本所在目录的
+__lykcache__目录中，脚本未修改(修改时间和大小不变)时直接载入缓存，不再解析。
+"""
+
+import logging
+import os
+import shlex
+import struct
+import sys
+import time
+from array import array
+from typing import Callable, Optional
+
+from precise_timer import PreciseTimer
+from text_compiler import compile_text
+from virtuakeys_mapping import VirtualKeys
+from input_tester import ACTION_KEY_UP
+import trajectory
+
+# 操作码
+OP_KEY_DOWN = 1     # 参数1: 键码
+OP_KEY_UP = 2       # 参数1: 键码
+OP_WAIT = 3         # 参数1: 等待时间(微秒)
+OP_MOVE_REL = 4     # 参数1/2: dx, dy
+OP_MOVE_ABS = 5     # 参数1/2: x, y
+OP_BUTTON_DOWN = 6  # 参数1: 按钮编号
+OP_BUTTON_UP = 7    # 参数1: 按钮编号
+OP_WHEEL = 8        # 参数1: 滚动量(正数向上，负数向下)
+OP_LOOP = 9         # 参数1: 次数(-1表示一直重复), 参数2: 对应END之后的位置
+OP_END = 10         # 参数1: 对应LOOP的位置
+OP_LOG = 11         # 参数1: 字符串表下标
+
+OP_NAMES = {
+    OP_KEY_DOWN: 'KEY_DOWN', OP_KEY_UP: 'KEY_UP', OP_WAIT: 'WAIT',
+    OP_MOVE_REL: 'MOVE_REL', OP_MOVE_ABS: 'MOVE_ABS',
+    OP_BUTTON_DOWN: 'BUTTON_DOWN', OP_BUTTON_UP: 'BUTTON_UP', OP_WHEEL: 'WHEEL',
+    OP_LOOP: 'LOOP', OP_END: 'END', OP_LOG: 'LOG',
+}
+
+LOOP_FOREVER = -1
+BUTTONS = ('left', 'right', 'middle', 'x1', 'x2')
+SHIFT_VK = VirtualKeys.get_vk_code('shift')
+SHIFT_DELAY = 0.01  # 与InputTester.press_key相同的Shift切换等待
+MAX_WAIT = 0x7FFFFFFF / 1e6  # 单条等待指令的上限(秒)
+
+# 编译缓存格式(小端): magic 'LYKC', 版本(u16), 源文件修改时间(u64, 纳秒), 源文件大小(u64),
+# 指令数(u32), 字符串条数(u32), 字符串表长度(u32)，之后依次为操作码、参数1、参数2数组和以\0分隔的字符串表
+CACHE_MAGIC = b'LYKC'
+CACHE_VERSION = 2
+CACHE_DIR = '__lykcache__'
+CACHE_HEADER = struct.Struct('<4sHQQIII')
+
+
+class MacroScriptError(ValueError):
+    """脚本语法或字节码无效"""
+
+    def __init__(self, message: str, line: int = 0):
+        super().__init__(f"第{line}行: {message}" if line else message)
+        self.line = line
+
+
+class MacroProgram:
+    """编译后的宏脚本
+
+    Attributes:
+        ops: 操作码数组
+        arg0: 参数1数组
+        arg1: 参数2数组
+        strings: 日志消息表
+    """
+
+    __slots__ = ('ops', 'arg0', 'arg1', 'strings', '_code')
+
+    def __init__(self):
+        self.ops = array('B')
+        self.arg0 = array('i')
+        self.arg1 = array('i')
+        self.strings = []
+        self._code = None
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def emit(self, op: int, arg0: int = 0, arg1: int = 0) -> int:
+        """追加一条指令
+
+        Returns:
+            int: 指令位置
+        """
+        self.ops.append(op)
+        self.arg0.append(arg0)
+        self.arg1.append(arg1)
+        self._code = None
+        return len(self.ops) - 1
+
+    def code(self) -> list:
+        """解释器使用的指令元组列表[(操作码, 参数1, 参数2), ...](首次调用时生成)"""
+        if self._code is None:
+            self._code = list(zip(self.ops.tolist(), self.arg0.tolist(), self.arg1.tolist()))
+        return self._code
+
+    def disassemble(self) -> list:
+        """指令列表[(位置, 操作名, 参数1, 参数2), ...]，用于调试"""
+        return [(pc, OP_NAMES[op], a, b)
+                for pc, (op, a, b) in enumerate(zip(self.ops, self.arg0, self.arg1))]
+
+
+# ===== 编译 =====
+def _duration(token: str, line: int) -> float:
+    """解析时长(秒)"""
+    try:
+        for suffix, scale in (('ms', 1e-3), ('us', 1e-6), ('s', 1.0)):
+            if token.endswith(suffix):
+                value = float(token[:-len(suffix)]) * scale
+                break
+        else:
+            value = float(token)
+    except ValueError:
+        raise MacroScriptError(f"无效的时长: {token}", line)
+    if not 0 <= value <= MAX_WAIT:
+        raise MacroScriptError(f"时长超出范围: {token}", line)
+    return value
+
+
+def _integer(token: str, line: int, what: str) -> int:
+    try:
+        value = int(token)
+    except ValueError:
+        raise MacroScriptError(f"无效的{what}: {token}", line)
+    if not -0x80000000 <= value <= 0x7FFFFFFF:
+        raise MacroScriptError(f"{what}超出范围: {token}", line)
+    return value
+
+
+def _vk(name: str, line: int) -> int:
+    vk_code = VirtualKeys.get_vk_code(name)
+    if vk_code is None:
+        raise MacroScriptError(f"无效的按键: {name}", line)
+    return vk_code
+
+
+def _button(name: str, line: int) -> int:
+    try:
+        return BUTTONS.index(name.lower())
+    except ValueError:
+        raise MacroScriptError(f"无效的鼠标按钮: {name}", line)
+
+
+def _arity(args: list, low: int, high: int, line: int, usage: str) -> None:
+    if not low <= len(args) <= high:
+        raise MacroScriptError(f"参数错误，用法: {usage}", line)
+
+
+def _wait(program: MacroProgram, seconds: float) -> None:
+    if seconds > 0:
+        program.emit(OP_WAIT, int(round(seconds * 1e6)))
+
+
+def compile_script(source: str) -> MacroProgram:
+    """编译宏脚本
+
+    Args:
+        source: 脚本文本
+
+    Returns:
+        MacroProgram: 编译并校验过的程序
+
+    Raises:
+        MacroScriptError: 语法错误、未知按键或循环不匹配
+    """
+    program = MacroProgram()
+    emit = program.emit
+    loops = []  # (LOOP指令位置, 行号)
+
+    for line, text in enumerate(source.splitlines(), 1):
+        try:
+            tokens = shlex.split(text, comments=True)
+        except ValueError as e:
+            raise MacroScriptError(str(e), line)
+        if not tokens:
+            continue
+        command, args = tokens[0].lower(), tokens[1:]
+
+        if command == 'key':
+            _arity(args, 1, 2, line, 'key <按键> [按下时长]')
+            vk_code = _vk(args[0], line)
+            hold = _duration(args[1], line) if len(args) > 1 else 0.05
+            if VirtualKeys.needs_shift(args[0]):
+                emit(OP_KEY_DOWN, SHIFT_VK)
+                _wait(program, SHIFT_DELAY)
+                emit(OP_KEY_DOWN, vk_code)
+                _wait(program, hold)
+                emit(OP_KEY_UP, vk_code)
+                _wait(program, SHIFT_DELAY)
+                emit(OP_KEY_UP, SHIFT_VK)
+            else:
+                emit(OP_KEY_DOWN, vk_code)
+                _wait(program, hold)
+                emit(OP_KEY_UP, vk_code)
+        elif command in ('down', 'up'):
+            _arity(args, 1, 1, line, f'{command} <按键>')
+            emit(OP_KEY_DOWN if command == 'down' else OP_KEY_UP, _vk(args[0], line))
+        elif command == 'combo':
+            _arity(args, 1, 2, line, 'combo <键1+键2+...> [按下时长]')
+            vks = [_vk(name, line) for name in args[0].split('+') if name]
+            if not vks:
+                raise MacroScriptError(f"无效的组合键: {args[0]}", line)
+            hold = _duration(args[1], line) if len(args) > 1 else 0.05
+            for vk_code in vks:
+                emit(OP_KEY_DOWN, vk_code)
+            _wait(program, hold)
+            for vk_code in reversed(vks):
+                emit(OP_KEY_UP, vk_code)
+        elif command == 'text':
+            _arity(args, 1, 2, line, 'text "<文本>" [字符/秒]')
+            try:
+                cps = float(args[1]) if len(args) > 1 else 20.0
+                batch = compile_text(args[0], chars_per_second=cps).batch
+            except ValueError as e:
+                raise MacroScriptError(str(e), line)
+            for action, vk_code, delay in zip(batch.actions, batch.vks, batch.delays):
+                emit(OP_KEY_UP if action == ACTION_KEY_UP else OP_KEY_DOWN, vk_code)
+                _wait(program, delay)
+        elif command == 'move':
+            _arity(args, 2, 4, line, 'move <dx> <dy> [时长] [频率]')
+            dx = _integer(args[0], line, '移动距离')
+            dy = _integer(args[1], line, '移动距离')
+            duration = _duration(args[2], line) if len(args) > 2 else 0.0
+            if duration <= 0:
+                emit(OP_MOVE_REL, dx, dy)
+                continue
+            try:
+                rate = float(args[3]) if len(args) > 3 else 100.0
+                path = trajectory.linear(dx, dy, duration, rate=rate)
+            except ValueError as e:
+                raise MacroScriptError(str(e), line)
+            # 与stream_relative相同: 第i帧在i*interval之后发送
+            for i, (step_x, step_y) in enumerate(path.deltas()):
+                if i:
+                    _wait(program, path.interval)
+                if step_x or step_y:
+                    emit(OP_MOVE_REL, step_x, step_y)
+        elif command == 'moveto':
+            _arity(args, 2, 2, line, 'moveto <x> <y>')
+            emit(OP_MOVE_ABS, _integer(args[0], line, '坐标'), _integer(args[1], line, '坐标'))
+        elif command == 'click':
+            _arity(args, 0, 2, line, 'click [按钮] [按下时长]')
+            button = _button(args[0], line) if args else 0
+            hold = _duration(args[1], line) if len(args) > 1 else 0.05
+            emit(OP_BUTTON_DOWN, button)
+            _wait(program, hold)
+            emit(OP_BUTTON_UP, button)
+        elif command in ('mousedown', 'mouseup'):
+            _arity(args, 1, 1, line, f'{command} <按钮>')
+            emit(OP_BUTTON_DOWN if command == 'mousedown' else OP_BUTTON_UP, _button(args[0], line))
+        elif command == 'wheel':
+            _arity(args, 1, 2, line, 'wheel <up|down> [滚动量]')
+            direction = args[0].lower()
+            if direction not in ('up', 'down'):
+                raise MacroScriptError(f"无效的滚动方向: {args[0]}", line)
+            delta = _integer(args[1], line, '滚动量') if len(args) > 1 else 120
+            if delta <= 0:
+                raise MacroScriptError(f"无效的滚动量: {delta}", line)
+            emit(OP_WHEEL, delta if direction == 'up' else -delta)
+        elif command == 'wait':
+            _arity(args, 1, 1, line, 'wait <时长>')
+            _wait(program, _duration(args[0], line))
+        elif command == 'log':
+            _arity(args, 1, 1, line, 'log "<消息>"')
+            if '\0' in args[0]:
+                raise MacroScriptError("消息中不能包含\\0", line)
+            program.strings.append(args[0])
+            emit(OP_LOG, len(program.strings) - 1)
+        elif command == 'repeat':
+            _arity(args, 1, 1, line, 'repeat <次数>')
+            count = _integer(args[0], line, '重复次数')
+            if count < 0:
+                raise MacroScriptError(f"无效的重复次数: {count}", line)
+            loops.append((emit(OP_LOOP, count), line))
+        elif command == 'loop':
+            _arity(args, 0, 0, line, 'loop')
+            loops.append((emit(OP_LOOP, LOOP_FOREVER), line))
+        elif command == 'end':
+            _arity(args, 0, 0, line, 'end')
+            if not loops:
+                raise MacroScriptError("end没有对应的repeat/loop", line)
+            start, _ = loops.pop()
+            emit(OP_END, start)
+            program.arg1[start] = len(program)
+        else:
+            raise MacroScriptError(f"未知的语句: {tokens[0]}", line)
+
+    if loops:
+        raise MacroScriptError("repeat/loop缺少end", loops[-1][1])
+    validate(program)
+    return program
+
+
+def validate(program: MacroProgram) -> None:
+    """校验字节码(编译结果和从缓存载入的程序都会校验)
+
+    Raises:
+        MacroScriptError: 操作码、参数或循环结构无效
+    """
+    ops, arg0, arg1 = program.ops, program.arg0, program.arg1
+    count = len(ops)
+    if len(arg0) != count or len(arg1) != count:
+        raise MacroScriptError("指令数组长度不一致")
+    loops = []  # [LOOP位置, 循环体内是否有等待]
+    for pc in range(count):
+        op, a = ops[pc], arg0[pc]
+        if op in (OP_KEY_DOWN, OP_KEY_UP):
+            if not 0 < a < 256:
+                raise MacroScriptError(f"指令{pc}: 无效的键码 {a}")
+        elif op == OP_WAIT:
+            if a < 0:
+                raise MacroScriptError(f"指令{pc}: 无效的等待时间 {a}")
+            for loop in loops:
+                loop[1] = True
+        elif op in (OP_BUTTON_DOWN, OP_BUTTON_UP):
+            if not 0 <= a < len(BUTTONS):
+                raise MacroScriptError(f"指令{pc}: 无效的鼠标按钮 {a}")
+        elif op == OP_WHEEL:
+            if a == 0:
+                raise MacroScriptError(f"指令{pc}: 无效的滚动量 {a}")
+        elif op == OP_LOG:
+            if not 0 <= a < len(program.strings):
+                raise MacroScriptError(f"指令{pc}: 无效的字符串下标 {a}")
+        elif op == OP_LOOP:
+            if a < LOOP_FOREVER:
+                raise MacroScriptError(f"指令{pc}: 无效的重复次数 {a}")
+            loops.append([pc, False])
+        elif op == OP_END:
+            if not loops or loops[-1][0] != a:
+                raise MacroScriptError(f"指令{pc}: END与LOOP不匹配")
+            start, has_wait = loops.pop()
+            if arg1[start] != pc + 1:
+                raise MacroScriptError(f"指令{start}: LOOP跳转位置无效")
+            if arg0[start] == LOOP_FOREVER and not has_wait:
+                raise MacroScriptError(f"指令{start}: loop循环体内没有等待")
+        elif op not in (OP_MOVE_REL, OP_MOVE_ABS):
+            raise MacroScriptError(f"指令{pc}: 未知的操作码 {op}")
+    if loops:
+        raise MacroScriptError(f"指令{loops[-1][0]}: LOOP缺少END")
+
+
+# ===== 缓存 =====
+def _cache_path(path: str) -> str:
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, CACHE_DIR, name + 'c')
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read_cache(cache_path: str, source_stat) -> Optional[MacroProgram]:
+    try:
+        with open(cache_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < CACHE_HEADER.size:
+        return None
+    magic, version, mtime_ns, size, count, string_count, strings_size = CACHE_HEADER.unpack_from(data)
+    if (magic != CACHE_MAGIC or version != CACHE_VERSION
+            or mtime_ns != source_stat.st_mtime_ns or size != source_stat.st_size
+            or len(data) != CACHE_HEADER.size + count * 9 + strings_size):
+        return None
+
+    program = MacroProgram()
+    offset = CACHE_HEADER.size
+    for values, width in ((program.ops, 1), (program.arg0, 4), (program.arg1, 4)):
+        values.frombytes(data[offset:offset + count * width])
+        if sys.byteorder == 'big' and width > 1:
+            values.byteswap()
+        offset += count * width
+    strings = data[offset:].decode('utf-8')
+    # 按条数而不是字节数判断，空字符串的日志消息同样能还原
+    program.strings = strings.split('\0') if string_count else []
+    if len(program.strings) != string_count:
+        raise MacroScriptError(f"缓存的字符串表条数不符: {len(program.strings)} != {string_count}")
+    validate(program)
+    return program
+
+
+def _write_cache(cache_path: str, source_stat, program: MacroProgram) -> None:
+    strings = '\0'.join(program.strings).encode('utf-8')
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    temp_path = f'{cache_path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, source_stat.st_mtime_ns,
+                                  source_stat.st_size, len(program), len(program.strings), len(strings)))
+        f.write(program.ops.tobytes())
+        f.write(_little_endian(program.arg0))
+        f.write(_little_endian(program.arg1))
+        f.write(strings)
+    os.replace(temp_path, cache_path)
+
+
+def load_script(path: str, use_cache: bool = True) -> MacroProgram:
+    """载入宏脚本文件，优先使用未过期的编译缓存
+
+    Args:
+        path: 脚本文件路径
+        use_cache: 是否读写__lykcache__中的编译缓存
+
+    Returns:
+        MacroProgram: 编译后的程序
+
+    Raises:
+        MacroScriptError: 脚本无效
+        OSError: 文件无法读取
+    """
+    source_stat = os.stat(path)
+    cache_path = _cache_path(path)
+    if use_cache:
+        try:
+            program = _read_cache(cache_path, source_stat)
+            if program is not None:
+                return program
+        except (MacroScriptError, UnicodeDecodeError) as e:
+            logging.warning(f"宏脚本缓存无效，重新编译: {str(e)}")
+
+    with open(path, 'r', encoding='utf-8') as f:
+        program = compile_script(f.read())
+    if use_cache:
+        try:
+            _write_cache(cache_path, source_stat, program)
+        except OSError as e:
+            logging.warning(f"写入宏脚本缓存失败: {str(e)}")
+    return program
+
+
+# ===== 执行 =====
+def execute(program: MacroProgram, tester, speed: float = 1.0,
+            should_continue: Optional[Callable[[], bool]] = None) -> dict:
+    """在输入测试器上执行宏脚本
+
+    等待指令按累计的绝对时间等待，误差不会随指令数累积；紧跟在按键或按钮按下之后的等待
+    (按下时长)至少持续其本身的时长，之前的等待迟到时不会把按下时长追赶为零。每次等待前调用should_continue，
+    设置了驱动状态监视器时同时检查驱动状态。结束或中断时释放仍处于按下状态的按键和鼠标按钮。
+
+    Args:
+        program: 编译后的程序
+        tester: 输入测试器
+        speed: 执行速度倍数，2表示等待时间减半
+        should_continue: 返回False时停止
+
+    Returns:
+        dict: 执行的指令数、是否完成、耗时和定时抖动统计
+
+    Raises:
+        ValueError: 执行速度无效
+        RuntimeError: 驱动状态异常
+    """
+    if speed <= 0:
+        raise ValueError(f"无效的执行速度: {speed}")
+
+    # 执行期间只做一次列表下标访问、元组解包和本地变量调用
+    code = program.code()
+    strings = program.strings
+    driver = tester.driver
+    key_down = driver.KeyDown
+    key_up = driver.KeyUp
+    move_rel = driver.MouseMoveRELATIVE
+    move_abs = driver.MouseMoveABSOLUTE
+    wheel_up = driver.MouseWheelUp
+    wheel_down = driver.MouseWheelDown
+    button_down = (driver.MouseLeftButtonDown, driver.MouseRightButtonDown, driver.MouseMiddleButtonDown,
+                   driver.MouseXButton1Down, driver.MouseXButton2Down)
+    button_up = (driver.MouseLeftButtonUp, driver.MouseRightButtonUp, driver.MouseMiddleButtonUp,
+                 driver.MouseXButton1Up, driver.MouseXButton2Up)
+    monitor = tester.health_monitor
+    held_keys = bytearray(256)
+    held_buttons = bytearray(len(BUTTONS))
+    counters = []  # 各层循环的剩余次数
+
+    timer = PreciseTimer()
+    start_time = timer.start()
+    wait_until = timer.wait_until
+    perf_counter = time.perf_counter
+    pressed_at = 0.0  # 上一次等待之后最后一次按下的时刻，0表示没有按下
+    scale = 1e-6 / speed
+    offset = 0.0
+    executed = 0
+    completed = False
+    pc = 0
+    end = len(code)
+    try:
+        while pc < end:
+            op, a, b = code[pc]
+            pc += 1
+            executed += 1
+            if op == OP_KEY_DOWN:
+                key_down(a)
+                held_keys[a] = 1
+                pressed_at = perf_counter()
+            elif op == OP_KEY_UP:
+                key_up(a)
+                held_keys[a] = 0
+            elif op == OP_WAIT:
+                if should_continue is not None and not should_continue():
+                    break
+                if monitor is not None and not monitor.ready:
+                    raise RuntimeError("驱动状态异常")
+                offset += a * scale
+                if pressed_at:
+                    wait_until(max(start_time + offset, pressed_at + a * scale))
+                    pressed_at = 0.0
+                else:
+                    wait_until(start_time + offset)
+            elif op == OP_MOVE_REL:
+                move_rel(a, b)
+            elif op == OP_BUTTON_DOWN:
+                button_down[a]()
+                held_buttons[a] = 1
+                pressed_at = perf_counter()
+            elif op == OP_BUTTON_UP:
+                button_up[a]()
+                held_buttons[a] = 0
+            elif op == OP_MOVE_ABS:
+                move_abs(a, b)
+            elif op == OP_WHEEL:
+                if a > 0:
+                    wheel_up(a)
+                else:
+                    wheel_down(-a)
+            elif op == OP_LOOP:
+                if a:
+                    counters.append(a)
+                else:
+                    pc = b  # 重复0次，跳过循环体
+            elif op == OP_END:
+                count = counters[-1]
+                if count == LOOP_FOREVER:
+                    pc = a + 1
+                elif count > 1:
+                    counters[-1] = count - 1
+                    pc = a + 1
+                else:
+                    counters.pop()
+            elif op == OP_LOG:
+                logging.info(strings[a])
+        else:
+            completed = True
+    finally:
+        # 释放仍处于按下状态的按键和按钮，避免中断后卡住
+        for vk_code in range(256):
+            if held_keys[vk_code]:
+                key_up(vk_code)
+        for button, held in enumerate(held_buttons):
+            if held:
+                button_up[button]()
+
+    elapsed_time = timer.elapsed()
+    return {
+        'completed': completed,
+        'instructions': executed,
+        'program_size': len(code),
+        'speed': speed,
+        'elapsed_seconds': elapsed_time,
+        'scheduled_seconds': offset,
+        'timing': timer.stats(),
+    }
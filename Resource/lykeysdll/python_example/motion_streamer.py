@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import math
+import threading
+import time
+from typing import Callable, Optional
+
+from precise_timer import PreciseTimer
+
+MIN_RATE = 125.0
+MAX_RATE = 1000.0
+
+
+class MotionStreamer:
+    """固定频率的鼠标相对移动发送器
+
+    独立线程按start时刻起的绝对截止时间(第i帧在start + i/rate)发送相对移动，
+    发送频率不受系统sleep精度影响。生产者通过add()累加待发送的位移(可以是小数，
+    不足1像素的部分保留到后续帧)，或用play()提交按本发送器频率生成的轨迹逐帧播放；
+    每帧把两者合并为一次mouse_move_rel，没有位移的帧不调用驱动。
+
+    线程错过截止时间超过一帧时不会连续补发，而是跳到最近的截止时间，
+    被跳过的帧计入missed_deadlines，其中的轨迹位移合并到当前帧发送，总位移不会丢失。
+    发送出错时暂停100ms，之后从当前时间继续，暂停期间的轨迹帧顺延而不合并。
+    """
+
+    def __init__(self, tester, rate: float = 1000.0, max_step: int = 0,
+                 spin_threshold: float = 0.0005,
+                 on_error: Optional[Callable[[Exception], None]] = None):
+        """初始化发送器
+
+        Args:
+            tester: 输入测试器(或任何提供mouse_move_rel的对象)
+            rate: 发送频率(125-1000Hz)
+            max_step: 单帧每个轴的最大位移，超出部分留到下一帧发送，0表示不限制
+            spin_threshold: 截止时间前开始自旋的时间(秒)
+            on_error: 发送出错时调用，未提供时记录日志
+        """
+        if not MIN_RATE <= rate <= MAX_RATE:
+            raise ValueError(f"发送频率必须在{MIN_RATE:g}-{MAX_RATE:g}Hz之间: {rate}")
+        if max_step < 0:
+            raise ValueError(f"无效的单帧最大位移: {max_step}")
+        self.tester = tester
+        self.rate = float(rate)
+        self.period = 1.0 / rate
+        self.max_step = max_step
+        self.on_error = on_error
+        self.timer = PreciseTimer(spin_threshold=spin_threshold)
+
+        # 待发送的位移(生产者累加，发送线程取走)
+        self._pending_x = 0.0
+        self._pending_y = 0.0
+        self._path = None  # 正在播放的逐帧位移
+        self._path_index = 0
+        self._path_loop = False
+        self._lock = threading.Lock()
+
+        # 统计
+        self.ticks = 0
+        self.moves = 0
+        self.missed_deadlines = 0
+        self.errors = 0
+        self.sent_x = 0
+        self.sent_y = 0
+
+        self._thread = None
+        self._running = False
+        self._elapsed = 0.0
+        self._timing = None  # 线程退出时的定时统计(CPU占用率只能在发送线程内计算)
+
+    # ===== 生产者接口 =====
+    def add(self, dx: float, dy: float) -> None:
+        """累加待发送的位移，在下一帧发送
+
+        Args:
+            dx: X位移
+            dy: Y位移
+        """
+        with self._lock:
+            self._pending_x += dx
+            self._pending_y += dy
+
+    def play(self, path, loop: bool = False) -> None:
+        """播放轨迹，每帧发送一个位移，替换正在播放的轨迹
+
+        Args:
+            path: trajectory.Trajectory，采样率须与发送频率一致
+            loop: 是否循环播放
+        """
+        if abs(path.interval - self.period) > 1e-9:
+            raise ValueError(f"轨迹采样率({1.0 / path.interval:g}Hz)与发送频率({self.rate:g}Hz)不一致")
+        deltas = path.deltas()
+        with self._lock:
+            self._path = deltas or None
+            self._path_index = 0
+            self._path_loop = loop
+
+    def cancel(self) -> None:
+        """停止播放轨迹并清空待发送的位移"""
+        with self._lock:
+            self._path = None
+            self._pending_x = 0.0
+            self._pending_y = 0.0
+
+    @property
+    def playing(self) -> bool:
+        """是否有轨迹正在播放"""
+        return self._path is not None
+
+    @property
+    def pending(self) -> tuple:
+        """尚未发送的位移"""
+        return self._pending_x, self._pending_y
+
+    # ===== 发送线程 =====
+    def _take(self, frames: int):
+        """取出本帧要发送的整数位移(frames为本帧合并的帧数)"""
+        with self._lock:
+            x = self._pending_x
+            y = self._pending_y
+            path = self._path
+            if path is not None:
+                index = self._path_index
+                count = len(path)
+                for _ in range(frames):
+                    dx, dy = path[index]
+                    x += dx
+                    y += dy
+                    index += 1
+                    if index == count:
+                        if not self._path_loop:
+                            self._path = None
+                            break
+                        index = 0
+                self._path_index = index
+
+            # 只发送整数部分，小数部分及超出单帧上限的部分留在待发送中
+            # (先舍入到1e-9以消除小数累加的浮点误差，如1000次0.7累加为699.99...)
+            send_x = math.trunc(round(x, 9))
+            send_y = math.trunc(round(y, 9))
+            max_step = self.max_step
+            if max_step:
+                send_x = max(-max_step, min(max_step, send_x))
+                send_y = max(-max_step, min(max_step, send_y))
+            self._pending_x = x - send_x
+            self._pending_y = y - send_y
+        return send_x, send_y
+
+    def _run(self) -> None:
+        timer = self.timer
+        period = self.period
+        start = timer.start()
+        move = self.tester.mouse_move_rel
+        tick = 0
+        frames = 1
+        self._timing = None
+        while self._running:
+            dx, dy = self._take(frames)
+            failed = False
+            if dx or dy:
+                try:
+                    move(dx, dy)
+                    self.moves += 1
+                    self.sent_x += dx
+                    self.sent_y += dy
+                except Exception as e:
+                    failed = True
+                    self.errors += 1
+                    self.add(dx, dy)  # 发送失败的位移留到下一帧
+                    if self.on_error is not None:
+                        self.on_error(e)
+                    else:
+                        logging.error(f"发送鼠标移动失败: {str(e)}")
+            self.ticks += 1
+
+            # 计算下一个截止时间，已错过的截止时间直接跳过
+            tick += 1
+            if failed:
+                time.sleep(0.1)
+            late = int((time.perf_counter() - start) / period) - tick
+            if late > 0:
+                tick += late
+                if failed:
+                    late = 0
+                else:
+                    self.missed_deadlines += late
+            frames = late + 1 if late > 0 else 1
+            timer.wait_until(start + tick * period)
+        self._elapsed = timer.elapsed()
+        self._timing = timer.stats()
+
+    def start(self) -> None:
+        """启动发送线程"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='MotionStreamer', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止发送线程(未发送完的位移保留，重新start后继续发送)"""
+        if not self._running:
+            return
+        self._running = False
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def stats(self) -> dict:
+        """获取发送统计
+
+        Returns:
+            dict: 目标/实际频率、帧数、移动次数、错过的截止时间、累计位移及定时抖动
+        """
+        if self._timing is not None:
+            elapsed = self._elapsed
+            timing = self._timing
+        else:
+            elapsed = self.timer.elapsed() if self.ticks else 0.0
+            timing = self.timer.stats()
+            timing.pop('cpu_percent')
+        return {
+            'rate': self.rate,
+            'achieved_rate': self.ticks / elapsed if elapsed > 0 else 0.0,
+            'ticks': self.ticks,
+            'moves': self.moves,
+            'missed_deadlines': self.missed_deadlines,
+            'errors': self.errors,
+            'sent': (self.sent_x, self.sent_y),
+            'timing': timing,
+        }
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+import time
+from array import array
+from typing import Optional
+
+
+class PreciseTimer:
+    """高精度定时器
+
+    采用"先休眠后自旋"的混合等待: 距离截止时间较远时调用time.sleep让出CPU，
+    进入spin_threshold以内再自旋等待，兼顾精度和CPU占用。
+    所有截止时间都以start()时刻为基准的绝对时间计算，周期误差不会累积。
+    """
+
+    def __init__(self, spin_threshold: float = 0.002, max_samples: int = 100000):
+        """初始化定时器
+
+        Args:
+            spin_threshold: 截止时间前开始自旋的时间(秒)
+            max_samples: 最多保留的延迟样本数
+        """
+        self.spin_threshold = spin_threshold
+        self.max_samples = max_samples
+        self.start_time = 0.0
+        self._cpu_start = 0.0
+        self._lateness = array('d')
+
+    def start(self, start_time: Optional[float] = None) -> float:
+        """设置计时基准并清空统计
+
+        Args:
+            start_time: 基准时间(perf_counter)，默认为当前时间
+
+        Returns:
+            float: 基准时间
+        """
+        self.start_time = time.perf_counter() if start_time is None else start_time
+        self._cpu_start = time.thread_time()
+        self._lateness = array('d')
+        return self.start_time
+
+    def wait_until(self, deadline: float) -> float:
+        """等待到指定的绝对时间
+
+        Args:
+            deadline: 截止时间(perf_counter)
+
+        Returns:
+            float: 实际到达时间相对截止时间的延迟(秒)
+        """
+        perf_counter = time.perf_counter
+        remaining = deadline - perf_counter()
+        if remaining > self.spin_threshold:
+            time.sleep(remaining - self.spin_threshold)
+        now = perf_counter()
+        while now < deadline:
+            now = perf_counter()
+
+        lateness = now - deadline
+        if len(self._lateness) < self.max_samples:
+            self._lateness.append(lateness)
+        return lateness
+
+    def wait_offset(self, offset: float) -> float:
+        """等待到基准时间之后的offset秒
+
+        Args:
+            offset: 相对start()的偏移(秒)
+
+        Returns:
+            float: 实际到达时间相对截止时间的延迟(秒)
+        """
+        return self.wait_until(self.start_time + offset)
+
+    def elapsed(self) -> float:
+        """获取自start()以来经过的时间(秒)"""
+        return time.perf_counter() - self.start_time
+
+    def stats(self) -> dict:
+        """获取定时统计
+
+        Returns:
+            dict: 等待次数、延迟百分位(微秒)及计时线程的CPU占用率(%)
+        """
+        samples = sorted(self._lateness)
+        count = len(samples)
+
+        def percentile(p):
+            if not count:
+                return 0.0
+            return samples[min(count - 1, int(p / 100.0 * count))] * 1e6
+
+        wall = self.elapsed()
+        cpu = time.thread_time() - self._cpu_start
+        return {
+            'waits': count,
+            'jitter_p50_us': percentile(50),
+            'jitter_p90_us': percentile(90),
+            'jitter_p99_us': percentile(99),
+            'jitter_max_us': samples[-1] * 1e6 if count else 0.0,
+            'cpu_percent': cpu / wall * 100.0 if wall > 0 else 0.0,
+        }
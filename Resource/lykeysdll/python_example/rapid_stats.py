@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+
+import csv
+import math
+import struct
+import sys
+import threading
+from array import array
+
+from instrumentation import LatencyHistogram
+
+EXPORT_COLUMNS = ('time_s', 'interval_s', 'hold_s')
+
+
+class RunningStats:
+    """Welford算法的流式均值/方差，每次更新O(1)且不保存样本"""
+
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        """加入一个样本"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def variance(self) -> float:
+        """样本方差"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        """样本标准差"""
+        return math.sqrt(self.variance)
+
+
+class RapidStats:
+    """高频按键测试的流式统计
+
+    每次按键记录按下和释放时刻，得到以下两项时长:
+        interval  相邻两次按下的间隔(实际周期)
+        hold      按下到释放的实际时长
+    record()在按键循环中只把按下时刻和两项时长写入预分配的数组(最多capacity次)，
+    并以环形数组按秒统计按键次数，不增长任何容器也不做其他计算。
+    每项的均值/标准差(RunningStats)和百分位(固定大小的LatencyHistogram)在读取统计时
+    从数组中增量汇总，因此统计的开销由读取方(界面每秒一次或测试结束时)承担；
+    超出capacity的按键不再保存，改为在record()中直接汇总。
+    完整序列可在测试结束后导出为.npy或CSV。所有时间为time.perf_counter()的秒数。
+    """
+
+    def __init__(self, capacity: int = 1000000, window: int = 60):
+        """初始化统计
+
+        Args:
+            capacity: 保存完整序列的最大按键次数(超出后只更新统计)
+            window: 保留每秒按键次数的秒数
+        """
+        if capacity < 0:
+            raise ValueError(f"无效的序列容量: {capacity}")
+        if window <= 0:
+            raise ValueError(f"无效的统计窗口: {window}")
+        self.capacity = capacity
+        self.window = window
+        self._times = array('d', bytes(8 * capacity))
+        self._intervals = array('d', bytes(8 * capacity))
+        self._holds = array('d', bytes(8 * capacity))
+        self._seconds = array('I', [0]) * window
+        self._lock = threading.Lock()  # 保护汇总统计(读取方与超出容量时的record())
+        self.start()
+
+    @classmethod
+    def for_run(cls, duration: float, period: float, max_capacity: int = 1000000) -> 'RapidStats':
+        """按预计的按键次数创建统计(无法预计时使用max_capacity)
+
+        Args:
+            duration: 运行时长(秒)，0表示不限
+            period: 按键周期(秒)
+            max_capacity: 保存完整序列的最大按键次数
+        """
+        capacity = max_capacity
+        if duration > 0 and period > 0:
+            capacity = min(int(duration / period) + 1, max_capacity)
+        return cls(capacity=capacity)
+
+    def start(self, start_time: float = 0.0) -> None:
+        """设置计时基准并清空统计
+
+        Args:
+            start_time: 基准时间(perf_counter)
+        """
+        with self._lock:
+            self.start_time = start_time
+            self.presses = 0
+            self._interval = RunningStats()
+            self._hold = RunningStats()
+            self._interval_histogram = LatencyHistogram()
+            self._hold_histogram = LatencyHistogram()
+            self._folded = 0  # 已汇总到统计中的已保存按键数
+            self._last_down = math.nan  # 第一次按键的间隔为NaN
+            self._second = 0  # 当前(未结束)的秒序号，finish()后为结束时刻所在的秒
+            self._rate_min = None
+            self._rate_max = 0
+            seconds = self._seconds
+            for i in range(self.window):
+                seconds[i] = 0
+
+    def record(self, down_time: float, up_time: float) -> None:
+        """记录一次按键
+
+        Args:
+            down_time: 按下时刻(perf_counter)
+            up_time: 释放时刻(perf_counter)
+        """
+        index = self.presses
+        offset = down_time - self.start_time
+        if index < self.capacity:
+            self._times[index] = offset
+            self._intervals[index] = down_time - self._last_down
+            self._holds[index] = up_time - down_time
+        else:
+            with self._lock:
+                self._fold()
+                self._add(down_time - self._last_down, up_time - down_time)
+        self._last_down = down_time
+        self.presses = index + 1  # 数组写入后再发布
+
+        second = int(offset)
+        if second != self._second:
+            self._advance(second)
+        self._seconds[second % self.window] += 1
+
+    def _add(self, interval: float, hold: float) -> None:
+        self._hold.add(hold)
+        self._hold_histogram.record(int(hold * 1e9))
+        if interval == interval:  # 非NaN
+            self._interval.add(interval)
+            self._interval_histogram.record(int(interval * 1e9))
+
+    def _fold(self) -> None:
+        """把尚未汇总的已保存按键计入统计(调用方持有self._lock)"""
+        end = min(self.presses, self.capacity)
+        intervals, holds, add = self._intervals, self._holds, self._add
+        for i in range(self._folded, end):
+            add(intervals[i], holds[i])
+        self._folded = end
+
+    def summary(self):
+        """汇总并返回两项时长的统计
+
+        Returns:
+            tuple: (interval的RunningStats, hold的RunningStats)
+        """
+        with self._lock:
+            self._fold()
+            return self._interval, self._hold
+
+    def _advance(self, second: int) -> None:
+        """结束second之前的各秒，把其按键次数计入最低/最高频率"""
+        seconds = self._seconds
+        window = self.window
+        current = self._second
+        count = seconds[current % window]
+        if self._rate_min is None or count < self._rate_min:
+            self._rate_min = count
+        if count > self._rate_max:
+            self._rate_max = count
+        if second - current > 1:
+            self._rate_min = 0  # 中间有没有按键的秒
+        for i in range(max(current + 1, second - window + 1), second + 1):
+            seconds[i % window] = 0
+        self._second = second
+
+    def finish(self, end_time: float) -> None:
+        """测试结束时调用，结束end_time之前已完整经过的各秒
+
+        Args:
+            end_time: 结束时刻(perf_counter)
+        """
+        if not self.presses:
+            return
+        second = int(end_time - self.start_time)
+        if second > self._second:
+            self._advance(second)
+
+    @property
+    def stored(self) -> int:
+        """已保存完整数据的按键次数"""
+        return min(self.presses, self.capacity)
+
+    def rate_windows(self) -> list:
+        """最近window秒的每秒按键次数(由旧到新)
+
+        最后一项是当前尚未结束的一秒(没有按键时省略)。
+        """
+        seconds = self._seconds
+        window = self.window
+        end = self._second
+        begin = max(0, end - window + 1)
+        windows = [seconds[i % window] for i in range(begin, end)]
+        if seconds[end % window]:
+            windows.append(seconds[end % window])
+        return windows
+
+    @staticmethod
+    def _summary(stats: RunningStats, histogram: LatencyHistogram) -> dict:
+        if not stats.count:
+            return {'count': 0}
+        return {
+            'count': stats.count,
+            'mean_us': stats.mean * 1e6,
+            'stddev_us': stats.stddev * 1e6,
+            'min_us': stats.min * 1e6,
+            'p50_us': histogram.percentile(50) / 1000.0,
+            'p90_us': histogram.percentile(90) / 1000.0,
+            'p99_us': histogram.percentile(99) / 1000.0,
+            'p999_us': histogram.percentile(99.9) / 1000.0,
+            'max_us': stats.max * 1e6,
+        }
+
+    def snapshot(self) -> dict:
+        """获取统计快照(时长单位为微秒，频率单位为次/秒)
+
+        百分位来自对数直方图，相对误差约6%；均值、标准差和最值是精确值。
+        每秒频率的最低/最高值只统计已结束的秒，windows和last_second包含当前这一秒。
+        """
+        windows = self.rate_windows()
+        with self._lock:
+            self._fold()
+            interval = self._summary(self._interval, self._interval_histogram)
+            hold = self._summary(self._hold, self._hold_histogram)
+            presses = self.presses
+        return {
+            'presses': presses,
+            'interval': interval,
+            'hold': hold,
+            'rate': {
+                'last_second': windows[-1] if windows else 0,
+                'min_per_second': self._rate_min or 0,
+                'max_per_second': self._rate_max,
+                'windows': windows,
+            },
+            'samples_stored': min(presses, self.capacity),
+            'samples_dropped': max(0, presses - self.capacity),
+        }
+
+    # ===== 导出 =====
+    def _columns(self):
+        n = self.stored
+        return self._times[:n], self._intervals[:n], self._holds[:n]
+
+    def export(self, path: str) -> int:
+        """导出每次按键的按下时刻、间隔和按下时长(秒)
+
+        扩展名为.npy时写为NumPy数组文件(形状为(次数, 3)的float64，不需要安装NumPy，
+        可用numpy.load读取)，否则写为CSV。第一次按键没有间隔，值为NaN(CSV中为空)。
+
+        Args:
+            path: 输出文件路径
+
+        Returns:
+            int: 导出的行数
+        """
+        if path.lower().endswith('.npy'):
+            return self._export_npy(path)
+        return self._export_csv(path)
+
+    def _export_npy(self, path: str) -> int:
+        columns = self._columns()
+        rows = self.stored
+        data = array('d', bytes(8 * rows * len(columns)))
+        for i, column in enumerate(columns):
+            data[i::len(columns)] = column  # 按行优先交错存放
+
+        # .npy 1.0格式: 魔数、版本、头长度、按64字节对齐的字典头
+        byte_order = '<' if sys.byteorder == 'little' else '>'
+        header = f"{{'descr': '{byte_order}f8', 'fortran_order': False, 'shape': ({rows}, {len(columns)}), }}"
+        padding = 63 - (10 + len(header)) % 64
+        header = (header + ' ' * padding + '\n').encode('latin1')
+        with open(path, 'wb') as f:
+            f.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header)
+            data.tofile(f)
+        return rows
+
+    def _export_csv(self, path: str) -> int:
+        times, intervals, holds = self._columns()
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_COLUMNS)
+            for offset, interval, hold in zip(times, intervals, holds):
+                writer.writerow((repr(offset), '' if math.isnan(interval) else repr(interval), repr(hold)))
+        return len(times)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+from array import array
+from functools import lru_cache
+import logging
+
+from input_tester import KeyBatch, ACTION_KEY_DOWN, ACTION_KEY_UP
+from virtuakeys_mapping import VirtualKeys
+
+# 文本中需要转换为按键名称的控制字符
+CHAR_ALIASES = {
+    '\n': 'enter',
+    '\r': 'enter',
+    '\t': 'tab',
+}
+
+SHIFT_VK = VirtualKeys.get_vk_code('shift')
+
+
+class TextPlan:
+    """文本输入的按键事件计划
+
+    Attributes:
+        text: 原始文本
+        batch: 编译后的按键事件批次
+        char_ends: 每个已编译字符在batch中的结束位置(不含)
+        chars: 与char_ends一一对应的字符
+        skipped: 无法映射为按键而被跳过的字符
+    """
+
+    __slots__ = ('text', 'batch', 'char_ends', 'chars', 'skipped')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.batch = KeyBatch()
+        self.char_ends = array('I')
+        self.chars = []
+        self.skipped = []
+
+    def __len__(self) -> int:
+        return len(self.batch)
+
+
+def _char_key(char: str):
+    """获取字符对应的(键码, 是否需要Shift)，无法映射时返回None"""
+    name = CHAR_ALIASES.get(char, char)
+    vk_code = VirtualKeys.get_vk_code(name)
+    if vk_code is None:
+        return None
+    shift = VirtualKeys.needs_shift(char) or ('A' <= char <= 'Z')
+    return vk_code, shift
+
+
+@lru_cache(maxsize=256)
+def compile_text(text: str, chars_per_second: float = 20.0,
+                 hold_ratio: float = 0.5, modifier_delay: float = 0.005) -> TextPlan:
+    """将文本编译为按键事件计划
+
+    连续的需要Shift的字符共用一次Shift按下/释放，不会产生多余的修饰键切换。
+    相同参数的编译结果会被缓存，重复发送同一段文本时无需重新编译。
+
+    Args:
+        text: 要输入的文本
+        chars_per_second: 目标输入速度(字符/秒)
+        hold_ratio: 每个字符周期中按键保持按下的比例
+        modifier_delay: Shift切换后的等待时间(秒)，从所在字符周期的空闲时间中扣除
+
+    Returns:
+        TextPlan: 编译后的事件计划(调用方不应修改)
+
+    Raises:
+        ValueError: 参数无效
+    """
+    if chars_per_second <= 0:
+        raise ValueError(f"无效的输入速度: {chars_per_second}")
+    if not 0 < hold_ratio < 1:
+        raise ValueError(f"无效的按下比例: {hold_ratio}")
+
+    period = 1.0 / chars_per_second
+    hold_time = period * hold_ratio
+    plan = TextPlan(text)
+    batch = plan.batch
+    actions, vks, delays = batch.actions, batch.vks, batch.delays
+    shift_down = False
+
+    for char in text:
+        key = _char_key(char)
+        if key is None:
+            plan.skipped.append(char)
+            continue
+        vk_code, shift = key
+
+        # 只在Shift状态需要变化时才切换
+        gap = period - hold_time
+        if shift != shift_down:
+            settle = min(modifier_delay, gap)
+            actions.append(ACTION_KEY_DOWN if shift else ACTION_KEY_UP)
+            vks.append(SHIFT_VK)
+            delays.append(settle)
+            shift_down = shift
+            gap -= settle
+
+        actions.append(ACTION_KEY_DOWN)
+        vks.append(vk_code)
+        delays.append(hold_time)
+        actions.append(ACTION_KEY_UP)
+        vks.append(vk_code)
+        delays.append(gap)
+
+        plan.char_ends.append(len(actions))
+        plan.chars.append(char)
+
+    if shift_down:
+        actions.append(ACTION_KEY_UP)
+        vks.append(SHIFT_VK)
+        delays.append(0.0)
+        plan.char_ends[-1] = len(actions)
+
+    if plan.skipped:
+        logging.warning(f"以下字符无法输入，已跳过: {''.join(sorted(set(plan.skipped)))}")
+    return plan
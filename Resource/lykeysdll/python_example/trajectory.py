@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""鼠标轨迹生成
+
+整条轨迹在发送前一次性计算为int32的逐帧位移数组。每一帧先计算相对起点的理想浮点位置，
+四舍五入后再与上一帧的整数位置相减(误差扩散)，亚像素余量不会被逐步截断丢弃，
+位移之和严格等于目标位移。
+
+安装了NumPy时使用向量化计算(首次生成轨迹时才导入)，否则退化为纯Python实现，两者结果完全一致。
+"""
+
+import math
+from array import array
+from typing import Optional, Sequence, Tuple
+
+np = None  # 首次需要向量化计算时由_load_numpy()导入
+_numpy_available = None  # None表示尚未尝试导入
+
+
+def _load_numpy() -> bool:
+    """首次调用时导入NumPy，导入本模块本身不加载NumPy(避免拖慢界面启动)
+
+    Returns:
+        bool: NumPy是否可用
+    """
+    global np, _numpy_available
+    if _numpy_available is None:
+        try:
+            import numpy
+        except ImportError:
+            _numpy_available = False
+        else:
+            np = numpy
+            _numpy_available = True
+    return _numpy_available
+
+
+def __getattr__(name):
+    # HAS_NUMPY在首次访问时才检查
+    if name == 'HAS_NUMPY':
+        return _load_numpy()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ===== 缓动函数(对标量和NumPy数组均适用) =====
+def _linear(t):
+    return t
+
+
+def _ease_in(t):
+    return t * t
+
+
+def _ease_out(t):
+    return t * (2 - t)
+
+
+def _ease_in_out(t):
+    return t * t * (3 - 2 * t)
+
+
+EASINGS = {
+    'linear': _linear,
+    'ease_in': _ease_in,
+    'ease_out': _ease_out,
+    'ease_in_out': _ease_in_out,
+}
+
+
+class Trajectory:
+    """预计算的鼠标轨迹(逐帧相对位移)"""
+
+    __slots__ = ('dx', 'dy', 'interval')
+
+    def __init__(self, dx, dy, interval: float):
+        """
+        Args:
+            dx: 每帧的X位移(int32数组)
+            dy: 每帧的Y位移(int32数组)
+            interval: 帧间隔(秒)
+        """
+        self.dx = dx
+        self.dy = dy
+        self.interval = interval
+
+    def __len__(self) -> int:
+        return len(self.dx)
+
+    @property
+    def duration(self) -> float:
+        """轨迹总时长(秒)"""
+        return len(self.dx) * self.interval
+
+    def total(self) -> Tuple[int, int]:
+        """总位移"""
+        return sum(self.dx.tolist()), sum(self.dy.tolist())
+
+    def deltas(self) -> list:
+        """逐帧位移[(dx, dy), ...](Python整数，可直接传给驱动)"""
+        return list(zip(self.dx.tolist(), self.dy.tolist()))
+
+    def positions(self, start_x: int, start_y: int) -> list:
+        """从起点出发的逐帧绝对坐标[(x, y), ...]"""
+        x, y = start_x, start_y
+        result = []
+        for dx, dy in zip(self.dx.tolist(), self.dy.tolist()):
+            x += dx
+            y += dy
+            result.append((x, y))
+        return result
+
+
+def _use_numpy(use_numpy: Optional[bool]) -> bool:
+    if use_numpy is None:
+        return _load_numpy()
+    if use_numpy and not _load_numpy():
+        raise ValueError("未安装NumPy")
+    return use_numpy
+
+
+def _steps(duration: float, rate: float) -> int:
+    if rate <= 0:
+        raise ValueError(f"无效的采样率: {rate}")
+    if duration < 0:
+        raise ValueError(f"无效的时长: {duration}")
+    return max(1, int(round(duration * rate)))
+
+
+def _build(xs, ys, rate: float, vectorized: bool) -> Trajectory:
+    """把理想坐标序列(相对起点)转换为误差扩散后的逐帧位移"""
+    if vectorized:
+        px = np.floor(np.asarray(xs) + 0.5).astype(np.int64)
+        py = np.floor(np.asarray(ys) + 0.5).astype(np.int64)
+        dx = np.diff(px, prepend=0).astype(np.int32)
+        dy = np.diff(py, prepend=0).astype(np.int32)
+        return Trajectory(dx, dy, 1.0 / rate)
+
+    dx = array('i')
+    dy = array('i')
+    last_x = last_y = 0
+    floor = math.floor
+    for x, y in zip(xs, ys):
+        px = floor(x + 0.5)
+        py = floor(y + 0.5)
+        dx.append(px - last_x)
+        dy.append(py - last_y)
+        last_x = px
+        last_y = py
+    return Trajectory(dx, dy, 1.0 / rate)
+
+
+def _progress(steps: int, easing: str, vectorized: bool):
+    """第1..steps帧的缓动进度(最后一帧严格为1)"""
+    ease = EASINGS.get(easing)
+    if ease is None:
+        raise ValueError(f"未知的缓动类型: {easing}")
+    if vectorized:
+        return ease(np.arange(1, steps + 1, dtype=np.float64) / steps)
+    return [ease(i / steps) for i in range(1, steps + 1)]
+
+
+def linear(dx: int, dy: int, duration: float, rate: float = 1000.0,
+           easing: str = 'linear', use_numpy: Optional[bool] = None) -> Trajectory:
+    """直线轨迹
+
+    Args:
+        dx: 总X位移
+        dy: 总Y位移
+        duration: 时长(秒)
+        rate: 采样率(帧/秒)
+        easing: 缓动类型(linear/ease_in/ease_out/ease_in_out)
+        use_numpy: 是否使用NumPy，None表示可用时使用
+
+    Returns:
+        Trajectory: 轨迹
+    """
+    vectorized = _use_numpy(use_numpy)
+    progress = _progress(_steps(duration, rate), easing, vectorized)
+    if vectorized:
+        return _build(dx * progress, dy * progress, rate, True)
+    return _build([dx * p for p in progress], [dy * p for p in progress], rate, False)
+
+
+def bezier(dx: int, dy: int, controls: Sequence[Tuple[float, float]], duration: float,
+           rate: float = 1000.0, easing: str = 'linear',
+           use_numpy: Optional[bool] = None) -> Trajectory:
+    """贝塞尔曲线轨迹(起点为当前位置，终点为(dx, dy))
+
+    Args:
+        dx: 总X位移
+        dy: 总Y位移
+        controls: 相对起点的控制点，1个为二次曲线，2个为三次曲线
+        duration: 时长(秒)
+        rate: 采样率(帧/秒)
+        easing: 沿曲线前进的缓动类型
+        use_numpy: 是否使用NumPy，None表示可用时使用
+
+    Returns:
+        Trajectory: 轨迹
+    """
+    if len(controls) not in (1, 2):
+        raise ValueError(f"控制点数量必须为1或2: {len(controls)}")
+    vectorized = _use_numpy(use_numpy)
+    t = _progress(_steps(duration, rate), easing, vectorized)
+
+    def curve(end, c):
+        if len(c) == 1:
+            return lambda t: 2 * (1 - t) * t * c[0] + t * t * end
+        return lambda t: 3 * (1 - t) ** 2 * t * c[0] + 3 * (1 - t) * t * t * c[1] + t ** 3 * end
+
+    fx = curve(dx, [p[0] for p in controls])
+    fy = curve(dy, [p[1] for p in controls])
+    if vectorized:
+        return _build(fx(t), fy(t), rate, True)
+    return _build([fx(v) for v in t], [fy(v) for v in t], rate, False)
+
+
+def orbit(radius: float, period: float, rate: float = 1000.0, revolutions: float = 1.0,
+          clockwise: bool = False, use_numpy: Optional[bool] = None) -> Trajectory:
+    """圆周轨迹
+
+    从当前位置出发，绕其左侧radius处的圆心转动，整圈结束时回到起点(位移之和为0)。
+
+    Args:
+        radius: 半径(像素)
+        period: 转一圈的时间(秒)
+        rate: 采样率(帧/秒)
+        revolutions: 圈数
+        clockwise: 是否顺时针(屏幕坐标系)
+        use_numpy: 是否使用NumPy，None表示可用时使用
+
+    Returns:
+        Trajectory: 轨迹
+    """
+    if period <= 0:
+        raise ValueError(f"无效的周期: {period}")
+    vectorized = _use_numpy(use_numpy)
+    steps = _steps(period * revolutions, rate)
+    total_angle = 2 * math.pi * revolutions
+    direction = 1 if clockwise else -1
+    if vectorized:
+        angle = np.arange(1, steps + 1, dtype=np.float64) * (total_angle / steps)
+        return _build(radius * np.cos(angle) - radius, direction * radius * np.sin(angle), rate, True)
+    step_angle = total_angle / steps
+    angles = [i * step_angle for i in range(1, steps + 1)]
+    return _build([radius * math.cos(a) - radius for a in angles],
+                  [direction * radius * math.sin(a) for a in angles], rate, False)
+
+
+# ===== 轨迹发送 =====
+def stream_relative(tester, path: Trajectory, timer, should_continue=None) -> int:
+    """按帧间隔发送相对位移
+
+    Args:
+        tester: 输入测试器
+        path: 轨迹
+        timer: 已start()的PreciseTimer，第i帧在i*interval之后发送
+        should_continue: 每帧前调用，返回False时停止
+
+    Returns:
+        int: 实际发送的移动次数(位移为0的帧只等待不发送)
+    """
+    moves = 0
+    interval = path.interval
+    wait_offset = timer.wait_offset
+    move = tester.mouse_move_rel
+    for i, (dx, dy) in enumerate(path.deltas()):
+        if should_continue is not None and not should_continue():
+            break
+        wait_offset(i * interval)
+        if dx or dy:
+            move(dx, dy)
+            moves += 1
+    return moves
+
+
+def stream_absolute(tester, path: Trajectory, start_x: int, start_y: int, timer,
+                    should_continue=None) -> int:
+    """按帧间隔发送绝对坐标
+
+    Args:
+        tester: 输入测试器
+        path: 轨迹
+        start_x: 起点X坐标
+        start_y: 起点Y坐标
+        timer: 已start()的PreciseTimer，第i帧在i*interval之后发送
+        should_continue: 每帧前调用，返回False时停止
+
+    Returns:
+        int: 发送的帧数
+    """
+    frames = 0
+    interval = path.interval
+    wait_offset = timer.wait_offset
+    move = tester.mouse_move_abs
+    for i, (x, y) in enumerate(path.positions(start_x, start_y)):
+        if should_continue is not None and not should_continue():
+            break
+        wait_offset(i * interval)
+        move(x, y)
+        frames += 1
+    return frames
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+_MISSING = object()
+
+
+class UIPump:
+    """界面刷新泵
+
+    工作线程通过publish()把最新值写入共享字典(单次字典赋值在GIL下是原子的，无需加锁)，
+    主线程按固定帧率统一刷新有变化的控件。无论工作线程更新多频繁，
+    Tk事件队列中始终只有一个刷新回调。
+    """
+
+    def __init__(self, root, fps: float = 30.0):
+        """初始化刷新泵
+
+        Args:
+            root: Tk根窗口(或任何提供after/after_cancel的对象)
+            fps: 刷新帧率
+        """
+        if fps <= 0:
+            raise ValueError(f"无效的刷新帧率: {fps}")
+        self.root = root
+        self.interval_ms = max(1, int(1000 / fps))
+        self.frames = 0  # 已执行的刷新次数
+        self.renders = 0  # 实际调用处理函数的次数
+        self._values = {}
+        self._rendered = {}
+        self._handlers = {}
+        self._after_id = None
+
+    def bind(self, key: str, handler) -> None:
+        """绑定数据项的处理函数(在主线程中以最新值调用)
+
+        Args:
+            key: 数据项名称
+            handler: 处理函数，接收最新值
+        """
+        self._handlers[key] = handler
+
+    def publish(self, key: str, value) -> None:
+        """发布数据项的最新值(可在任意线程调用)
+
+        Args:
+            key: 数据项名称
+            value: 最新值，旧值未刷新时会被直接覆盖
+        """
+        self._values[key] = value
+
+    def flush(self) -> None:
+        """立即把有变化的值刷新到界面(仅在主线程调用)"""
+        for key, value in list(self._values.items()):
+            if self._rendered.get(key, _MISSING) != value:
+                handler = self._handlers.get(key)
+                if handler is not None:
+                    handler(value)
+                    self.renders += 1
+                self._rendered[key] = value
+
+    def start(self) -> None:
+        """开始定时刷新"""
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def stop(self) -> None:
+        """停止定时刷新"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self) -> None:
+        self.frames += 1
+        try:
+            self.flush()
+        finally:
+            self._after_id = self.root.after(self.interval_ms, self._tick)
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+from functools import lru_cache
+
 
 # 虚拟键码映射
 class VirtualKeys:
@@ -154,10 +156,77 @@ class VirtualKeys:
         '_', '+', '{', '}', '|', ':', '"', '<', '>', '?'
     }
     
+    # 特殊按键别名(大写) -> VK_CODE中的名称
+    SPECIAL_KEYS = {
+        'ENTER': 'enter',
+        'RETURN': 'enter',
+        'SPACE': 'spacebar',
+        'TAB': 'tab',
+        'SHIFT': 'shift',
+        'CTRL': 'ctrl',
+        'CONTROL': 'ctrl',
+        'ALT': 'alt',
+        'ESC': 'esc',
+        'ESCAPE': 'esc',
+        'BACKSPACE': 'backspace',
+        'DELETE': 'del',
+        'INSERT': 'ins',
+        'HOME': 'home',
+        'END': 'end',
+        'PAGEUP': 'page_up',
+        'PAGEDOWN': 'page_down',
+        'UP': 'up_arrow',
+        'DOWN': 'down_arrow',
+        'LEFT': 'left_arrow',
+        'RIGHT': 'right_arrow'
+    }
+    
+    # 预编译的按键名称 -> 键码查找表，在模块导入时由_build_index()生成
+    _KEY_INDEX = {}
+    
+    @classmethod
+    def _build_index(cls):
+        """根据VK_CODE和SPECIAL_KEYS构建查找表
+        
+        每个已知名称以原样、大写和小写三种形式收录，键码由_resolve_vk_code计算，
+        因此与逐步解析的结果完全一致。
+        """
+        names = set(cls.VK_CODE) | set(cls.SPECIAL_KEYS) | {' '}
+        names.update(f'F{i}' for i in range(1, 25))
+        index = {}
+        for name in names:
+            for variant in (name, name.upper(), name.lower()):
+                vk_code = cls._resolve_vk_code(variant)
+                if vk_code is not None:
+                    index[variant] = vk_code
+        cls._KEY_INDEX = index
+        cls._resolve_unknown.cache_clear()
+    
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _resolve_unknown(key):
+        """解析不在查找表中的字符串(结果带缓存)"""
+        return VirtualKeys._resolve_vk_code(key)
+    
     @classmethod
     def get_vk_code(cls, key):
         """获取虚拟键码
         
+        Args:
+            key: 按键名称
+            
+        Returns:
+            int: 虚拟键码，如果不存在返回None
+        """
+        vk_code = cls._KEY_INDEX.get(key)
+        if vk_code is None and key:
+            return cls._resolve_unknown(key)
+        return vk_code
+    
+    @classmethod
+    def _resolve_vk_code(cls, key):
+        """按原始规则逐步解析虚拟键码(用于构建查找表和处理未知字符串)
+        
         Args:
             key: 按键名称
             
@@ -192,32 +261,8 @@ class VirtualKeys:
             return cls.VK_CODE[key]
         
         # 处理特殊键
-        special_keys = {
-            'ENTER': 'enter',
-            'RETURN': 'enter',
-            'SPACE': 'spacebar',
-            'TAB': 'tab',
-            'SHIFT': 'shift',
-            'CTRL': 'ctrl',
-            'CONTROL': 'ctrl',
-            'ALT': 'alt',
-            'ESC': 'esc',
-            'ESCAPE': 'esc',
-            'BACKSPACE': 'backspace',
-            'DELETE': 'del',
-            'INSERT': 'ins',
-            'HOME': 'home',
-            'END': 'end',
-            'PAGEUP': 'page_up',
-            'PAGEDOWN': 'page_down',
-            'UP': 'up_arrow',
-            'DOWN': 'down_arrow',
-            'LEFT': 'left_arrow',
-            'RIGHT': 'right_arrow'
-        }
-        
-        if key in special_keys:
-            mapped_key = special_keys[key]
+        if key in cls.SPECIAL_KEYS:
+            mapped_key = cls.SPECIAL_KEYS[key]
             return cls.VK_CODE.get(mapped_key)
             
         # 如果是直接的虚拟键码映射
@@ -225,13 +270,13 @@ class VirtualKeys:
     
     @classmethod
     def is_valid_key(cls, key):
-        """检查是否是有效的按键"""
-        if key == ' ':  # 空格字符特殊处理
-            return True
-        return key.lower() in cls.VK_CODE
+        """检查是否是有效的按键(与get_vk_code使用同一查找表)"""
+        return cls.get_vk_code(key) is not None
     
     @classmethod
     def needs_shift(cls, char):
         """检查字符是否需要按住Shift键"""
         return char in cls.SHIFT_CHARS
 
+
+VirtualKeys._build_index()